@@ -0,0 +1,650 @@
+"""
+In-memory stand-ins for every upstream ThorsHammer talks to, so the service
+can be run and measured with no credentials and no network.
+
+    MemoryFirestore   collection / document / where / order_by / start_after /
+                      select / limit / stream / count, batches, transactions,
+                      snapshot listeners, Increment / ArrayUnion — enough of
+                      the firebase-admin surface for every call in
+                      thorshammer_v2.1.py.  Counts reads and writes the way
+                      Firestore bills them.
+    WeatherbitStub    canned /current, /alerts, /lightning and
+                      /forecast/hourly behind an httpx.MockTransport, with
+                      configurable latency, jitter and error rate.
+    FcmSink           firebase_admin.messaging look-alike that records sends.
+
+    th       = load_app()                         # imports thorshammer_v2.1.py
+    backends = install(th, latency_ms=150, scenario="storm")
+    ...
+    backends.counts()                              # upstream call counters
+
+Run this file directly to serve the app on localhost with the fakes
+installed (point the FlutterFlow app or curl at it):
+
+    python bench/fakes.py --port 8000 --scenario dry
+"""
+
+import os
+import sys
+import copy
+import math
+import time
+import types
+import random
+import asyncio
+import argparse
+import importlib.util
+import itertools
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import httpx
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "thorshammer_v2.1.py")
+
+def load_app(path: str = APP_PATH, module_name: str = "thorshammer"):
+    """Imports the service module (its file name is not importable as-is)."""
+    os.environ.setdefault("ENV", "development")
+    os.environ.setdefault("WEATHERBIT_API_KEY", "bench")     # install() swaps the transport
+    spec   = importlib.util.spec_from_file_location(module_name, os.path.abspath(path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+# ═════════════════════════════════════════════════════════════════════════════
+# FIRESTORE
+# ═════════════════════════════════════════════════════════════════════════════
+
+class Increment:
+    def __init__(self, value):
+        self.value = value
+
+class ArrayUnion:
+    def __init__(self, values):
+        self.values = list(values)
+
+def _resolve(current, value):
+    if isinstance(value, Increment):
+        return (current if isinstance(current, (int, float)) else 0) + value.value
+    if isinstance(value, ArrayUnion):
+        have = list(current) if isinstance(current, list) else []
+        return have + [v for v in value.values if v not in have]
+    if isinstance(value, dict):
+        return {k: _resolve(None, v) for k, v in value.items()}
+    return copy.deepcopy(value)
+
+def _merge(doc: dict, fields: dict) -> dict:
+    """set(..., merge=True): nested maps merge, everything else replaces."""
+    out = dict(doc)
+    for k, v in fields.items():
+        if isinstance(v, dict) and isinstance(out.get(k), dict):
+            out[k] = _merge(out[k], v)
+        else:
+            out[k] = _resolve(out.get(k), v)
+    return out
+
+_OPS = {
+    "==":     lambda a, b: a == b,
+    "!=":     lambda a, b: a is not None and a != b,
+    "<":      lambda a, b: a is not None and a < b,
+    "<=":     lambda a, b: a is not None and a <= b,
+    ">":      lambda a, b: a is not None and a > b,
+    ">=":     lambda a, b: a is not None and a >= b,
+    "in":     lambda a, b: a in b,
+    "not-in": lambda a, b: a is not None and a not in b,
+    "array_contains": lambda a, b: isinstance(a, list) and b in a,
+}
+
+class DocumentSnapshot:
+
+    def __init__(self, ref: "DocumentReference", data: Optional[dict]):
+        self.reference = ref
+        self.id        = ref.id
+        self.exists    = data is not None
+        self._data     = data
+
+    def to_dict(self) -> Optional[dict]:
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field: str):
+        return (self._data or {}).get(field)
+
+class _Change:
+    def __init__(self, kind: str, snapshot: DocumentSnapshot):
+        self.type     = types.SimpleNamespace(name=kind)
+        self.document = snapshot
+
+class _Watch:
+    def __init__(self, db: "MemoryFirestore", path: tuple, callback):
+        self._db, self.path, self.callback = db, path, callback
+
+    def unsubscribe(self) -> None:
+        with self._db._lock:
+            if self in self._db._watches:
+                self._db._watches.remove(self)
+
+class _AggregateResult:
+    def __init__(self, value: int):
+        self.alias, self.value = "count", value
+
+class _CountQuery:
+    def __init__(self, query: "Query"):
+        self._query = query
+
+    def get(self, transaction=None) -> list:
+        return [[_AggregateResult(sum(1 for _ in self._query._run(bill=False)))]]
+
+class Query:
+
+    def __init__(self, db: "MemoryFirestore", path: tuple, filters=(), orders=(),
+                 fields=None, after=None, limit=None):
+        self._db, self._path = db, path
+        self._filters, self._orders = filters, orders
+        self._fields, self._after, self._limit = fields, after, limit
+
+    def _with(self, **changes) -> "Query":
+        state = dict(filters=self._filters, orders=self._orders, fields=self._fields,
+                     after=self._after, limit=self._limit)
+        state.update(changes)
+        return Query(self._db, self._path, **state)
+
+    def where(self, field: str, op: str, value) -> "Query":
+        if op not in _OPS:
+            raise ValueError(f"Unsupported operator: {op!r}")
+        return self._with(filters=self._filters + ((field, op, value),))
+
+    def order_by(self, field: str, direction: str = "ASCENDING") -> "Query":
+        return self._with(orders=self._orders + ((field, direction),))
+
+    def select(self, fields) -> "Query":
+        return self._with(fields=list(fields))
+
+    def start_after(self, values) -> "Query":
+        if isinstance(values, DocumentSnapshot):
+            values = {**(values._data or {}), "__name__": values.id}
+        return self._with(after=values)
+
+    def limit(self, count: int) -> "Query":
+        return self._with(limit=count)
+
+    def count(self) -> _CountQuery:
+        return _CountQuery(self)
+
+    def _key(self, doc_id: str, data: dict) -> tuple:
+        return tuple(doc_id if f == "__name__" else data.get(f) for f, _ in self._orders)
+
+    def _run(self, bill: bool = True):
+        self._db._pause()
+        with self._db._lock:
+            rows = [
+                (doc_id, data) for doc_id, data in self._db._docs.get(self._path, {}).items()
+                if all(_OPS[op](data.get(f), v) for f, op, v in self._filters)
+                # Firestore leaves out documents that lack an ordered field.
+                and all(f == "__name__" or data.get(f) is not None for f, _ in self._orders)
+            ]
+            rows = [(doc_id, copy.deepcopy(data)) for doc_id, data in rows]
+        orders = self._orders or (("__name__", "ASCENDING"),)
+        for field, direction in reversed(orders):
+            rows.sort(
+                key=lambda r: r[0] if field == "__name__" else r[1].get(field),
+                reverse=direction == "DESCENDING",
+            )
+        if self._after is not None:
+            after = tuple(self._after.get(f) for f, _ in self._orders)
+            desc  = [d == "DESCENDING" for _, d in self._orders]
+            def past(row) -> bool:
+                for value, cursor, down in zip(self._key(*row), after, desc):
+                    if value != cursor:
+                        return value < cursor if down else value > cursor
+                return False
+            rows = [r for r in rows if past(r)]
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        if bill:
+            self._db.stats["queries"] += 1
+            self._db.stats["reads"]   += max(len(rows), 1)   # an empty result bills one read
+        for doc_id, data in rows:
+            if self._fields is not None:
+                data = {k: data[k] for k in self._fields if k in data}
+            yield DocumentSnapshot(DocumentReference(self._db, self._path, doc_id), data)
+
+    def stream(self, transaction=None):
+        return self._run()
+
+    def get(self, transaction=None) -> list:
+        return list(self._run())
+
+    def on_snapshot(self, callback) -> _Watch:
+        watch = _Watch(self._db, self._path, callback)
+        with self._db._lock:
+            self._db._watches.append(watch)
+            docs = [DocumentSnapshot(DocumentReference(self._db, self._path, i), copy.deepcopy(d))
+                    for i, d in self._db._docs.get(self._path, {}).items()]
+        callback(docs, [_Change("ADDED", d) for d in docs], datetime.now(timezone.utc))
+        return watch
+
+class CollectionReference(Query):
+
+    def __init__(self, db: "MemoryFirestore", path: tuple):
+        super().__init__(db, path)
+        self.id = path[-1]
+
+    def document(self, doc_id: Optional[str] = None) -> "DocumentReference":
+        return DocumentReference(self._db, self._path, doc_id or f"{random.getrandbits(80):020x}")
+
+    def add(self, data: dict) -> tuple:
+        ref = self.document()
+        ref.set(data)
+        return datetime.now(timezone.utc), ref
+
+class DocumentReference:
+
+    def __init__(self, db: "MemoryFirestore", path: tuple, doc_id: str):
+        self._db, self._path, self.id = db, path, doc_id
+
+    @property
+    def path(self) -> str:
+        return "/".join(self._path + (self.id,))
+
+    def collection(self, name: str) -> CollectionReference:
+        return CollectionReference(self._db, self._path + (self.id, name))
+
+    def get(self, field_paths=None, transaction=None) -> DocumentSnapshot:
+        self._db._pause()
+        with self._db._lock:
+            data = copy.deepcopy(self._db._docs.get(self._path, {}).get(self.id))
+            self._db.stats["reads"] += 1
+        return DocumentSnapshot(self, data)
+
+    def set(self, data: dict, merge: bool = False) -> None:
+        self._db._commit([("set", self, data, merge)])
+
+    def update(self, fields: dict) -> None:
+        self._db._commit([("update", self, fields, True)])
+
+    def delete(self) -> None:
+        self._db._commit([("delete", self, None, False)])
+
+class WriteBatch:
+
+    def __init__(self, db: "MemoryFirestore"):
+        self._db     = db
+        self._writes: list = []
+
+    def set(self, ref: DocumentReference, data: dict, merge: bool = False) -> None:
+        self._writes.append(("set", ref, data, merge))
+
+    def update(self, ref: DocumentReference, fields: dict) -> None:
+        self._writes.append(("update", ref, fields, True))
+
+    def delete(self, ref: DocumentReference) -> None:
+        self._writes.append(("delete", ref, None, False))
+
+    def commit(self) -> list:
+        if len(self._writes) > 500:
+            raise ValueError("A batch can contain at most 500 writes.")
+        self._db._commit(self._writes)
+        return self._writes
+
+class Transaction(WriteBatch):
+    """Runs the transactional function under the database lock — serialisable by construction."""
+
+def transactional(func):
+    def run(transaction: Transaction, *args, **kwargs):
+        with transaction._db._lock:
+            result = func(transaction, *args, **kwargs)
+            transaction.commit()
+        return result
+    return run
+
+class MemoryFirestore:
+    """
+    Documents live in {collection path: {doc id: data}}.  `latency_ms` is
+    slept (outside the lock) on every read and commit to mimic a round-trip.
+    `fail_commits` makes the next N commits raise, for replication tests.
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_s    = latency_ms / 1000
+        self.fail_commits = 0
+        self._lock        = threading.RLock()
+        self._docs:    dict = {}
+        self._watches: list = []
+        self.stats = {"reads": 0, "writes": 0, "queries": 0, "commits": 0}
+
+    def _pause(self) -> None:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+    def collection(self, name: str) -> CollectionReference:
+        return CollectionReference(self, (name,))
+
+    def batch(self) -> WriteBatch:
+        return WriteBatch(self)
+
+    def transaction(self) -> Transaction:
+        return Transaction(self)
+
+    def _commit(self, writes: list) -> None:
+        self._pause()
+        changes = []
+        with self._lock:
+            if self.fail_commits:
+                self.fail_commits -= 1
+                raise RuntimeError("503 Service Unavailable (injected)")
+            staged = {}
+            for op, ref, data, merge in writes:
+                key  = (ref._path, ref.id)
+                docs = self._docs.get(ref._path, {})
+                have = staged[key] if key in staged else docs.get(ref.id)
+                if op == "update" and have is None:
+                    raise KeyError(f"No document to update: {ref.path}")
+                if op == "delete":
+                    staged[key] = None
+                elif merge:
+                    staged[key] = _merge(have or {}, data)
+                else:
+                    staged[key] = _merge({}, data)
+            for (path, doc_id), data in staged.items():
+                docs    = self._docs.setdefault(path, {})
+                existed = doc_id in docs
+                if data is None:
+                    docs.pop(doc_id, None)
+                    kind = "REMOVED"
+                else:
+                    docs[doc_id] = data
+                    kind = "MODIFIED" if existed else "ADDED"
+                snap = DocumentSnapshot(DocumentReference(self, path, doc_id), copy.deepcopy(data))
+                changes += [(w, _Change(kind, snap)) for w in self._watches if w.path == path]
+            self.stats["writes"]  += len(writes)
+            self.stats["commits"] += 1
+        for watch, change in changes:
+            watch.callback([], [change], datetime.now(timezone.utc))
+
+    def documents(self, collection: str) -> dict:
+        """{id: data} of one top-level collection (for assertions and reports)."""
+        with self._lock:
+            return copy.deepcopy(self._docs.get((collection,), {}))
+
+firestore_module = types.SimpleNamespace(
+    Increment=Increment, ArrayUnion=ArrayUnion, transactional=transactional,
+)
+
+# ═════════════════════════════════════════════════════════════════════════════
+# WEATHERBIT
+# ═════════════════════════════════════════════════════════════════════════════
+
+# Observation templates per scenario — shapes match the real /current records.
+SCENARIOS = {
+    "dry":   {"temp": 33.0, "rh": 8,  "wind_spd": 11.0, "precip": 0.0, "clouds": 5,
+              "weather": {"description": "Clear sky", "code": 800}},
+    "storm": {"temp": 27.0, "rh": 22, "wind_spd": 9.0,  "precip": 0.0, "clouds": 80,
+              "weather": {"description": "Thunderstorm with dry lightning", "code": 201}},
+    "calm":  {"temp": 18.0, "rh": 45, "wind_spd": 2.0,  "precip": 0.0, "clouds": 20,
+              "weather": {"description": "Few clouds", "code": 801}},
+    "snow":  {"temp": -4.0, "rh": 85, "wind_spd": 4.0,  "precip": 1.2, "clouds": 100,
+              "weather": {"description": "Snow", "code": 601}},
+}
+
+class WeatherbitStub:
+    """
+    Canned Weatherbit API.  Each request sleeps latency_ms ± jitter_ms;
+    error_rate of them answer 503 (exercising the client's retries).
+    Storm scenarios return strikes scattered around the query point.
+    """
+
+    def __init__(
+        self,
+        scenario:   str   = "dry",
+        latency_ms: float = 120.0,
+        jitter_ms:  float = 30.0,
+        error_rate: float = 0.0,
+        strikes:    int   = 40,
+        seed:       int   = 7,
+    ):
+        if scenario not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {scenario!r}; pick one of {sorted(SCENARIOS)}")
+        self.scenario   = scenario
+        self.latency_ms = latency_ms
+        self.jitter_ms  = jitter_ms
+        self.error_rate = error_rate
+        self.strikes    = strikes
+        self._rng       = random.Random(seed)
+        self.calls:  dict = {}
+        self.errors: int  = 0
+        self.transport = httpx.MockTransport(self.handle)
+
+    def _observation(self, lat: float, lon: float) -> dict:
+        obs = copy.deepcopy(SCENARIOS[self.scenario])
+        now = datetime.now(timezone.utc)
+        obs.update({
+            "lat": lat, "lon": lon, "city_name": "Westcliffe", "state_code": "CO",
+            "ob_time": now.strftime("%Y-%m-%d %H:%M"),
+            "datetime": now.strftime("%Y-%m-%d:%H"),
+            "ts": int(now.timestamp()),
+        })
+        # Small spatial variation so cells do not all score identically.
+        obs["rh"]       = max(1, obs["rh"] + round(3 * math.sin(lat * 40)))
+        obs["wind_spd"] = round(obs["wind_spd"] + math.cos(lon * 40), 1)
+        return obs
+
+    def _strikes(self, lat: float, lon: float, radius_km: float) -> list:
+        if self.scenario != "storm":
+            return []
+        now, out = time.time(), []
+        for _ in range(self.strikes):
+            d   = radius_km * math.sqrt(self._rng.random())
+            bearing = self._rng.uniform(0, 2 * math.pi)
+            age = self._rng.uniform(0, 1800)
+            out.append({
+                "lat": round(lat + d / 111.0 * math.cos(bearing), 5),
+                "lon": round(lon + d / (111.0 * math.cos(math.radians(lat))) * math.sin(bearing), 5),
+                "timestamp_utc": datetime.fromtimestamp(now - age, timezone.utc)
+                                 .strftime("%Y-%m-%dT%H:%M:%S"),
+                "type": self._rng.choice(["CG", "IC"]),
+            })
+        return out
+
+    def _forecast(self, lat: float, lon: float, hours: int) -> list:
+        start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        out = []
+        for h in range(hours):
+            hour = self._observation(lat, lon)
+            t    = start + timedelta(hours=h + 1)
+            hour.update({
+                "ts": int(t.timestamp()),
+                "timestamp_utc": t.strftime("%Y-%m-%dT%H:%M:%S"),
+                "temp": round(hour["temp"] + 4 * math.sin(h / 24 * 2 * math.pi), 1),
+                "pop": 60 if self.scenario in ("storm", "snow") else 5,
+            })
+            out.append(hour)
+        return out
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        endpoint = request.url.path.removeprefix("/v2.0/").strip("/")
+        self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+        delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms))
+        await asyncio.sleep(delay / 1000)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.errors += 1
+            return httpx.Response(503, json={"error": "injected"})
+
+        q   = request.url.params
+        lat = float(q.get("lat", 38.13))
+        lon = float(q.get("lon", -105.47))
+        if endpoint == "current":
+            return httpx.Response(200, json={"count": 1, "data": [self._observation(lat, lon)]})
+        if endpoint == "alerts":
+            alerts = []
+            if self.scenario == "storm":
+                alerts = [{"title": "Severe Thunderstorm Warning", "severity": "Warning",
+                           "description": "Frequent cloud-to-ground lightning."}]
+            elif self.scenario == "dry":
+                alerts = [{"title": "Red Flag Warning", "severity": "Warning",
+                           "description": "Critical fire weather conditions."}]
+            return httpx.Response(200, json={"alerts": alerts, "lat": lat, "lon": lon})
+        if endpoint == "lightning":
+            return httpx.Response(200, json={"data": self._strikes(lat, lon, float(q.get("radius", 50)))})
+        if endpoint == "forecast/hourly":
+            return httpx.Response(200, json={"data": self._forecast(lat, lon, int(q.get("hours", 48)))})
+        return httpx.Response(404, json={"error": f"no stub for /{endpoint}"})
+
+# ═════════════════════════════════════════════════════════════════════════════
+# FCM
+# ═════════════════════════════════════════════════════════════════════════════
+
+class UnregisteredError(Exception):
+    code = "NOT_FOUND"
+
+class _Message:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+class _SendResponse:
+    def __init__(self, message_id: Optional[str], exception: Optional[Exception] = None):
+        self.message_id = message_id
+        self.exception  = exception
+        self.success    = exception is None
+
+class _BatchResponse:
+    def __init__(self, responses: list):
+        self.responses     = responses
+        self.success_count = sum(r.success for r in responses)
+        self.failure_count = len(responses) - self.success_count
+
+class FcmSink:
+    """
+    Stands in for firebase_admin.messaging.  Nothing leaves the process;
+    tokens in dead_tokens fail as UNREGISTERED so the prune path runs.
+    """
+
+    Notification = AndroidConfig = APNSConfig = APNSPayload = Aps = _Message
+    Message = MulticastMessage = _Message
+    UnregisteredError = UnregisteredError
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_s   = latency_ms / 1000
+        self.dead_tokens: set = set()
+        self._ids  = itertools.count(1)
+        self._lock = threading.Lock()
+        self.sent = self.failed = self.requests = 0
+        self.last_title: Optional[str] = None
+
+    def _deliver(self, token: str) -> _SendResponse:
+        if token in self.dead_tokens:
+            return _SendResponse(None, UnregisteredError(f"token {token[:8]}… is not registered"))
+        return _SendResponse(f"projects/bench/messages/{next(self._ids)}")
+
+    def send(self, message, dry_run: bool = False) -> str:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        resp = self._deliver(message.token)
+        with self._lock:
+            self.requests += 1
+            self.sent     += resp.success
+            self.failed   += not resp.success
+            self.last_title = getattr(message.notification, "title", None)
+        if resp.exception:
+            raise resp.exception
+        return resp.message_id
+
+    def send_each_for_multicast(self, message, dry_run: bool = False) -> _BatchResponse:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        batch = _BatchResponse([self._deliver(t) for t in message.tokens])
+        with self._lock:
+            self.requests += 1
+            self.sent     += batch.success_count
+            self.failed   += batch.failure_count
+            self.last_title = getattr(message.notification, "title", None)
+        return batch
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "sent": self.sent, "failed": self.failed}
+
+# ═════════════════════════════════════════════════════════════════════════════
+# WIRING
+# ═════════════════════════════════════════════════════════════════════════════
+
+class Backends:
+
+    def __init__(self, firestore: MemoryFirestore, weatherbit: WeatherbitStub, fcm: FcmSink):
+        self.firestore  = firestore
+        self.weatherbit = weatherbit
+        self.fcm        = fcm
+
+    def counts(self) -> dict:
+        return {
+            "weatherbit": {**dict(sorted(self.weatherbit.calls.items())),
+                           "injected_errors": self.weatherbit.errors},
+            "firestore":  dict(self.firestore.stats),
+            "fcm":        self.fcm.stats(),
+        }
+
+def seed_subscribers(db: MemoryFirestore, count: int, uid: str = "dev-user") -> None:
+    """Active subscribers with push tokens; `uid` is who the dev-mode token resolves to."""
+    now   = datetime.now(timezone.utc).isoformat()
+    batch = db.batch()
+    for i in range(count):
+        sub_id = uid if i == 0 else f"bench-{i:05d}"
+        batch.set(db.collection("subscribers").document(sub_id), {
+            "email":         f"{sub_id}@bench.local",
+            "active":        True,
+            "stripe_status": "active",
+            "fcm_token":     f"fcm-{sub_id}-{i:05d}",
+            "updated_at":    now,
+        })
+        if (i + 1) % 500 == 0:
+            batch.commit()
+            batch = db.batch()
+    batch.commit()
+
+def install(
+    th,
+    scenario:             str   = "dry",
+    latency_ms:           float = 120.0,
+    jitter_ms:            float = 30.0,
+    error_rate:           float = 0.0,
+    firestore_latency_ms: float = 0.0,
+    fcm_latency_ms:       float = 0.0,
+    subscribers:          int   = 1000,
+    local_store:          str   = ":memory:",
+) -> Backends:
+    """
+    Points a freshly loaded module at the fakes.  Call before the app starts
+    (before lifespan runs), once per loaded module.
+    """
+    backends = Backends(
+        MemoryFirestore(latency_ms=firestore_latency_ms),
+        WeatherbitStub(scenario, latency_ms, jitter_ms, error_rate),
+        FcmSink(latency_ms=fcm_latency_ms),
+    )
+    th.firestore_db   = backends.firestore
+    th.firestore      = firestore_module
+    th.fcm_messaging  = backends.fcm
+    th.fcm_available  = True
+    th.WEATHERBIT_KEY = "bench"
+    th.weatherbit     = th.WeatherbitClient(transport=backends.weatherbit.transport)
+    # Keep the store object (its replication hooks are registered on it).
+    th.store.local    = th.LocalStore(local_store)
+    seed_subscribers(backends.firestore, subscribers)
+    return backends
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve ThorsHammer against in-memory fakes.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--scenario", default="dry", choices=sorted(SCENARIOS))
+    parser.add_argument("--latency-ms", type=float, default=120.0)
+    parser.add_argument("--subscribers", type=int, default=1000)
+    args = parser.parse_args()
+
+    import uvicorn
+    th = load_app()
+    install(th, scenario=args.scenario, latency_ms=args.latency_ms, subscribers=args.subscribers)
+    uvicorn.run(th.app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
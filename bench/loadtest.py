@@ -0,0 +1,277 @@
+"""
+End-to-end load test against the in-memory backends in fakes.py.
+
+Drives the real FastAPI app in-process (httpx.ASGITransport, lifespan and
+scheduler running) with an open-loop arrival schedule: requests start at
+the target rate whether or not earlier ones have finished, and latency is
+measured from the scheduled start, so a stalled server shows up as queueing
+delay instead of a politely reduced request rate.
+
+    python bench/loadtest.py --rps 100 --duration 30 --latency-ms 150
+    python bench/loadtest.py --scenario storm --mix check_risk=1,lightning=1 --json out.json
+
+Reports p50 / p95 / p99 / max per endpoint and what the run cost upstream:
+Weatherbit calls per endpoint, Firestore reads / writes / commits and FCM
+sends — the numbers the caches, single-flight and write-behind exist to
+keep small.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+import logging
+from typing import Optional
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import fakes  # noqa: E402
+
+# Custer County bounding box (roughly) — /check-risk callers are spread over it.
+COUNTY_LAT = (37.85, 38.35)
+COUNTY_LON = (-105.75, -105.15)
+
+DEFAULT_MIX = {
+    "check_risk":     4,
+    "base_station":   4,
+    "lightning":      2,
+    "drone_pending":  1,
+    "drone_dispatch": 0.25,
+    "drone_ack":      0.25,
+    "mission_log":    0.5,
+}
+
+class Workload:
+    """Builds one request per scenario name; keeps the drone flow consistent."""
+
+    def __init__(self, rng: random.Random):
+        self.rng      = rng
+        self.missions: list = []
+
+    async def run(self, client: httpx.AsyncClient, name: str) -> int:
+        if name == "check_risk":
+            r = await client.post("/check-risk", json={
+                "latitude":  round(self.rng.uniform(*COUNTY_LAT), 4),
+                "longitude": round(self.rng.uniform(*COUNTY_LON), 4),
+            })
+        elif name == "base_station":
+            r = await client.get("/base-station")
+        elif name == "lightning":
+            r = await client.get("/lightning-strikes")
+        elif name == "drone_pending":
+            r = await client.get("/drone/missions/pending")
+        elif name == "drone_dispatch":
+            r = await client.post("/drone/dispatch", json={
+                "target_lat": round(self.rng.uniform(*COUNTY_LAT), 4),
+                "target_lon": round(self.rng.uniform(*COUNTY_LON), 4),
+            })
+            mission_id = r.json().get("mission", {}).get("mission_id") if r.status_code == 200 else None
+            if mission_id:
+                self.missions.append(mission_id)
+        elif name == "drone_ack":
+            if not self.missions:
+                r = await client.get("/drone/missions/pending")
+            else:
+                mission_id = self.missions.pop(0)
+                r = await client.post(f"/drone/missions/{mission_id}/acknowledge")
+                if r.status_code == 200:
+                    r = await client.post(f"/drone/missions/{mission_id}/complete")
+        elif name == "mission_log":
+            r = await client.get("/drone/mission-log", params={"limit": 20})
+        else:
+            raise ValueError(f"Unknown request type {name!r}")
+        return r.status_code
+
+def percentile(sorted_ms: list, pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_ms:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_ms)))
+    return sorted_ms[rank - 1]
+
+def summarize(samples: dict, elapsed_s: float) -> dict:
+    out = {}
+    for name, rows in sorted(samples.items()):
+        ms = sorted(lat for lat, _ in rows)
+        statuses: dict = {}
+        for _, status in rows:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        out[name] = {
+            "requests": len(rows),
+            "rps":      round(len(rows) / elapsed_s, 1) if elapsed_s else None,
+            "p50_ms":   percentile(ms, 50),
+            "p95_ms":   percentile(ms, 95),
+            "p99_ms":   percentile(ms, 99),
+            "max_ms":   ms[-1] if ms else None,
+            "statuses": statuses,
+        }
+    return out
+
+async def run_load(
+    th,
+    backends:  fakes.Backends,
+    rps:       float,
+    duration:  float,
+    warmup:    float,
+    mix:       dict,
+    poisson:   bool,
+    seed:      int,
+    max_inflight: int,
+) -> dict:
+    rng      = random.Random(seed)
+    workload = Workload(rng)
+    names, weights = zip(*[(k, v) for k, v in mix.items() if v > 0])
+    samples: dict = {}
+    outstanding = dropped = 0
+
+    async def one(client, name, scheduled, record):
+        nonlocal outstanding
+        try:
+            status = await workload.run(client, name)
+        except Exception as e:                          # transport / app crash
+            status = type(e).__name__
+        finally:
+            outstanding -= 1
+        if record:
+            samples.setdefault(name, []).append(
+                (round((time.perf_counter() - scheduled) * 1000, 2), status)
+            )
+
+    transport = httpx.ASGITransport(app=th.app)
+    async with th.lifespan(th.app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench",
+            headers={"Authorization": "Bearer bench"}, timeout=60,
+        ) as client:
+            tasks   = []
+            start   = time.perf_counter()
+            end     = start + warmup + duration
+            counts_at_warmup = None
+            next_at = start
+            while next_at < end:
+                now = time.perf_counter()
+                if next_at > now:
+                    await asyncio.sleep(next_at - now)
+                record = next_at >= start + warmup
+                if record and counts_at_warmup is None:
+                    counts_at_warmup = backends.counts()
+                if outstanding >= max_inflight:
+                    dropped += record                    # server saturated — count, don't queue forever
+                else:
+                    outstanding += 1
+                    name = rng.choices(names, weights)[0]
+                    tasks.append(asyncio.create_task(one(client, name, next_at, record)))
+                next_at += rng.expovariate(rps) if poisson else 1 / rps
+            await asyncio.gather(*tasks)
+            elapsed = time.perf_counter() - start - warmup
+            counts  = backends.counts()
+            metrics = await service_metrics(client)
+    return {
+        "config": {
+            "target_rps": rps, "duration_s": duration, "warmup_s": warmup,
+            "mix": mix, "arrivals": "poisson" if poisson else "uniform",
+            "scenario": backends.weatherbit.scenario,
+            "weatherbit_latency_ms": backends.weatherbit.latency_ms,
+        },
+        "elapsed_s": round(elapsed, 2),
+        "dropped":   dropped,
+        "endpoints": summarize(samples, elapsed),
+        "upstream":  {"total": counts, "measured": _delta(counts, counts_at_warmup or {})},
+        "service":   metrics,
+    }
+
+async def service_metrics(client: httpx.AsyncClient) -> dict:
+    """The service's own counters after the run (cache hit rate, single-flight, store)."""
+    m = (await client.get("/metrics")).json()
+    return {
+        "weather_cache": m.get("weather_cache", {}).get("hit_rate"),
+        "singleflight":  m.get("singleflight"),
+        "weather_writer": m.get("weather_writer"),
+        "local_store":   {k: m.get("local_store", {}).get(k)
+                          for k in ("local_reads", "remote_reads", "replicated", "outbox")},
+    }
+
+def _delta(after: dict, before: dict) -> dict:
+    out = {}
+    for key, value in after.items():
+        if isinstance(value, dict):
+            out[key] = _delta(value, before.get(key, {}))
+        else:
+            out[key] = value - before.get(key, 0)
+    return out
+
+def print_report(report: dict) -> None:
+    cfg = report["config"]
+    print(f"\nThorsHammer load test — {cfg['target_rps']} rps target, {cfg['arrivals']} arrivals, "
+          f"{report['elapsed_s']} s measured, scenario={cfg['scenario']}, "
+          f"weatherbit latency {cfg['weatherbit_latency_ms']:g} ms")
+    print(f"{'endpoint':<16}{'reqs':>7}{'rps':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  statuses")
+    for name, s in report["endpoints"].items():
+        print(f"{name:<16}{s['requests']:>7}{s['rps']:>8}{s['p50_ms']:>9}{s['p95_ms']:>9}"
+              f"{s['p99_ms']:>9}{s['max_ms']:>9}  {s['statuses']}")
+    if report["dropped"]:
+        print(f"dropped (generator saturated): {report['dropped']}")
+    up = report["upstream"]["measured"]
+    print(f"\nupstream during measurement: weatherbit {up['weatherbit']}")
+    print(f"                             firestore  {up['firestore']}")
+    print(f"                             fcm        {up['fcm']}")
+    print(f"service: {json.dumps(report['service'], default=str)}")
+
+def parse_mix(raw: Optional[str]) -> dict:
+    if not raw:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise SystemExit(f"Unknown request type {name!r}; pick from {', '.join(DEFAULT_MIX)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rps", type=float, default=50)
+    parser.add_argument("--duration", type=float, default=20, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds run but not measured")
+    parser.add_argument("--mix", help="e.g. check_risk=4,base_station=4,lightning=2")
+    parser.add_argument("--scenario", default="dry", choices=sorted(fakes.SCENARIOS))
+    parser.add_argument("--latency-ms", type=float, default=120, help="Weatherbit stub latency")
+    parser.add_argument("--jitter-ms", type=float, default=30)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of Weatherbit 503s")
+    parser.add_argument("--firestore-latency-ms", type=float, default=0.0)
+    parser.add_argument("--subscribers", type=int, default=1000)
+    parser.add_argument("--poisson", action="store_true", help="exponential inter-arrival times")
+    parser.add_argument("--max-inflight", type=int, default=512, help="requests beyond this are dropped")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write the report here")
+    parser.add_argument("--verbose", action="store_true", help="keep the service's INFO logs")
+    args = parser.parse_args()
+
+    th = fakes.load_app()
+    if not args.verbose:
+        logging.getLogger("ThorsHammer").setLevel(logging.WARNING)
+    backends = fakes.install(
+        th,
+        scenario=args.scenario,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        firestore_latency_ms=args.firestore_latency_ms,
+        subscribers=args.subscribers,
+    )
+    report = asyncio.run(run_load(
+        th, backends, args.rps, args.duration, args.warmup, parse_mix(args.mix),
+        args.poisson, args.seed, args.max_inflight,
+    ))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+
+if __name__ == "__main__":
+    main()
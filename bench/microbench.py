@@ -0,0 +1,381 @@
+"""
+Micro-benchmarks for the per-request hot path, checked against a stored
+baseline so a slowdown in scoring or report building fails loudly.
+
+Covered, for every case in fixtures/weatherbit.json (dry, storm with dry
+lightning, wet storm, snow, missing fields):
+
+    fire_risk      calculate_fire_risk(observation)
+    lightning      detect_lightning(observation, alerts, strike count)
+    condition      derive_condition(observation)
+    build_report   _build_report() — WeatherReport construction + validation
+    validate       WeatherReport.model_validate(dict)
+    dump_json      report.model_dump_json()
+    dump_dict      report.model_dump()
+
+plus score_weather_batch() over 1,000 observations (NumPy and the scalar
+fallback) next to the per-call loop it replaces, reported per observation.
+
+Each row has
+    ns        ns per call: median over --rounds samples, each the best of
+              --repeat timed runs (timeit-style autorange, GC off)
+    rel       ns ÷ a fixed calibration loop timed right before each sample —
+              the median ratio is compared with the baseline, so a faster,
+              slower or momentarily busier box does not read as a code change
+    peak_b    tracemalloc high-water per call, bytes
+    blocks    memory blocks allocated by one call that are still alive when
+              it returns (the result and anything it keeps)
+
+    python bench/microbench.py                 # compare with bench/baseline.json
+    python bench/microbench.py --update        # record a new baseline
+    python bench/microbench.py --only build_report --rounds 9
+
+Exit status 1 when a TIME_GATED row regresses past --time-tolerance (rel)
+by more than --time-floor-ns, or any row past --memory-tolerance (peak_b,
+blocks).  The few-µs rows swing by ±40% between runs on a shared VM, so
+their time is reported but only gates with --gate-all.  Rows that look slow
+are re-measured --retries times first, adding samples to their median; a
+real regression survives that, a noisy neighbour usually does not.
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import statistics
+import copy
+import random
+import argparse
+import itertools
+import platform
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+import fakes  # noqa: E402
+
+FIXTURES_PATH = os.path.join(HERE, "fixtures", "weatherbit.json")
+BASELINE_PATH = os.path.join(HERE, "baseline.json")
+BATCH_SIZE    = 1000
+# Rows whose time can fail the run: long enough per call to measure steadily.
+TIME_GATED    = ("build_report[", "scalar_loop[", "batch_numpy[", "batch_python[")
+
+# ─── Measurement ─────────────────────────────────────────────────────────────
+
+def _timed(fn: Callable, number: int) -> float:
+    loop  = itertools.repeat(None, number)
+    start = time.perf_counter()
+    for _ in loop:
+        fn()
+    return time.perf_counter() - start
+
+def autorange(fn: Callable, min_run_s: float) -> int:
+    """Calls per timed run so that one run lasts at least min_run_s."""
+    number = 1
+    while _timed(fn, number) < min_run_s:
+        number *= 2
+    return number
+
+def time_ns(fn: Callable, number: int, repeat: int) -> float:
+    """Best-of-`repeat` ns per call over runs of `number` calls, GC off."""
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return min(_timed(fn, number) for _ in range(repeat)) / number * 1e9
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+_TRACE_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+]
+
+def allocations(fn: Callable) -> tuple[int, int]:
+    """(peak bytes, blocks still alive after the call) for one call."""
+    fn()                                   # warm lazy caches / interned strings first
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        result  = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        after   = tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+    finally:
+        tracemalloc.stop()
+    kept = sum(max(s.count_diff, 0) for s in after.compare_to(before, "lineno"))
+    del result
+    return peak - base, kept
+
+def _calibration() -> Callable:
+    """Fixed pure-Python work shaped like the scorers: dict gets, compares, substring scans."""
+    wd = {"rh": 12, "temp": 31.5, "wind_spd": None, "weather": {"description": "Clear sky"}}
+    terms = ("thunderstorm", "lightning", "electrical storm", "t-storm")
+    def work():
+        score = 0
+        for key, default in (("rh", 50), ("temp", 20), ("wind_spd", 0), ("precip", 0)):
+            value = wd.get(key) or default
+            score += 10 if value > 25 else 5 if value > 10 else 0
+        desc = wd.get("weather", {}).get("description", "").lower()
+        return score, any(t in desc for t in terms)
+    return work
+
+# ─── Workload ────────────────────────────────────────────────────────────────
+
+def load_fixtures(path: str = FIXTURES_PATH) -> dict:
+    with open(path, encoding="utf-8") as f:
+        cases = {k: v for k, v in json.load(f).items() if not k.startswith("_")}
+    now = time.time()
+    for case in cases.values():
+        # Shift recorded strike times so they are as old, relative to now, as
+        # they were relative to the observation — the index drops stale ones.
+        obs_ts = case["current"].get("ts") or now
+        for s in case["strikes"]:
+            t = datetime.fromisoformat(s["timestamp_utc"]).replace(tzinfo=timezone.utc).timestamp()
+            s["timestamp_utc"] = datetime.fromtimestamp(now - (obs_ts - t), timezone.utc) \
+                .strftime("%Y-%m-%dT%H:%M:%S")
+    return cases
+
+def case_benchmarks(th, name: str, case: dict) -> list[tuple[str, Callable, Callable]]:
+    """(row name, setup, fn) for one fixture.  setup() runs before the row is measured."""
+    wd, alerts, strikes = case["current"], case["alerts"], case["strikes"]
+    lat, lon = case["lat"], case["lon"]
+
+    def prime():
+        # _build_report asks the strike index for the nearest strike; give each
+        # case its own index holding exactly its recorded strikes.
+        th.strike_index = th.StrikeIndex()
+        th.strike_index.add(copy.deepcopy(strikes), lat, lon, th.LIGHTNING_RADIUS_KM)
+
+    score, level = th.calculate_fire_risk(wd)
+    ln, dry      = th.detect_lightning(wd, alerts, len(strikes))
+    ctx          = th._context(wd, alerts, strikes, [], score, level, ln, dry)
+    prime()
+    report = th._build_report(lat, lon, ctx)
+    dumped = report.model_dump()
+
+    return [
+        (f"fire_risk[{name}]",    prime, lambda: th.calculate_fire_risk(wd)),
+        (f"lightning[{name}]",    prime, lambda: th.detect_lightning(wd, alerts, len(strikes))),
+        (f"condition[{name}]",    prime, lambda: th.derive_condition(wd)),
+        (f"build_report[{name}]", prime, lambda: th._build_report(lat, lon, ctx)),
+        (f"validate[{name}]",     prime, lambda: th.WeatherReport.model_validate(dumped)),
+        (f"dump_json[{name}]",    prime, lambda: report.model_dump_json()),
+        (f"dump_dict[{name}]",    prime, lambda: report.model_dump()),
+    ]
+
+def batch_benchmarks(th, cases: dict) -> list[tuple[str, Callable, Callable, int]]:
+    """(row name, setup, fn, items per call) — reported per observation."""
+    rng     = random.Random(42)
+    records, alerts, counts = [], [], []
+    for case in itertools.islice(itertools.cycle(cases.values()), BATCH_SIZE):
+        wd = copy.deepcopy(case["current"])
+        for key in ("rh", "temp", "wind_spd"):
+            if wd.get(key) is not None:
+                wd[key] = round(wd[key] * rng.uniform(0.8, 1.2), 1)
+        records.append(wd)
+        alerts.append(case["alerts"])
+        counts.append(len(case["strikes"]))
+    numpy = th.np
+
+    def scalar_loop():
+        out = []
+        for wd, a, c in zip(records, alerts, counts):
+            out.append((th.calculate_fire_risk(wd), th.detect_lightning(wd, a, c),
+                        th.derive_condition(wd)))
+        return out
+
+    def use(np_module):
+        return lambda: setattr(th, "np", np_module)
+
+    rows = [(f"scalar_loop[{BATCH_SIZE}]", use(numpy), scalar_loop, BATCH_SIZE)]
+    if numpy is not None:
+        rows.append((f"batch_numpy[{BATCH_SIZE}]", use(numpy),
+                     lambda: th.score_weather_batch(records, alerts, counts), BATCH_SIZE))
+    rows.append((f"batch_python[{BATCH_SIZE}]", use(None),
+                 lambda: th.score_weather_batch(records, alerts, counts), BATCH_SIZE))
+    return rows
+
+class Suite:
+    """
+    Measures the rows as (row ns, calibration ns) pairs — the calibration
+    loop is timed right before each sample, so both sides of a ratio saw the
+    same machine — and reports the median of each row's samples.  Measuring
+    a row again adds samples, so a re-measured row gets a steadier median.
+    """
+
+    def __init__(self, th, repeat: int, rounds: int, min_run_s: float, only: Optional[str]):
+        self.th, self.repeat, self.rounds, self.min_run_s = th, repeat, rounds, min_run_s
+        self.numpy  = th.np
+        self.cases  = load_fixtures()
+        self.benches: dict = {}
+        for name, case in self.cases.items():
+            for row, setup, fn in case_benchmarks(th, name, case):
+                self.benches[row] = (setup, fn, 1)
+        for row, setup, fn, per in batch_benchmarks(th, self.cases):
+            self.benches[row] = (setup, fn, per)
+        if only:
+            self.benches = {k: v for k, v in self.benches.items() if only in k}
+        self.samples: dict = {}                 # row → [(ns per item, calibration ns)]
+        self.memory:  dict = {}                 # row → (peak bytes, blocks) per item
+        self._calibration = _calibration()
+        self._cal_number  = autorange(self._calibration, min_run_s)
+        self._numbers:    dict = {}
+
+    def measure(self, name: str) -> None:
+        setup, fn, per = self.benches[name]
+        try:
+            setup()
+            if name not in self._numbers:
+                self._numbers[name] = autorange(fn, self.min_run_s)
+            for _ in range(self.rounds):
+                cal = time_ns(self._calibration, self._cal_number, self.repeat)
+                ns  = time_ns(fn, self._numbers[name], self.repeat) / per
+                self.samples.setdefault(name, []).append((ns, cal))
+            if name not in self.memory:
+                peak, kept = allocations(fn)
+                self.memory[name] = (peak / per, kept / per)
+        finally:
+            self.th.np = self.numpy
+
+    def run(self) -> None:
+        for name in self.benches:
+            self.measure(name)
+
+    def report(self) -> dict:
+        cals = [cal for pairs in self.samples.values() for _, cal in pairs]
+        return {
+            "generated_at":   datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python":         platform.python_version(),
+            "platform":       platform.platform(terse=True),
+            "pydantic":       _version("pydantic"),
+            "numpy":          _version("numpy"),
+            "calibration_ns": round(statistics.median(cals), 1) if cals else None,
+            "results": {
+                name: {
+                    "ns":     round(statistics.median(ns for ns, _ in pairs), 1),
+                    "rel":    round(statistics.median(ns / cal for ns, cal in pairs), 3),
+                    "peak_b": round(self.memory[name][0], 1),
+                    "blocks": round(self.memory[name][1], 2),
+                }
+                for name, pairs in self.samples.items()
+            },
+        }
+
+def _version(module: str) -> Optional[str]:
+    try:
+        return __import__(module).__version__
+    except ImportError:
+        return None
+
+# ─── Baseline comparison ─────────────────────────────────────────────────────
+
+def compare(
+    current: dict, baseline: dict, time_tol: float, mem_tol: float,
+    floor_ns: float = 0.0, gate_all: bool = False,
+) -> list[dict]:
+    rows  = []
+    floor = floor_ns / current["calibration_ns"] if current["calibration_ns"] else 0.0
+    for name, now in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        row  = {"name": name, **now, "status": "new" if base is None else "ok", "why": [], "note": []}
+        if base is not None:
+            row["change"] = round(now["rel"] / base["rel"] - 1, 3) if base["rel"] else None
+            if now["rel"] > base["rel"] * (1 + time_tol) and now["rel"] - base["rel"] > floor:
+                if gate_all or name.startswith(TIME_GATED):
+                    row["why"].append(f"time +{row['change']:.0%}")
+                else:
+                    row["note"].append("time not gated")
+            # Small absolute slack: a few bytes of allocator rounding is not a regression.
+            if now["peak_b"] > base["peak_b"] * (1 + mem_tol) + 64:
+                row["why"].append(f"peak {base['peak_b']:g}→{now['peak_b']:g} B")
+            if now["blocks"] > base["blocks"] * (1 + mem_tol) + 1:
+                row["why"].append(f"blocks {base['blocks']:g}→{now['blocks']:g}")
+            if row["why"]:
+                row["status"] = "REGRESSED"
+        rows.append(row)
+    return rows
+
+def print_table(rows: list[dict], current: dict, baseline: Optional[dict]) -> None:
+    print(f"\ncalibration {current['calibration_ns']} ns · python {current['python']} · "
+          f"pydantic {current['pydantic']} · numpy {current['numpy']}")
+    if baseline:
+        print(f"baseline    {baseline.get('generated_at')} · calibration {baseline.get('calibration_ns')} ns"
+              f" · python {baseline.get('python')} · pydantic {baseline.get('pydantic')}")
+        for key in ("python", "pydantic", "numpy"):
+            if baseline.get(key) != current[key]:
+                print(f"  note: {key} differs from the baseline — allocation figures may shift")
+    print(f"\n{'benchmark':<30}{'ns':>11}{'rel':>9}{'peak_b':>9}{'blocks':>8}{'vs base':>9}  status")
+    for r in rows:
+        change = f"{r['change']:+.0%}" if r.get("change") is not None else "—"
+        status = r["status"] + (f" ({', '.join(r['why'] or r['note'])})" if r["why"] or r["note"] else "")
+        print(f"{r['name']:<30}{r['ns']:>11,.0f}{r['rel']:>9.2f}{r['peak_b']:>9,.0f}"
+              f"{r['blocks']:>8g}{change:>9}  {status}")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Hot-path micro-benchmarks with a regression gate.")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--only", help="run rows whose name contains this")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per sample (best is kept)")
+    parser.add_argument("--rounds", type=int, default=5, help="samples per row (median is kept)")
+    parser.add_argument("--min-run-ms", type=float, default=50)
+    parser.add_argument("--time-tolerance", type=float, default=0.30, help="allowed rel slowdown")
+    parser.add_argument("--time-floor-ns", type=float, default=1000,
+                        help="slowdowns smaller than this per call never fail the run")
+    parser.add_argument("--gate-all", action="store_true", help="gate the time of every row")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10)
+    parser.add_argument("--retries", type=int, default=2, help="re-measure rows that look slower")
+    parser.add_argument("--json", help="also write this run's results here")
+    args = parser.parse_args()
+
+    th = fakes.load_app()
+    th.logger.setLevel("WARNING")
+    suite = Suite(th, args.repeat, args.rounds, args.min_run_ms / 1000, args.only)
+    suite.run()
+    if args.update:
+        suite.run()                            # a baseline takes the median of two full passes
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.update:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    gate = dict(floor_ns=args.time_floor_ns, gate_all=args.gate_all)
+    rows = compare(suite.report(), baseline or {}, args.time_tolerance, args.memory_tolerance, **gate)
+    for _ in range(args.retries):
+        # Timing noise only ever makes a row look slower; re-measure before blaming the code.
+        slow = [r["name"] for r in rows if any(w.startswith("time") for w in r["why"])]
+        if not slow:
+            break
+        for name in slow:
+            suite.measure(name)
+        rows = compare(suite.report(), baseline or {}, args.time_tolerance, args.memory_tolerance, **gate)
+    current = suite.report()
+    print_table(rows, current, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+    if args.update:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+            f.write("\n")
+        print(f"\nbaseline written: {args.baseline}")
+        return 0
+
+    regressed = [r["name"] for r in rows if r["status"] == "REGRESSED"]
+    if regressed:
+        print(f"\nFAIL — {len(regressed)} regression(s): {', '.join(regressed)}")
+        return 1
+    if baseline is None:
+        print("\nno baseline yet — run with --update to record one")
+    else:
+        print("\nOK — no regressions against the baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -90,6 +90,33 @@ resource "google_secret_manager_secret_iam_member" "secret_access" {
   member    = "serviceAccount:${data.google_project.current.number}-compute@developer.gserviceaccount.com"
 }
 
+# --- 6. Firestore Indexes ---
+# /weather/history reads one subscriber's records newest first:
+#   where uid == X  order by recorded_at desc, __name__ desc
+# This composite index makes that a range read over that user's entries only,
+# however large weather_records grows.
+resource "google_firestore_index" "weather_records_by_uid" {
+  collection = "weather_records"
+
+  fields {
+    field_path = "uid"
+    order      = "ASCENDING"
+  }
+  fields {
+    field_path = "recorded_at"
+    order      = "DESCENDING"
+  }
+}
+
+# active_alerts is a large array that is never filtered on — skip its
+# automatic single-field indexes to keep write cost down.
+resource "google_firestore_field" "weather_records_active_alerts" {
+  collection = "weather_records"
+  field      = "active_alerts"
+
+  index_config {}
+}
+
 # --- Variables & Data ---
 data "google_project" "current" {}
 
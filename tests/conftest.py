@@ -0,0 +1,18 @@
+import os
+import sys
+import importlib.util
+
+import pytest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "thorshammer_v2.1.py")
+
+@pytest.fixture(scope="session")
+def th():
+    """The service module, loaded in dev mode (its file name is not importable as-is)."""
+    os.environ.setdefault("ENV", "development")
+    os.environ.setdefault("WEATHERBIT_API_KEY", "test")
+    spec   = importlib.util.spec_from_file_location("thorshammer", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["thorshammer"] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,87 @@
+import gzip
+import json
+
+import pytest
+
+ROWS = [{"lat": 38.1 + i / 1000, "lon": -105.4, "ts": 1_750_000_000 + i} for i in range(60)]
+
+def _request(th, **headers):
+    return th.Request({
+        "type":    "http",
+        "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()],
+    })
+
+def _body(resp) -> bytes:
+    coding = resp.headers.get("content-encoding")
+    if coding == "gzip":
+        return gzip.decompress(resp.body)
+    if coding == "br":
+        import brotli
+        return brotli.decompress(resp.body)
+    return resp.body
+
+# ─── Format ──────────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("fmt, headers, expected", [
+    (None,       {},                                                  "json"),
+    (None,       {"accept": "application/json"},                      "json"),
+    (None,       {"accept": "application/vnd.thorshammer.columnar+json"}, "columnar"),
+    ("COLUMNAR", {"accept": "application/json"},                      "columnar"),
+    ("json",     {"accept": "application/vnd.thorshammer.columnar+json"}, "json"),
+])
+def test_negotiate_format(th, fmt, headers, expected):
+    assert th._negotiate_format(_request(th, **headers), fmt) == expected
+
+def test_unknown_fmt_is_400(th):
+    with pytest.raises(th.HTTPException) as e:
+        th._negotiate_format(_request(th), "xml")
+    assert e.value.status_code == 400
+
+def test_msgpack_without_the_package(th, monkeypatch):
+    monkeypatch.setattr(th, "msgpack", None)
+    with pytest.raises(th.HTTPException) as e:
+        th._negotiate_format(_request(th), "msgpack")
+    assert e.value.status_code == 406
+    # Accept is only a preference, so it falls back instead of failing.
+    assert th._negotiate_format(_request(th, accept="application/msgpack"), None) == "json"
+
+def test_msgpack_round_trip(th):
+    if th.msgpack is None:
+        pytest.skip("msgpack not installed")
+    resp = th.encoded_response(_request(th, accept="application/x-msgpack"), {"strikes": ROWS}, "strikes")
+    assert resp.media_type == "application/msgpack"
+    assert th.msgpack.unpackb(_body(resp)) == {"strikes": ROWS}
+
+def test_columnar_round_trip(th):
+    payload = {"strikes": ROWS + [{"lat": 1.0, "extra": True}], "next_cursor": "abc"}
+    resp = th.encoded_response(_request(th), payload, "strikes", fmt="columnar")
+    out  = json.loads(_body(resp))
+    cols = out["strikes"]["columns"]
+    assert resp.media_type == th.COLUMNAR_MEDIA_TYPE
+    assert out["encoding"] == "columnar" and out["next_cursor"] == "abc"
+    assert out["strikes"]["length"] == len(payload["strikes"])
+    rows = [{k: cols[k][i] for k in cols if cols[k][i] is not None} for i in range(out["strikes"]["length"])]
+    assert rows == payload["strikes"]
+
+# ─── Compression ─────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("",                    None),
+    ("gzip",                "gzip"),
+    ("gzip;q=0",            None),
+    ("identity, *",         "gzip"),
+    ("gzip;q=0.5, br",      "br"),
+    ("br;q=0, gzip",        "gzip"),
+    ("br;q=bogus, gzip",    "gzip"),
+])
+def test_content_encoding(th, accept_encoding, expected):
+    if expected == "br" and th.brotli is None:
+        expected = "gzip"
+    resp = th.encoded_response(_request(th, accept_encoding=accept_encoding), {"strikes": ROWS}, "strikes")
+    assert resp.headers.get("content-encoding") == expected
+    assert resp.headers["vary"] == "Accept, Accept-Encoding"
+    assert json.loads(_body(resp)) == {"strikes": ROWS}
+
+def test_small_bodies_are_not_compressed(th):
+    resp = th.encoded_response(_request(th, accept_encoding="gzip, br"), {"strikes": ROWS[:1]}, "strikes")
+    assert "content-encoding" not in resp.headers
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+def _cache(th, **kw):
+    kw.setdefault("grid_deg", 0.02)
+    kw.setdefault("ttls", {"current": 60})
+    kw.setdefault("stale_s", 30)
+    kw.setdefault("max_bytes", 1 << 20)
+    return th.GeoCache(**kw)
+
+def _loader(values):
+    """Loader that returns the next of `values` per call and records the cells it was asked for."""
+    calls = []
+
+    async def load(lat, lon):
+        calls.append((lat, lon))
+        await asyncio.sleep(0)
+        return values[len(calls) - 1]
+    return load, calls
+
+def _age(cache, seconds: float) -> None:
+    """Moves every entry's freshness deadline `seconds` into the past."""
+    for key, (value, fresh_until, size) in list(cache._entries.items()):
+        cache._entries[key] = (value, fresh_until - seconds, size)
+
+def test_same_cell_is_one_upstream_call(th):
+    cache = _cache(th)
+    load, calls = _loader([{"temp": 20}])
+
+    async def scenario():
+        a = await cache.get_or_load("current", 38.1301, -105.4601, load)
+        b = await cache.get_or_load("current", 38.1399, -105.4699, load)
+        return a, b
+
+    assert asyncio.run(scenario()) == ({"temp": 20}, {"temp": 20})
+    assert calls == [cache.cell(38.1301, -105.4601)]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_expired_past_stale_window_reloads(th):
+    cache = _cache(th)
+    load, calls = _loader([{"temp": 20}, {"temp": 25}])
+
+    async def scenario():
+        await cache.get_or_load("current", 38.13, -105.46, load)
+        _age(cache, 60 + 30 + 1)
+        return await cache.get_or_load("current", 38.13, -105.46, load)
+
+    assert asyncio.run(scenario()) == {"temp": 25}
+    assert len(calls) == 2 and cache.misses == 2 and cache.stale_hits == 0
+
+def test_stale_value_served_while_revalidating(th):
+    cache = _cache(th)
+    load, calls = _loader([{"temp": 20}, {"temp": 25}])
+
+    async def scenario():
+        await cache.get_or_load("current", 38.13, -105.46, load)
+        _age(cache, 60 + 1)
+        stale = await cache.get_or_load("current", 38.13, -105.46, load)
+        await asyncio.gather(*cache._tasks)
+        fresh = await cache.get_or_load("current", 38.13, -105.46, load)
+        return stale, fresh
+
+    assert asyncio.run(scenario()) == ({"temp": 20}, {"temp": 25})
+    assert len(calls) == 2
+    assert (cache.stale_hits, cache.hits, cache.misses) == (1, 1, 1)
+
+def test_failed_load_is_not_cached(th):
+    cache = _cache(th)
+    load, calls = _loader([None, {"temp": 20}])
+
+    async def scenario():
+        first  = await cache.get_or_load("current", 38.13, -105.46, load)
+        second = await cache.get_or_load("current", 38.13, -105.46, load)
+        return first, second
+
+    assert asyncio.run(scenario()) == (None, {"temp": 20})
+    assert len(calls) == 2
+
+def test_lru_evicts_least_recently_used(th):
+    value = {"pad": "x" * 100}
+    size  = len(th.json.dumps(value))
+    cache = _cache(th, max_bytes=2 * size)
+    load, _ = _loader([value] * 4)
+    a, b, c = (38.01, -105.01), (38.11, -105.11), (38.21, -105.21)
+
+    async def scenario():
+        await cache.get_or_load("current", *a, load)
+        await cache.get_or_load("current", *b, load)
+        await cache.get_or_load("current", *a, load)    # a is now more recent than b
+        await cache.get_or_load("current", *c, load)    # over budget: b goes
+
+    asyncio.run(scenario())
+    cells = {key[1:3] for key in cache._entries}
+    assert cells == {cache.cell(*a), cache.cell(*c)}
+    assert cache.evictions == 1 and cache._bytes == 2 * size
+
+@pytest.mark.parametrize("lat, lon", [(38.0, -105.0), (38.019, -105.001), (-0.001, 0.001)])
+def test_cell_is_centre_of_its_grid_square(th, lat, lon):
+    clat, clon = _cache(th).cell(lat, lon)
+    assert abs(clat - lat) <= 0.01 + 1e-9 and abs(clon - lon) <= 0.01 + 1e-9
+    assert _cache(th).cell(clat, clon) == (clat, clon)
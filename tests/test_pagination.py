@@ -0,0 +1,90 @@
+import base64
+import json
+
+import pytest
+
+@pytest.fixture
+def store(th, monkeypatch):
+    """An in-memory store and an empty page cache in place of the module's."""
+    local = th.TieredStore(th.LocalStore(":memory:"))
+    monkeypatch.setattr(th, "store", local)
+    monkeypatch.setattr(th, "history_pages", th.PageCache())
+    return local
+
+def _raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+# ─── Cursor encoding ─────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("value, doc_id", [
+    ("2025-06-01T12:00:00+00:00", "MISSION-20250601-120000"),
+    (1_750_000_000, "a"),
+    (0.5, "ünïcode/id"),
+    ("", ""),
+])
+def test_cursor_round_trip(th, value, doc_id):
+    cursor = th._encode_cursor(value, doc_id)
+    assert "=" not in cursor and "/" not in cursor and "+" not in cursor
+    assert th._decode_cursor(cursor) == (value, doc_id)
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    _raw_cursor("just a string"),
+    _raw_cursor(["2025-06-01"]),
+    _raw_cursor([{"a": 1}, "x"]),
+    _raw_cursor([["nested"], "x"]),
+    _raw_cursor([None, "x"]),
+    _raw_cursor([True, "x"]),
+    _raw_cursor(["2025-06-01", 7]),
+    _raw_cursor(["2025-06-01", {"id": "x"}]),
+])
+def test_crafted_cursor_is_400(th, cursor):
+    with pytest.raises(th.HTTPException) as e:
+        th._decode_cursor(cursor)
+    assert e.value.status_code == 400
+
+# ─── keyset_page ─────────────────────────────────────────────────────────────
+
+def test_pages_cover_every_document_once(th, store):
+    # Runs of equal timestamps straddle page boundaries; the id breaks the tie.
+    for i in range(23):
+        store.set("drone_missions", f"M{i:02d}", {"created_at": f"2025-06-01T12:{i // 4:02d}:00", "n": i})
+    expected = sorted(
+        ((d["created_at"], doc_id) for doc_id, d in store.query("drone_missions")), reverse=True
+    )
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = th.keyset_page("drone_missions", "created_at", 5, cursor)
+        seen += [(item["created_at"], f"M{item['n']:02d}") for item in page["items"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+        assert th._decode_cursor(cursor) == seen[-1]
+
+    assert seen == expected and pages == 5
+
+def test_exact_multiple_has_no_empty_last_page(th, store):
+    for i in range(10):
+        store.set("drone_missions", f"M{i}", {"created_at": f"2025-06-01T12:0{i}:00"})
+    first  = th.keyset_page("drone_missions", "created_at", 5)
+    second = th.keyset_page("drone_missions", "created_at", 5, first["next_cursor"])
+    assert len(second["items"]) == 5 and second["next_cursor"] is None
+
+def test_filtered_pages(th, store):
+    for i in range(6):
+        store.set("weather_records", f"r{i}", {"uid": "u1" if i % 2 else "u2", "recorded_at": f"2025-06-01T0{i}:00"})
+    page = th.keyset_page("weather_records", "recorded_at", 10, where=(("uid", "==", "u1"),))
+    assert [r["recorded_at"][11:13] for r in page["items"]] == ["05", "03", "01"]
+    assert page["next_cursor"] is None
+
+def test_parse_fields_keeps_the_order_field(th):
+    allowed = frozenset({"status", "created_at", "mission_id"})
+    assert th.parse_fields("status, mission_id,status", allowed, "created_at") == [
+        "status", "mission_id", "created_at",
+    ]
+    assert th.parse_fields(None, allowed, "created_at") is None
+    with pytest.raises(th.HTTPException) as e:
+        th.parse_fields("status,secret", allowed, "created_at")
+    assert e.value.status_code == 400
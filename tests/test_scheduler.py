@@ -0,0 +1,149 @@
+import time
+import asyncio
+from types import SimpleNamespace
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+# ─── CronTrigger.next_after ──────────────────────────────────────────────────
+
+@pytest.mark.parametrize("expr, after, expected", [
+    # daily summary: same day, then the next day once it has fired
+    ("59 23 * * *",    utc(2025, 6, 1, 12, 0),      utc(2025, 6, 1, 23, 59)),
+    ("59 23 * * *",    utc(2025, 6, 1, 23, 59),     utc(2025, 6, 2, 23, 59)),
+    ("59 23 * * *",    utc(2025, 6, 1, 23, 59, 30), utc(2025, 6, 2, 23, 59)),
+    # steps and stepped ranges
+    ("*/15 * * * *",   utc(2025, 6, 1, 10, 7),      utc(2025, 6, 1, 10, 15)),
+    ("0 9-17/4 * * *", utc(2025, 6, 1, 10, 0),      utc(2025, 6, 1, 13, 0)),
+    ("0 6,18 * * *",   utc(2025, 6, 1, 18, 0),      utc(2025, 6, 2, 6, 0)),
+    # month and year rollover
+    ("0 0 1 * *",      utc(2025, 1, 31, 10, 0),     utc(2025, 2, 1, 0, 0)),
+    ("0 0 1 * *",      utc(2025, 12, 15, 0, 0),     utc(2026, 1, 1, 0, 0)),
+    ("59 23 * * *",    utc(2025, 12, 31, 23, 59),   utc(2026, 1, 1, 23, 59)),
+    # day-of-month that some months lack is skipped, not clamped
+    ("0 12 31 * *",    utc(2025, 4, 1, 0, 0),       utc(2025, 5, 31, 12, 0)),
+    ("0 0 29 2 *",     utc(2025, 3, 1, 0, 0),       utc(2028, 2, 29, 0, 0)),
+    # day-of-week only (0 = Sunday); 2025-06-01 is a Sunday
+    ("30 3 * * 1",     utc(2025, 6, 1, 0, 0),       utc(2025, 6, 2, 3, 30)),
+    ("30 3 * * 0",     utc(2025, 6, 1, 3, 30),      utc(2025, 6, 8, 3, 30)),
+    # day-of-month AND day-of-week restricted: either one matching is enough
+    ("0 9 13 * 5",     utc(2025, 6, 1, 0, 0),       utc(2025, 6, 6, 9, 0)),
+    ("0 9 13 * 5",     utc(2025, 6, 10, 0, 0),      utc(2025, 6, 13, 9, 0)),
+    ("0 9 13 * 5",     utc(2025, 6, 13, 9, 0),      utc(2025, 6, 20, 9, 0)),
+    # one restricted, the other "*": the restricted one must match
+    ("0 9 13 * *",     utc(2025, 6, 1, 0, 0),       utc(2025, 6, 13, 9, 0)),
+])
+def test_cron_next_after(th, expr, after, expected):
+    assert th.CronTrigger(expr).next_after(after) == expected
+
+@pytest.mark.parametrize("expr", [
+    "* * * *",          # four fields
+    "60 * * * *",       # minute out of range
+    "0 24 * * *",
+    "0 0 0 * *",        # days start at 1
+    "0 0 * 13 *",
+    "0 0 * * 7",
+])
+def test_cron_rejects_bad_fields(th, expr):
+    with pytest.raises(ValueError):
+        th.CronTrigger(expr)
+
+def test_cron_that_never_fires(th):
+    with pytest.raises(ValueError):
+        th.CronTrigger("0 0 31 2 *").next_after(utc(2025, 1, 1))
+
+# ─── Misfire policy ──────────────────────────────────────────────────────────
+
+def _late_scheduler(th, late_s: float):
+    """A scheduler whose clock reads `late_s` past the first fire time once the job has planned it."""
+    sched = th.AsyncScheduler(SimpleNamespace(is_leader=True, ttl_s=90))
+    start = utc(2025, 6, 1, 12, 0)
+    reads = iter([start])
+    sched._now = lambda: next(reads, start + timedelta(seconds=60 + late_s))
+    return sched
+
+async def _one_cycle(sched, job) -> None:
+    loop = asyncio.create_task(sched._job_loop(job))
+    await asyncio.sleep(0.05)
+    loop.cancel()
+    await asyncio.gather(loop, *sched._tasks, return_exceptions=True)
+
+@pytest.mark.parametrize("misfire, runs, skipped", [("skip", 0, 1), ("run_once", 1, 0)])
+def test_misfire_past_grace(th, misfire, runs, skipped):
+    calls = []
+
+    async def job_fn():
+        calls.append(1)
+
+    sched = _late_scheduler(th, late_s=300)
+    job   = sched.add("late", job_fn, th.IntervalTrigger(60), misfire=misfire, misfire_grace_s=30)
+    asyncio.run(_one_cycle(sched, job))
+    assert (len(calls), job.skipped_misfire) == (runs, skipped)
+
+def test_late_within_grace_runs_under_skip(th):
+    calls = []
+
+    async def job_fn():
+        calls.append(1)
+
+    sched = _late_scheduler(th, late_s=10)
+    job   = sched.add("slightly-late", job_fn, th.IntervalTrigger(60), misfire="skip", misfire_grace_s=30)
+    asyncio.run(_one_cycle(sched, job))
+    assert len(calls) == 1 and job.skipped_misfire == 0
+
+def test_unknown_misfire_policy(th):
+    with pytest.raises(ValueError):
+        th.ScheduledJob("bad", lambda: None, th.IntervalTrigger(60), misfire="catch_up")
+
+# ─── Overlap guard ───────────────────────────────────────────────────────────
+
+def test_timed_out_thread_job_stays_running(th):
+    sched = th.AsyncScheduler(SimpleNamespace(is_leader=True, ttl_s=90))
+    job   = sched.add("slow", lambda: time.sleep(0.3), th.IntervalTrigger(60), timeout_s=0.05)
+
+    async def scenario():
+        run = asyncio.create_task(sched._run(job))
+        await asyncio.sleep(0.15)                   # past the timeout, thread still sleeping
+        still_running = job.running
+        await run
+        return still_running
+
+    assert asyncio.run(scenario()) is True
+    assert job.running is False
+    assert job.failures == 1 and job.runs == 1
+
+# ─── SchedulerLease (file lock, no Firestore) ────────────────────────────────
+
+def test_lease_has_one_holder_until_released(th, tmp_path):
+    path   = str(tmp_path / "scheduler.lock")
+    first  = th.SchedulerLease(lock_path=path)
+    second = th.SchedulerLease(lock_path=path)
+
+    assert first.tick() is True and first.tick() is True
+    assert second.tick() is False and second.is_leader is False
+
+    first.release()
+    assert first.is_leader is False
+    assert second.tick() is True
+    assert first.tick() is False
+    second.release()
+
+def test_release_without_lease_is_a_no_op(th, tmp_path):
+    path  = str(tmp_path / "scheduler.lock")
+    lease = th.SchedulerLease(lock_path=path)
+    lease.release()
+    assert lease.tick() is True
+    lease.release()
+
+def test_lease_check_error_stands_down(th, tmp_path, monkeypatch):
+    lease = th.SchedulerLease(lock_path=str(tmp_path / "scheduler.lock"))
+    assert lease.tick() is True
+
+    def broken():
+        raise OSError("volume gone")
+    monkeypatch.setattr(lease, "_file_tick", broken)
+    assert lease.tick() is False and lease.is_leader is False
+    th.os.close(lease._lock_fd)
@@ -0,0 +1,64 @@
+import pytest
+
+# Edge values sit on both sides of every threshold in calculate_fire_risk and
+# derive_condition; None and 0 exercise the scalar code's `x or default` rule.
+RECORDS = [
+    {},
+    {"rh": 0, "temp": 0, "wind_spd": 0, "precip": 0, "clouds": 0},
+    {"rh": None, "temp": None, "wind_spd": None, "precip": None, "clouds": None},
+    {"rh": 9.9, "temp": 38.1, "wind_spd": 12.1, "precip": 0.0, "clouds": 5},
+    {"rh": 10, "temp": 38, "wind_spd": 12, "precip": 0.01, "clouds": 25},
+    {"rh": 14.9, "temp": 32.1, "wind_spd": 8.1, "precip": 0.09, "clouds": 26},
+    {"rh": 15, "temp": 32, "wind_spd": 8, "precip": 0.10, "clouds": 75},
+    {"rh": 24.9, "temp": 27.1, "wind_spd": 5.1, "precip": 0.11, "clouds": 76},
+    {"rh": 25, "temp": 27, "wind_spd": 5, "precip": 2.0, "clouds": 50},
+    {"rh": 34.9, "temp": 22.1, "wind_spd": 3.1, "precip": 0.05, "clouds": 10},
+    {"rh": 35, "temp": 22, "wind_spd": 3, "precip": 0.2, "clouds": 10},
+    {"rh": 60, "temp": -5, "wind_spd": 1, "precip": 0, "clouds": 0},
+    {"rh": 5, "temp": 40, "wind_spd": 15, "precip": 0.6,
+     "weather": {"description": "Thunderstorm with heavy rain"}},
+    {"rh": 5, "temp": 40, "wind_spd": 15, "precip": 0.4,
+     "weather": {"description": "Thunderstorm with light rain"}},
+    {"rh": 20, "temp": 30, "precip": 0, "weather": {"description": "Dry LIGHTNING"}},
+    {"rh": 80, "temp": 5, "precip": 0, "weather": {"description": "Light snow"}},
+    {"rh": 70, "temp": 12, "precip": 0, "weather": {"description": "Drizzle"}},
+    {"rh": 40, "temp": 18, "clouds": 10, "weather": {"description": "Broken clouds"}},
+    {"rh": 40, "temp": 18, "weather": {"description": "Tornado"}},
+    {"rh": 40, "temp": 18, "weather": {"description": ""}},
+]
+
+ALERTS = [[{"title": "Severe Thunderstorm Warning", "description": ""}] if i % 5 == 0 else []
+          for i in range(len(RECORDS))]
+STRIKES = [i % 3 for i in range(len(RECORDS))]
+
+def _scalar(th, wd: dict, alerts: list, strikes: int) -> tuple:
+    score, level = th.calculate_fire_risk(wd)
+    lightning, dry = th.detect_lightning(wd, alerts, strikes)
+    return score, level, lightning, dry, th.derive_condition(wd)
+
+def _rows(out: dict) -> list[tuple]:
+    cols = ("fire_score", "fire_level", "lightning_nearby", "dry_lightning", "condition")
+    return [
+        (int(s), str(lv), bool(ln), bool(dry), str(c))
+        for s, lv, ln, dry, c in zip(*(list(out[k]) for k in cols))
+    ]
+
+@pytest.fixture(params=["numpy", "python"])
+def batch_path(request, th, monkeypatch):
+    if request.param == "numpy":
+        if th.np is None:
+            pytest.skip("numpy not installed")
+    else:
+        monkeypatch.setattr(th, "np", None)
+    return request.param
+
+def test_batch_matches_scalar(th, batch_path):
+    expected = [_scalar(th, wd, a, n) for wd, a, n in zip(RECORDS, ALERTS, STRIKES)]
+    assert _rows(th.score_weather_batch(RECORDS, ALERTS, STRIKES)) == expected
+
+def test_batch_without_alerts_or_strikes(th, batch_path):
+    expected = [_scalar(th, wd, [], 0) for wd in RECORDS]
+    assert _rows(th.score_weather_batch(RECORDS)) == expected
+
+def test_empty_batch(th, batch_path):
+    assert _rows(th.score_weather_batch([])) == []
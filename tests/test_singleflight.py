@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+def _counting_factory(result=None, error=None):
+    calls = []
+    gate  = asyncio.Event()
+
+    async def factory():
+        calls.append(1)
+        await gate.wait()
+        if error is not None:
+            raise error
+        return result
+    return factory, calls, gate
+
+def test_concurrent_callers_share_one_call(th):
+    sf = th.SingleFlight()
+
+    async def scenario():
+        factory, calls, gate = _counting_factory(result={"temp": 20})
+        waiters = [asyncio.create_task(sf.do(("current", 1), factory)) for _ in range(5)]
+        await asyncio.sleep(0)
+        in_flight = sf.in_flight(("current", 1))
+        gate.set()
+        return await asyncio.gather(*waiters), calls, in_flight
+
+    results, calls, in_flight = asyncio.run(scenario())
+    assert results == [{"temp": 20}] * 5
+    assert len(calls) == 1 and in_flight
+    assert sf.stats() == {"in_flight": 0, "leaders": 1, "followers": 4}
+
+def test_distinct_keys_do_not_coalesce(th):
+    sf = th.SingleFlight()
+
+    async def scenario():
+        async def factory_for(key):
+            await asyncio.sleep(0)
+            return key
+        return await asyncio.gather(*(sf.do(k, lambda k=k: factory_for(k)) for k in "abc"))
+
+    assert asyncio.run(scenario()) == ["a", "b", "c"]
+    assert sf.stats()["leaders"] == 3
+
+def test_error_reaches_every_waiter_and_clears_the_key(th):
+    sf = th.SingleFlight()
+
+    async def scenario():
+        factory, calls, gate = _counting_factory(error=ValueError("upstream 500"))
+        waiters = [asyncio.create_task(sf.do("k", factory)) for _ in range(3)]
+        await asyncio.sleep(0)
+        gate.set()
+        outcomes = await asyncio.gather(*waiters, return_exceptions=True)
+        retry = await sf.do("k", lambda: asyncio.sleep(0, result="ok"))
+        return outcomes, calls, retry
+
+    outcomes, calls, retry = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(isinstance(e, ValueError) and str(e) == "upstream 500" for e in outcomes)
+    assert retry == "ok" and not sf.in_flight("k")
+
+def test_cancelled_caller_does_not_cancel_the_flight(th):
+    sf = th.SingleFlight()
+
+    async def scenario():
+        factory, calls, gate = _counting_factory(result=42)
+        leader   = asyncio.create_task(sf.do("k", factory))
+        follower = asyncio.create_task(sf.do("k", factory))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        gate.set()
+        return await follower, calls
+
+    assert asyncio.run(scenario()) == (42, [1])
@@ -0,0 +1,92 @@
+import json
+import os
+from types import SimpleNamespace
+from typing import Optional
+
+import pytest
+
+class RecordingFirestore:
+    """Just enough of firestore.Client for WriteBehindBuffer._commit()."""
+
+    def __init__(self):
+        self.docs: dict = {}
+        self.commits = 0
+        self.fail_commits = 0                   # the next this many commits fail
+        self.fail_after: Optional[int] = None   # every commit past this many fails
+
+    def collection(self, name):
+        return SimpleNamespace(document=lambda doc_id: (name, doc_id))
+
+    def batch(self):
+        writes = []
+        db = self
+
+        def commit():
+            if db.fail_commits or (db.fail_after is not None and db.commits >= db.fail_after):
+                db.fail_commits = max(db.fail_commits - 1, 0)
+                raise RuntimeError("503 Service Unavailable")
+            db.commits += 1
+            for ref, data in writes:
+                db.docs[ref[1]] = data
+        return SimpleNamespace(set=lambda ref, data: writes.append((ref, data)), commit=commit)
+
+@pytest.fixture
+def db(th, monkeypatch):
+    fake = RecordingFirestore()
+    monkeypatch.setattr(th, "firestore_db", fake)
+    return fake
+
+@pytest.fixture
+def buffer(th, tmp_path):
+    return th.WriteBehindBuffer("weather_records", batch_size=2, spool_path=str(tmp_path / "spool.jsonl"))
+
+def _line(doc_id: str) -> str:
+    return json.dumps({"id": doc_id, "data": {"n": doc_id}}) + "\n"
+
+def test_torn_last_line_is_skipped_and_next_spill_survives(buffer, db):
+    with open(buffer.spool_path, "w") as f:
+        f.write(_line("a") + _line("b")[:12])       # killed halfway through writing b
+    buffer._spill([("c", {"n": "c"})])
+    buffer._replay_spool()
+    assert sorted(db.docs) == ["a", "c"]
+    assert buffer.replayed == 2
+    assert not os.path.exists(buffer.spool_path)
+    assert not os.path.exists(buffer.spool_path + ".replaying")
+
+def test_failed_replay_keeps_what_is_left(buffer, db):
+    with open(buffer.spool_path, "w") as f:
+        f.write("".join(_line(i) for i in "abcde"))
+    db.fail_after = 1                               # first chunk of two lands, then Firestore fails
+    buffer._replay_spool()
+
+    assert sorted(db.docs) == ["a", "b"]
+    with open(buffer.spool_path + ".replaying") as f:
+        assert [json.loads(line)["id"] for line in f] == ["c", "d", "e"]
+
+    db.fail_after = None
+    buffer._replay_spool()
+    assert sorted(db.docs) == list("abcde")
+    assert not os.path.exists(buffer.spool_path + ".replaying")
+
+def test_leftover_replay_file_goes_first(buffer, db):
+    with open(buffer.spool_path + ".replaying", "w") as f:
+        f.write(_line("old"))
+    with open(buffer.spool_path, "w") as f:
+        f.write(_line("new"))
+    buffer._replay_spool()
+    assert list(db.docs) == ["old"]                 # the newer spool waits for the next pass
+    buffer._replay_spool()
+    assert sorted(db.docs) == ["new", "old"]
+
+def test_failed_commit_spills_to_disk(buffer, db):
+    db.fail_commits = 1
+    assert buffer._commit([("a", {"n": "a"})]) is False
+    with open(buffer.spool_path) as f:
+        assert f.read() == _line("a")
+    assert buffer.spilled == 1
+
+def test_replaying_same_records_overwrites(buffer, db):
+    with open(buffer.spool_path, "w") as f:
+        f.write(_line("a") + _line("a"))
+    buffer._replay_spool()
+    assert db.docs == {"a": {"n": "a"}} and db.commits == 1
@@ -52,7 +52,8 @@
 ║                      Purpose: know who has a paid subscription               ║
 ║                                                                              ║
 ║       weather_records/  one document per /check-risk call                    ║
-║                      fields: all WeatherReport fields + timestamp            ║
+║                      fields: all WeatherReport fields + timestamp,           ║
+║                              uid, cell, recorded_at                          ║
 ║                      Purpose: history tab in the app, billing audit trail    ║
 ║                                                                              ║
 ║       drone_missions/  one document per dispatched mission, keyed by         ║
@@ -61,10 +62,19 @@
 ║                      Purpose: the FlutterFlow operator screen polls this;    ║
 ║                               both the backend and the app read/write it     ║
 ║                                                                              ║
+║       drone_prestage/  one document per forecast hour the drone should be    ║
+║                      ready for, keyed PRESTAGE-YYYYMMDD-HH                   ║
+║                      fields: status, target, expected_at, lead_hours         ║
+║                      Purpose: battery / crew readiness hours ahead           ║
+║                                                                              ║
 ║       daily_backups/   one document per calendar day                         ║
-║                      fields: record_count, mission_count, generated_at       ║
+║                      fields: record_count, mission_count, generated_at,      ║
+║                              fire_risk_histogram                             ║
 ║                      Purpose: lightweight daily summary / ops dashboard      ║
 ║                                                                              ║
+║       daily_counters/{date}/shards/{n}  per-document counts that feed        ║
+║                      daily_backups without scanning the day's documents      ║
+║                                                                              ║
 ║     Why not just use a local SQLite file or in-memory lists?                 ║
 ║     Because those live inside the Docker container.  When Docker restarts    ║
 ║     the container (OS patch, crash, redeploy) ALL that data is gone.         ║
@@ -72,14 +82,22 @@
 ║     When you eventually add a second CE instance, both containers read       ║
 ║     the same Firestore data automatically with zero code changes.            ║
 ║                                                                              ║
+║     We do keep a local SQLite file (backups/thorshammer.sqlite3, WAL mode)   ║
+║     — as a cache tier, not the source of truth.  Reads of hot documents      ║
+║     (subscribers, missions, history) are answered from it in well under a    ║
+║     millisecond; writes land there first and a background thread             ║
+║     replicates them to Firestore.  Without Firestore credentials the file    ║
+║     is the whole store, so dev and offline runs keep their data.             ║
+║                                                                              ║
 ║  3. Firebase Cloud Messaging (FCM)                                           ║
 ║     What it is: Google's push notification service.  It delivers alerts      ║
 ║     to Android and iOS devices even when the app is in the background.       ║
 ║     How we use it: When fire risk hits HIGH/EXTREME or dry lightning is      ║
-║     detected, broadcast_alert_to_subscribers() looks up every active         ║
-║     subscriber's stored FCM token in Firestore and sends each one a          ║
-║     push notification.  The FlutterFlow app stores its own FCM token         ║
-║     by calling /auth/register-fcm-token on first launch.                     ║
+║     detected, broadcast_alert_to_subscribers() takes every active            ║
+║     subscriber's stored FCM token from an in-memory audience index and       ║
+║     sends them a push notification in multicast batches.  The FlutterFlow    ║
+║     app stores its own FCM token by calling /auth/register-fcm-token on      ║
+║     first launch.                                                            ║
 ║                                                                              ║
 ║  All three services share one Firebase project and one service-account       ║
 ║  JSON credentials file.  One setup — three capabilities.                     ║
@@ -90,6 +108,8 @@
 ║    GET  /base-station                  → home screen weather tile            ║
 ║    POST /check-risk                    → user-location risk card             ║
 ║    GET  /lightning-strikes             → lightning map overlay               ║
+║    GET  /risk/grid                     → county risk map (per-cell)          ║
+║    GET  /risk/timeline                 → hourly forecast risk (next 48 h)    ║
 ║    GET  /weather/history               → history list screen                 ║
 ║    POST /billing/create-checkout-session → Stripe payment URL                ║
 ║    GET  /drone/missions/pending        → operator dispatch screen            ║
@@ -100,6 +120,9 @@
 ║    POST /drone/upload-image            → drone camera image receiver         ║
 ║    POST /notify                        → operator push (internal)            ║
 ║    GET  /health                        → uptime monitor probe                ║
+║    GET  /stream                        → live push (SSE): base station,      ║
+║                                          strikes, mission status             ║
+║    GET  /metrics                       → cache / upstream counters (ops)     ║
 ╚══════════════════════════════════════════════════════════════════════════════╝
 """
 
@@ -112,18 +135,35 @@ import asyncio
 import logging
 import threading
 import socket
-from datetime import datetime, timezone
+import math
+import uuid
+import fcntl
+import queue
+import random
+import gzip
+import base64
+import hashlib
+import inspect
+import zlib
+import sqlite3
+import re
+import itertools
+import concurrent.futures
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from email.utils import format_datetime, parsedate_to_datetime
+from datetime import datetime, timedelta, timezone
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 
 # ─── Third-Party ─────────────────────────────────────────────────────────────
-import requests
-import schedule
+import httpx
 from dotenv import load_dotenv
 from fastapi import (
     FastAPI, HTTPException, Header, BackgroundTasks,
-    UploadFile, File, Request
+    UploadFile, File, Request, Response
 )
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
@@ -137,12 +177,106 @@ load_dotenv()
 WEATHERBIT_KEY  = os.getenv("WEATHERBIT_API_KEY")
 WEATHERBIT_BASE = "https://api.weatherbit.io/v2.0"
 
+# Per-endpoint read timeouts (seconds).  /current is the only leg a report
+# cannot be built without, so it gets the most patience.
+WEATHERBIT_TIMEOUTS = {
+    "current":   float(os.getenv("WEATHERBIT_TIMEOUT_CURRENT",   "8")),
+    "alerts":    float(os.getenv("WEATHERBIT_TIMEOUT_ALERTS",    "6")),
+    "lightning": float(os.getenv("WEATHERBIT_TIMEOUT_LIGHTNING", "6")),
+    "forecast":  float(os.getenv("WEATHERBIT_TIMEOUT_FORECAST",  "10")),
+}
+WEATHERBIT_MAX_CONCURRENCY = int(os.getenv("WEATHERBIT_MAX_CONCURRENCY", "16"))
+WEATHERBIT_MAX_RETRIES     = int(os.getenv("WEATHERBIT_MAX_RETRIES", "2"))
+WEATHERBIT_BACKOFF_BASE_S  = 0.25    # first retry waits up to 0.25 s, then 0.5 s, ...
+WEATHERBIT_BACKOFF_CAP_S   = 4.0
+
+# assess_location() fan-out: fire /current, /alerts and /lightning together.
+# /current is required; alerts and lightning are optional legs that get
+# ASSESS_OPTIONAL_DEADLINE_S (measured from fan-out start) before the report
+# is composed without them and they are listed in WeatherReport.degraded.
+ASSESS_FANOUT              = os.getenv("ASSESS_FANOUT", "1") == "1"
+ASSESS_OPTIONAL_DEADLINE_S = float(os.getenv("ASSESS_OPTIONAL_DEADLINE_S", "2.5"))
+
+# Observation cache.  Coordinates are snapped to a WEATHER_CACHE_GRID_DEG grid
+# (0.02° ≈ 2.2 km N-S / 1.75 km E-W at 38°N) so nearby subscribers share one
+# upstream call.  Entries past their TTL are still served for
+# WEATHER_CACHE_STALE_S while a background refresh runs.
+WEATHER_CACHE_GRID_DEG  = float(os.getenv("WEATHER_CACHE_GRID_DEG", "0.02"))
+WEATHER_CACHE_TTL_S = {
+    "current":   float(os.getenv("WEATHER_CACHE_TTL_CURRENT",   "600")),
+    "alerts":    float(os.getenv("WEATHER_CACHE_TTL_ALERTS",    "300")),
+    "lightning": float(os.getenv("WEATHER_CACHE_TTL_LIGHTNING", "120")),
+}
+WEATHER_CACHE_STALE_S   = float(os.getenv("WEATHER_CACHE_STALE_S", "300"))
+WEATHER_CACHE_MAX_BYTES = int(os.getenv("WEATHER_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+# Strikes from /lightning are kept in an in-memory grid index for
+# STRIKE_INDEX_WINDOW_S.  A point counts as covered — proximity answered
+# locally, no upstream call — while a lightning query whose circle contains it
+# succeeded within the last STRIKE_INDEX_LIVE_S.
+LIGHTNING_RADIUS_KM   = float(os.getenv("LIGHTNING_RADIUS_KM", "50"))
+STRIKE_INDEX_CELL_DEG = float(os.getenv("STRIKE_INDEX_CELL_DEG", "0.1"))
+STRIKE_INDEX_WINDOW_S = float(os.getenv("STRIKE_INDEX_WINDOW_S", "3600"))
+STRIKE_INDEX_LIVE_S   = float(os.getenv("STRIKE_INDEX_LIVE_S", "600"))
+
+# Background lightning ingestion: one /lightning poll per interval over the
+# whole watch area (plus LIGHTNING_RADIUS_KM so every cell's circle is
+# covered).  New strikes get sequence numbers in a ring of LIGHTNING_RING_SIZE;
+# map clients page through it with /lightning-strikes?since=<cursor>.
+LIGHTNING_INGEST_INTERVAL_S = float(os.getenv("LIGHTNING_INGEST_INTERVAL_S", "60"))
+LIGHTNING_INGEST_RADIUS_KM  = float(os.getenv("LIGHTNING_INGEST_RADIUS_KM", "0"))   # 0 = derive from WATCH_GRID_BBOX
+LIGHTNING_RING_SIZE         = int(os.getenv("LIGHTNING_RING_SIZE", "20000"))
+
+# GET /stream (Server-Sent Events).  Each connection buffers at most
+# STREAM_QUEUE_MAX frames; a client that falls that far behind loses its
+# backlog and gets a "resync" event.  Idle connections get a comment ping
+# every STREAM_HEARTBEAT_S so Nginx and mobile networks keep them open.
+STREAM_QUEUE_MAX   = int(os.getenv("STREAM_QUEUE_MAX", "256"))
+STREAM_HEARTBEAT_S = float(os.getenv("STREAM_HEARTBEAT_S", "15"))
+STREAM_MAX_CLIENTS = int(os.getenv("STREAM_MAX_CLIENTS", "1000"))
+# base_station and missions events are relayed between the workers sharing
+# LOCAL_STORE_PATH through its event_log table, polled this often while the
+# worker has subscribers.  Entries older than STREAM_RELAY_KEEP_S are dropped.
+STREAM_RELAY_POLL_S = float(os.getenv("STREAM_RELAY_POLL_S", "0.5"))
+STREAM_RELAY_KEEP_S = float(os.getenv("STREAM_RELAY_KEEP_S", "300"))
+
+# /base-station serves the snapshot published by monitor_base_station().  If
+# the monitor has not published for this long (Weatherbit outage, fresh
+# start) the endpoint recomputes once and republishes.  The monitor runs on
+# one worker; the others pick its snapshot up from the local store at most
+# BASE_STATION_SNAPSHOT_SYNC_S after it is published.
+BASE_STATION_SNAPSHOT_MAX_AGE_S = float(os.getenv("BASE_STATION_SNAPSHOT_MAX_AGE_S", "1200"))
+BASE_STATION_SNAPSHOT_SYNC_S    = float(os.getenv("BASE_STATION_SNAPSHOT_SYNC_S", "10"))
+
+# List endpoints (/lightning-strikes, /weather/history, /drone/mission-log)
+# compress bodies of at least COMPRESS_MIN_BYTES when the client sends
+# Accept-Encoding: br (needs the brotli package) or gzip.
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL         = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY     = int(os.getenv("BROTLI_QUALITY", "5"))
+
 # ── Firebase / GCP ────────────────────────────────────────────────────────────
 # FIREBASE_CREDENTIALS_PATH: path to the service-account JSON you download from
 # Firebase Console → Project Settings → Service Accounts → Generate New Private Key
 FIREBASE_CREDS  = os.getenv("FIREBASE_CREDENTIALS_PATH", "firebase_credentials.json")
 GCP_PROJECT_ID  = os.getenv("GCP_PROJECT_ID", "thorshammer")
 
+# Google's public keys for Firebase ID tokens (kid → x509 PEM).  Refreshed in
+# the background so verify_firebase_token() never waits on this download.
+FIREBASE_CERTS_URL   = (
+    "https://www.googleapis.com/robot/v1/metadata/x509/"
+    "securetoken@system.gserviceaccount.com"
+)
+AUTH_TOKEN_CACHE_MAX = int(os.getenv("AUTH_TOKEN_CACHE_MAX", "10000"))
+
+# subscribers/{uid} entitlement cache.  Inactive / missing subscribers are
+# cached for the shorter negative TTL.  ENTITLEMENT_LISTENER=1 attaches a
+# Firestore snapshot listener so every uvicorn worker sees Stripe changes
+# made by any other worker within a second or two.
+ENTITLEMENT_TTL_S          = float(os.getenv("ENTITLEMENT_TTL_S", "300"))
+ENTITLEMENT_NEGATIVE_TTL_S = float(os.getenv("ENTITLEMENT_NEGATIVE_TTL_S", "60"))
+ENTITLEMENT_LISTENER       = os.getenv("ENTITLEMENT_LISTENER", "0") == "1"
+
 # ── Stripe ────────────────────────────────────────────────────────────────────
 STRIPE_SECRET_KEY     = os.getenv("STRIPE_SECRET_KEY")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
@@ -168,8 +302,119 @@ BASE_STATION_ELEV_M = 2987         # approx. 9,800 ft — confirm with topo surv
 DRONE_RECON_RADIUS_KM = 10.0       # Part 107 VLOS envelope until BVLOS cert
 DRONE_MAX_WIND_ABORT  = 12.0       # m/s (~27 mph) — hard abort threshold
 DRONE_RTH_BATTERY_PCT = 30         # % — return-to-home trigger
+DRONE_LIGHTNING_ABORT_KM   = 5.0   # no strike this close to the flight path …
+DRONE_LIGHTNING_LOOKBACK_S = 1800  # … within the last 30 min (30-30 rule)
 DRONE_MODEL           = "DJI Mavic Pro 4"
 
+# ── County watch grid ─────────────────────────────────────────────────────────
+# Watch points laid out every WATCH_GRID_STEP_KM across WATCH_GRID_BBOX
+# (min_lat,min_lon,max_lat,max_lon — default is the approximate extent of
+# Custer County).  WATCH_POLYGON, a JSON list of [lat, lon] vertices, drops
+# points outside the county line; WATCH_POINTS, a JSON list of
+# {"name", "lat", "lon"} objects, adds named sites on top of the grid.
+# A value that is not a JSON list is ignored (with a warning at startup).
+_invalid_env: list = []
+
+def _json_list_env(name: str) -> list:
+    try:
+        value = json.loads(os.getenv(name) or "[]")
+    except ValueError:
+        value = None
+    if not isinstance(value, list):
+        _invalid_env.append(name)
+        return []
+    return value
+
+WATCH_GRID_BBOX        = os.getenv("WATCH_GRID_BBOX", "37.90,-105.80,38.30,-105.05")
+WATCH_GRID_STEP_KM     = float(os.getenv("WATCH_GRID_STEP_KM", "10"))
+WATCH_POLYGON          = _json_list_env("WATCH_POLYGON")
+WATCH_POINTS           = _json_list_env("WATCH_POINTS")
+WATCH_GRID_CONCURRENCY = int(os.getenv("WATCH_GRID_CONCURRENCY", "8"))
+# /check-risk answers from the nearest grid cell when it is this fresh.
+RISK_GRID_MAX_AGE_S    = float(os.getenv("RISK_GRID_MAX_AGE_S", "1200"))
+RISK_FROM_GRID         = os.getenv("RISK_FROM_GRID", "1") == "1"
+# Only the scheduler leader refreshes the grid; it publishes the result to
+# risk_grid/latest and every other worker picks it up this often.
+RISK_GRID_SYNC_S       = float(os.getenv("RISK_GRID_SYNC_S", "60"))
+
+# ── Forecast timeline ─────────────────────────────────────────────────────────
+# Weatherbit's hourly forecast is pulled once per watch cell and kept until
+# the next model run should be out: runs every FORECAST_MODEL_CYCLE_H hours
+# from 00Z and land roughly FORECAST_MODEL_LAG_MIN minutes later.
+FORECAST_HOURS              = int(os.getenv("FORECAST_HOURS", "48"))
+FORECAST_MODEL_CYCLE_H      = int(os.getenv("FORECAST_MODEL_CYCLE_H", "6"))
+FORECAST_MODEL_LAG_MIN      = int(os.getenv("FORECAST_MODEL_LAG_MIN", "90"))
+# Forecast push alerts look this far ahead; drone pre-staging looks further.
+FORECAST_ALERT_HORIZON_H    = int(os.getenv("FORECAST_ALERT_HORIZON_H", "6"))
+FORECAST_PRESTAGE_HORIZON_H = int(os.getenv("FORECAST_PRESTAGE_HORIZON_H", "12"))
+
+# ── History paging ────────────────────────────────────────────────────────────
+# /weather/history and /drone/mission-log page with opaque keyset cursors.
+# Pages are cached for PAGE_CACHE_TTL_S so scrolling back and forth through
+# the history tab does not re-read the same documents.
+HISTORY_PAGE_MAX     = int(os.getenv("HISTORY_PAGE_MAX", "100"))
+PAGE_CACHE_TTL_S     = float(os.getenv("PAGE_CACHE_TTL_S", "30"))
+PAGE_CACHE_MAX_PAGES = int(os.getenv("PAGE_CACHE_MAX_PAGES", "512"))
+# weather_records written before history was scoped per subscriber have no
+# uid or recorded_at.  backfill_weather_history() gives them an ISO-8601
+# recorded_at taken from their timestamp.  They hold other users'
+# coordinates, so by default they stay unowned and out of every history;
+# set HISTORY_LEGACY_UID to a Firebase UID to hand them all to that account.
+HISTORY_LEGACY_UID     = os.getenv("HISTORY_LEGACY_UID", "")
+HISTORY_BACKFILL_BATCH = 400
+
+# ── Push broadcast ────────────────────────────────────────────────────────────
+FCM_MULTICAST_BATCH       = 500    # FCM hard limit per multicast request
+FCM_BROADCAST_CONCURRENCY = int(os.getenv("FCM_BROADCAST_CONCURRENCY", "4"))
+# Without ENTITLEMENT_LISTENER the audience index only sees this worker's
+# token registrations and Stripe events, so it is re-read from Firestore once
+# it is this old — in practice once per broadcast cycle.
+AUDIENCE_TTL_S            = float(os.getenv("AUDIENCE_TTL_S", "60"))
+
+# ── weather_records write-behind ──────────────────────────────────────────────
+# Records are buffered and committed with Firestore batched writes when
+# WRITE_BEHIND_BATCH records are waiting or WRITE_BEHIND_FLUSH_S has passed.
+# A full buffer blocks the caller for up to WRITE_BEHIND_PUT_TIMEOUT_S, then
+# the record goes to the spool file.  Failed commits also go to the spool and
+# are replayed after the next successful commit (backups/ is a volume).
+WRITE_BEHIND_BATCH         = int(os.getenv("WRITE_BEHIND_BATCH", "200"))
+WRITE_BEHIND_FLUSH_S       = float(os.getenv("WRITE_BEHIND_FLUSH_S", "5"))
+WRITE_BEHIND_MAX_PENDING   = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "5000"))
+WRITE_BEHIND_PUT_TIMEOUT_S = float(os.getenv("WRITE_BEHIND_PUT_TIMEOUT_S", "0.5"))
+WRITE_BEHIND_SPOOL         = os.getenv(
+    "WRITE_BEHIND_SPOOL", os.path.join("backups", "weather_records.spool.jsonl")
+)
+
+# ── Daily counters ────────────────────────────────────────────────────────────
+# daily_counters/{date}/shards/{0..N-1}: each counted document lands on the
+# shard its ID hashes to, so busy days never exceed Firestore's ~1 write/s
+# per-document guidance.  Counts are kept per document ID, which makes
+# committing the same records twice (spool replay, outbox retry) harmless.
+DAILY_COUNTER_SHARDS = int(os.getenv("DAILY_COUNTER_SHARDS", "10"))
+
+# ── Local state store ─────────────────────────────────────────────────────────
+# SQLite (WAL) file in front of Firestore.  Documents read from Firestore are
+# served locally for LOCAL_STORE_MAX_AGE_S; writes land locally first and an
+# outbox replicates them in batches of REPLICATION_BATCH.  Without Firestore
+# the file is the only store, so dev / offline runs keep their data.  The
+# workers of a container share the file; only the one holding an flock on
+# <file>.replicator.lock sends the outbox, and another one takes over within
+# REPLICATOR_TAKEOVER_S when that worker exits.
+LOCAL_STORE_PATH           = os.getenv(
+    "LOCAL_STORE_PATH", os.path.join("backups", "thorshammer.sqlite3")
+)
+LOCAL_STORE_MAX_AGE_S      = float(os.getenv("LOCAL_STORE_MAX_AGE_S", "30"))
+LOCAL_STORE_RETENTION_DAYS = int(os.getenv("LOCAL_STORE_RETENTION_DAYS", "30"))
+REPLICATION_BATCH          = int(os.getenv("REPLICATION_BATCH", "400"))
+REPLICATOR_TAKEOVER_S      = float(os.getenv("REPLICATOR_TAKEOVER_S", "5"))
+
+# ── Scheduler leader election ─────────────────────────────────────────────────
+# Only the lease holder runs scheduled jobs.  With Firestore the lease is the
+# document scheduler_leases/scheduler (works across CE instances); without it,
+# an flock on SCHEDULER_LOCK_PATH elects one worker inside this container.
+SCHEDULER_LEASE_TTL_S = float(os.getenv("SCHEDULER_LEASE_TTL_S", "90"))
+SCHEDULER_LOCK_PATH   = os.getenv("SCHEDULER_LOCK_PATH", os.path.join("backups", ".scheduler.lock"))
+
 # ═════════════════════════════════════════════════════════════════════════════
 # GCP STRUCTURED LOGGING
 # ─────────────────────────────────────────────────────────────────────────────
@@ -189,9 +434,13 @@ logging.basicConfig(
     datefmt="%Y-%m-%dT%H:%M:%SZ",
 )
 logger = logging.getLogger("ThorsHammer")
+# httpx logs every request URL at INFO — that URL carries the Weatherbit key.
+logging.getLogger("httpx").setLevel(logging.WARNING)
 
 if not WEATHERBIT_KEY:
     logger.warning("WEATHERBIT_API_KEY not set — weather calls will fail.")
+for _name in _invalid_env:
+    logger.warning(f"{_name} is not a JSON list — ignoring it.")
 
 # ═════════════════════════════════════════════════════════════════════════════
 # FIREBASE ADMIN SDK  (Firestore + Auth + FCM)
@@ -227,6 +476,7 @@ try:
         messaging as fcm_messaging,
         auth as fb_auth
     )
+    from google.auth import jwt as google_jwt   # ships with firebase-admin
 
     if os.path.exists(FIREBASE_CREDS):
         cred          = credentials.Certificate(FIREBASE_CREDS)
@@ -248,6 +498,665 @@ except ImportError:
         "Run: pip install firebase-admin --break-system-packages"
     )
 
+# ═════════════════════════════════════════════════════════════════════════════
+# LOCAL STATE STORE  (SQLite WAL tier in front of Firestore)
+# ─────────────────────────────────────────────────────────────────────────────
+# Firestore stays the source of truth every CE instance shares; this is a
+# per-container tier kept on the backups/ volume.
+#
+#   reads    store.get() answers from SQLite while the local copy is younger
+#            than max_age_s, or while it holds writes Firestore has not seen
+#            yet; otherwise it reads Firestore and keeps the result.
+#            store.query() runs in Firestore and lays this instance's
+#            unreplicated writes over the result, so a mission queued a
+#            moment ago already blocks the next auto-dispatch.
+#   writes   store.set() / update() / append() commit the document and an
+#            outbox row in one SQLite transaction and return.  A replicator
+#            thread commits the outbox to Firestore in order, as batched
+#            writes; whatever it has not sent survives a restart on disk.
+#   offline  firestore_db is None → SQLite is the whole store and queries
+#            run as SQL over json_extract().  Dev runs, field tests and load
+#            tests keep their subscribers, missions and history.
+# ═════════════════════════════════════════════════════════════════════════════
+
+_FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_SQL_OPS    = {"==": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+def _apply_write(doc: dict, op: str, data: dict) -> dict:
+    """set / merge / append applied to a document, as Firestore would (merge is top-level)."""
+    if op == "set":
+        return dict(data)
+    if op == "merge":
+        return {**doc, **data}
+    doc = dict(doc)
+    for field, values in data.items():     # append = ArrayUnion
+        current = list(doc.get(field) or [])
+        doc[field] = current + [v for v in values if v not in current]
+    return doc
+
+def _matches(doc: dict, where: tuple) -> bool:
+    for field, op, value in where:
+        have = doc.get(field)
+        if op == "in":
+            ok = have in value
+        elif op == "==":
+            ok = have == value
+        elif have is None:
+            ok = False                     # Firestore skips documents missing the field
+        elif op == "!=":
+            ok = have != value
+        else:
+            try:
+                ok = {"<": have < value, "<=": have <= value,
+                      ">": have > value, ">=": have >= value}[op]
+            except TypeError:
+                ok = False
+        if not ok:
+            return False
+    return True
+
+def _project(doc: dict, fields: Optional[list]) -> dict:
+    return {k: doc[k] for k in fields if k in doc} if fields else doc
+
+class LocalStore:
+    """
+    One SQLite file: docs(collection, id, data, fetched_at), the outbox of
+    writes waiting for Firestore, strike_feed — the numbered lightning feed
+    every worker sharing the file appends to — and event_log, which relays
+    /stream events between those workers.  A single connection
+    behind a lock — every statement here is well under a millisecond.  The
+    file is opened on first use, so importing this module touches no disk.
+    """
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS docs (
+               collection TEXT NOT NULL,
+               id         TEXT NOT NULL,
+               data       TEXT NOT NULL,
+               fetched_at REAL NOT NULL,
+               PRIMARY KEY (collection, id))""",
+        """CREATE TABLE IF NOT EXISTS outbox (
+               seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+               collection TEXT NOT NULL,
+               id         TEXT NOT NULL,
+               op         TEXT NOT NULL,
+               data       TEXT NOT NULL,
+               queued_at  REAL NOT NULL)""",
+        "CREATE INDEX IF NOT EXISTS outbox_doc ON outbox (collection, id)",
+        """CREATE TABLE IF NOT EXISTS strike_feed (
+               seq  INTEGER PRIMARY KEY AUTOINCREMENT,
+               key  TEXT NOT NULL UNIQUE,
+               data TEXT NOT NULL)""",
+        "CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT NOT NULL)",
+        """CREATE TABLE IF NOT EXISTS event_log (
+               seq    INTEGER PRIMARY KEY AUTOINCREMENT,
+               origin TEXT NOT NULL,
+               topic  TEXT NOT NULL,
+               data   TEXT NOT NULL,
+               at     REAL NOT NULL)""",
+        # Expression indexes for the queries this file runs (history, drone guard, log).
+        """CREATE INDEX IF NOT EXISTS docs_uid_recorded ON docs (collection,
+               json_extract(data, '$.uid'), json_extract(data, '$.recorded_at'))""",
+        "CREATE INDEX IF NOT EXISTS docs_status ON docs (collection, json_extract(data, '$.status'))",
+        "CREATE INDEX IF NOT EXISTS docs_created ON docs (collection, json_extract(data, '$.created_at'))",
+    )
+
+    def __init__(self, path: str = LOCAL_STORE_PATH):
+        self.path  = path
+        self._lock = threading.Lock()
+        self._db:  Optional[sqlite3.Connection] = None
+        self._feed_id: Optional[str] = None
+        self._claims:  dict = {}            # role → fd of the flock held for it
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # isolation_level=None → autocommit; write() opens its own transaction.
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")   # WAL + NORMAL: durable across app crashes
+            for stmt in self.SCHEMA:
+                db.execute(stmt)
+            self._db = db
+        return self._db
+
+    @staticmethod
+    def _expr(field: str) -> str:
+        if not _FIELD_NAME.match(field):
+            raise ValueError(f"Unsupported field name: {field!r}")
+        return f"json_extract(data, '$.{field}')"
+
+    @staticmethod
+    def _dumps(data: dict) -> str:
+        return json.dumps(data, default=_json_default, separators=(",", ":"))
+
+    def get(self, collection: str, doc_id: str) -> Optional[tuple[dict, float, bool]]:
+        """(document, fetched_at, has unreplicated writes) or None."""
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT data, fetched_at, EXISTS (SELECT 1 FROM outbox o"
+                " WHERE o.collection = d.collection AND o.id = d.id)"
+                " FROM docs d WHERE collection = ? AND id = ?",
+                (collection, doc_id),
+            ).fetchone()
+        return (json.loads(row[0]), row[1], bool(row[2])) if row else None
+
+    def put(self, collection: str, doc_id: str, data: Optional[dict], read_at: float) -> None:
+        """
+        Caches what Firestore returned at read_at (None = no such document).
+        Skipped when a local write is pending or newer than that read.
+        """
+        with self._lock:
+            db  = self._conn()
+            row = db.execute(
+                "SELECT fetched_at, EXISTS (SELECT 1 FROM outbox o"
+                " WHERE o.collection = d.collection AND o.id = d.id)"
+                " FROM docs d WHERE collection = ? AND id = ?",
+                (collection, doc_id),
+            ).fetchone()
+            if row and (row[1] or row[0] > read_at):
+                return
+            if data is None:
+                db.execute("DELETE FROM docs WHERE collection = ? AND id = ?", (collection, doc_id))
+            else:
+                db.execute(
+                    "INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?)",
+                    (collection, doc_id, self._dumps(data), read_at),
+                )
+
+    def write(self, collection: str, doc_id: str, op: str, data: dict, replicate: bool) -> dict:
+        """Applies one write and (if replicate) queues it for Firestore, atomically."""
+        with self._lock:
+            db = self._conn()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(
+                    "SELECT data FROM docs WHERE collection = ? AND id = ?", (collection, doc_id)
+                ).fetchone()
+                doc = _apply_write(json.loads(row[0]) if row else {}, op, data)
+                now = time.time()
+                db.execute(
+                    "INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?)",
+                    (collection, doc_id, self._dumps(doc), now),
+                )
+                if replicate:
+                    db.execute(
+                        "INSERT INTO outbox (collection, id, op, data, queued_at)"
+                        " VALUES (?, ?, ?, ?, ?)",
+                        (collection, doc_id, op, self._dumps(data), now),
+                    )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return doc
+
+    def query(
+        self,
+        collection:  str,
+        where:       tuple           = (),
+        order_by:    Optional[str]   = None,
+        descending:  bool            = False,
+        start_after: Optional[tuple] = None,
+        limit:       Optional[int]   = None,
+    ) -> list[tuple[str, dict]]:
+        """Firestore-style query as SQL; start_after = (order value, doc id)."""
+        sql, args = self._where("SELECT id, data FROM docs WHERE collection = ?", collection, where)
+        direction, cmp = ("DESC", "<") if descending else ("ASC", ">")
+        if order_by:
+            key = self._expr(order_by)
+            sql.append(f"AND {key} IS NOT NULL")
+            if start_after:
+                sql.append(f"AND ({key} {cmp} ? OR ({key} = ? AND id {cmp} ?))")
+                args += [start_after[0], start_after[0], start_after[1]]
+            sql.append(f"ORDER BY {key} {direction}, id {direction}")
+        else:
+            sql.append("ORDER BY id")
+        if limit:
+            sql.append("LIMIT ?")
+            args.append(limit)
+        with self._lock:
+            rows = self._conn().execute(" ".join(sql), args).fetchall()
+        return [(doc_id, json.loads(data)) for doc_id, data in rows]
+
+    def count(self, collection: str, where: tuple = ()) -> int:
+        """Number of documents query() would return for the same filters."""
+        sql, args = self._where("SELECT COUNT(*) FROM docs WHERE collection = ?", collection, where)
+        with self._lock:
+            return self._conn().execute(" ".join(sql), args).fetchone()[0]
+
+    def _where(self, select: str, collection: str, where: tuple) -> tuple[list, list]:
+        sql  = [select]
+        args = [collection]
+        for field, op, value in where:
+            expr = self._expr(field)
+            if op == "in":
+                sql.append(f"AND {expr} IN ({', '.join('?' * len(value))})")
+                args += [int(v) if isinstance(v, bool) else v for v in value]
+            elif op in _SQL_OPS:
+                sql.append(f"AND {expr} {_SQL_OPS[op]} ?")
+                # json_extract() returns JSON true / false as 1 / 0
+                args.append(int(value) if isinstance(value, bool) else value)
+            else:
+                raise ValueError(f"Unsupported operator: {op!r}")
+        return sql, args
+
+    def pending_docs(self, collection: str) -> list[tuple[str, dict]]:
+        """Current local state of every document with writes still in the outbox."""
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT id, data FROM docs d WHERE collection = ? AND EXISTS"
+                " (SELECT 1 FROM outbox o WHERE o.collection = d.collection AND o.id = d.id)",
+                (collection,),
+            ).fetchall()
+        return [(doc_id, json.loads(data)) for doc_id, data in rows]
+
+    def pending(self, limit: int) -> list[tuple[int, str, str, str, dict]]:
+        """Oldest outbox rows: (seq, collection, id, op, data)."""
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT seq, collection, id, op, data FROM outbox ORDER BY seq LIMIT ?", (limit,)
+            ).fetchall()
+        return [(seq, c, i, op, json.loads(data)) for seq, c, i, op, data in rows]
+
+    def ack(self, seqs: list[int]) -> None:
+        with self._lock:
+            self._conn().execute(
+                f"DELETE FROM outbox WHERE seq IN ({', '.join('?' * len(seqs))})", seqs
+            )
+
+    def prune(self, collection: str, field: str, before: str) -> int:
+        """Deletes replicated documents whose `field` sorts before `before`."""
+        with self._lock:
+            cur = self._conn().execute(
+                f"DELETE FROM docs WHERE collection = ? AND {self._expr(field)} < ?"
+                " AND NOT EXISTS (SELECT 1 FROM outbox o"
+                " WHERE o.collection = docs.collection AND o.id = docs.id)",
+                (collection, before),
+            )
+        return cur.rowcount
+
+    def claim(self, role: str) -> bool:
+        """
+        True once this process holds the flock on <file>.<role>.lock, which
+        makes it the one worker sharing the file that does `role`.  The lock
+        goes away with the process; an in-memory store is never shared.
+        """
+        if role in self._claims or self.path == ":memory:":
+            return True
+        lock_path = f"{self.path}.{role}.lock"
+        try:
+            os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+            fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            logger.error(f"Cannot open {lock_path}: {e}")
+            return False
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False                            # another worker holds it
+        self._claims[role] = fd
+        logger.info(f"This worker is the {role} for {self.path}.")
+        return True
+
+    def holds(self, role: str) -> bool:
+        return role in self._claims or self.path == ":memory:"
+
+    def meta_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn().execute("SELECT v FROM meta WHERE k = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def meta_set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn().execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def feed_id(self) -> str:
+        """Random id of this file's strike feed, fixed when the file is created."""
+        if self._feed_id is None:
+            with self._lock:
+                db = self._conn()
+                db.execute("INSERT OR IGNORE INTO meta VALUES ('feed_id', ?)", (uuid.uuid4().hex[:12],))
+                self._feed_id = db.execute("SELECT v FROM meta WHERE k = 'feed_id'").fetchone()[0]
+        return self._feed_id
+
+    def feed_append(self, items: list[tuple[str, dict]], keep: int) -> list[tuple[int, dict]]:
+        """
+        Numbers (key, strike) pairs no worker has added yet and returns them
+        as (seq, strike); keeps the newest `keep` rows.
+        """
+        added = []
+        with self._lock:
+            db = self._conn()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                for key, data in items:
+                    cur = db.execute(
+                        "INSERT OR IGNORE INTO strike_feed (key, data) VALUES (?, ?)",
+                        (key, self._dumps(data)),
+                    )
+                    if cur.rowcount:
+                        added.append((cur.lastrowid, data))
+                if added:
+                    db.execute(
+                        "DELETE FROM strike_feed WHERE seq <= (SELECT MAX(seq) FROM strike_feed) - ?",
+                        (keep,),
+                    )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return added
+
+    def feed_since(self, after: int) -> tuple[int, int, list[dict]]:
+        """(first seq held, last seq returned or held, strikes numbered after `after`)."""
+        with self._lock:
+            db = self._conn()
+            first, last = db.execute("SELECT MIN(seq), MAX(seq) FROM strike_feed").fetchone()
+            rows = db.execute(
+                "SELECT seq, data FROM strike_feed WHERE seq > ? ORDER BY seq", (after,)
+            ).fetchall()
+        # Another worker may have appended between the two statements.
+        last = max(last or 0, rows[-1][0] if rows else 0)
+        return (first or last + 1), last, [json.loads(data) for _, data in rows]
+
+    def feed_head(self) -> tuple[int, int]:
+        """(strikes held, last seq)."""
+        with self._lock:
+            count, last = self._conn().execute(
+                "SELECT COUNT(*), MAX(seq) FROM strike_feed"
+            ).fetchone()
+        return count, last or 0
+
+    def event_append(self, origin: str, topic: str, data: str, keep_s: float) -> None:
+        """Logs one /stream event for the other workers; drops entries older than keep_s."""
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            db.execute(
+                "INSERT INTO event_log (origin, topic, data, at) VALUES (?, ?, ?, ?)",
+                (origin, topic, data, now),
+            )
+            db.execute("DELETE FROM event_log WHERE at < ?", (now - keep_s,))
+
+    def events_after(self, after: int, origin: str) -> tuple[int, list[tuple[str, str]]]:
+        """(last seq, (topic, data) logged after `after` by anyone but `origin`)."""
+        with self._lock:
+            db = self._conn()
+            last = db.execute("SELECT MAX(seq) FROM event_log").fetchone()[0] or 0
+            rows = db.execute(
+                "SELECT seq, origin, topic, data FROM event_log WHERE seq > ? AND seq <= ? ORDER BY seq",
+                (after, last),
+            ).fetchall()
+        return last, [(topic, data) for _, o, topic, data in rows if o != origin]
+
+    def stats(self) -> dict:
+        with self._lock:
+            db     = self._conn()
+            docs   = db.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+            outbox, oldest = db.execute("SELECT COUNT(*), MIN(queued_at) FROM outbox").fetchone()
+        return {
+            "path":         self.path,
+            "documents":    docs,
+            "outbox":       outbox,
+            "outbox_age_s": round(time.time() - oldest, 1) if oldest else None,
+        }
+
+class TieredStore:
+    """
+    What the request paths read and write documents through.  Bulk and
+    coordination work — the broadcast audience, daily counters, the scheduler
+    lease, the daily summary — stays on firestore_db directly.
+    """
+
+    def __init__(
+        self,
+        local:      LocalStore,
+        max_age_s:  float = LOCAL_STORE_MAX_AGE_S,
+        batch_size: int   = REPLICATION_BATCH,
+    ):
+        self.local      = local
+        self.max_age_s  = max_age_s
+        # Firestore batch limit is 500 writes; leave room for the counter
+        # shards a hook adds (one per shard per day, two days at midnight).
+        self.batch_size = min(batch_size, 500 - 2 * DAILY_COUNTER_SHARDS)
+        # collection → hook(batch, rows) that adds writes to a replication batch
+        self.hooks:   dict = {}
+        self._wake    = threading.Event()
+        self._stop    = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.local_reads = self.remote_reads = self.fallbacks = self.writes = 0
+        self.commits = self.replicated = self.failures = 0
+
+    # ── reads ────────────────────────────────────────────────────────────────
+
+    def get(self, collection: str, doc_id: str, max_age_s: Optional[float] = None) -> Optional[dict]:
+        """One document or None.  Blocking — call via asyncio.to_thread from async code."""
+        hit     = self.local.get(collection, doc_id)
+        max_age = self.max_age_s if max_age_s is None else max_age_s
+        if not firestore_db or (hit and (hit[2] or time.time() - hit[1] < max_age)):
+            self.local_reads += 1
+            return hit[0] if hit else None
+
+        read_at = time.time()
+        try:
+            doc = firestore_db.collection(collection).document(doc_id).get()
+        except Exception as e:
+            if hit is None:
+                raise
+            logger.warning(f"Firestore read of {collection}/{doc_id} failed — serving local copy: {e}")
+            self.fallbacks += 1
+            return hit[0]
+        self.remote_reads += 1
+        data = doc.to_dict() if doc.exists else None
+        self.local.put(collection, doc_id, data, read_at)
+        return data
+
+    def cache(self, collection: str, doc_id: str, data: Optional[dict]) -> None:
+        """Records a document Firestore pushed to us (snapshot listeners)."""
+        self.local.put(collection, doc_id, data, time.time())
+
+    def query(
+        self,
+        collection:  str,
+        where:       tuple           = (),
+        order_by:    Optional[str]   = None,
+        descending:  bool            = False,
+        start_after: Optional[tuple] = None,
+        limit:       Optional[int]   = None,
+        fields:      Optional[list]  = None,
+    ) -> list[tuple[str, dict]]:
+        """
+        (id, document) pairs with Firestore semantics; start_after is
+        (order value, doc id).  Falls back to the local copy if Firestore
+        errors.  Blocking.
+        """
+        if firestore_db:
+            # Read the overlay first: a write acked after this still shows up
+            # in the Firestore result.
+            pending = self.local.pending_docs(collection)
+            try:
+                docs = self._remote_query(
+                    collection, where, order_by, descending, start_after,
+                    limit + len(pending) if limit else None, fields,
+                )
+            except Exception as e:
+                logger.warning(f"Firestore query on {collection} failed — answering locally: {e}")
+                self.fallbacks += 1
+            else:
+                self.remote_reads += 1
+                return self._overlay(docs, pending, where, order_by, descending, start_after, limit, fields)
+
+        self.local_reads += 1
+        rows = self.local.query(collection, where, order_by, descending, start_after, limit)
+        return [(doc_id, _project(data, fields)) for doc_id, data in rows]
+
+    @staticmethod
+    def _remote_query(collection, where, order_by, descending, start_after, limit, fields) -> dict:
+        query = firestore_db.collection(collection)
+        for field, op, value in where:
+            query = query.where(field, op, value)
+        if order_by:
+            direction = "DESCENDING" if descending else "ASCENDING"
+            query = query.order_by(order_by, direction=direction).order_by("__name__", direction=direction)
+            if start_after:
+                query = query.start_after({order_by: start_after[0], "__name__": start_after[1]})
+        if fields:
+            query = query.select(fields)
+        if limit:
+            query = query.limit(limit)
+        return {d.id: d.to_dict() for d in query.stream()}
+
+    @staticmethod
+    def _overlay(docs, pending, where, order_by, descending, start_after, limit, fields) -> list:
+        """Unreplicated local writes win over what Firestore returned."""
+        for doc_id, data in pending:
+            if _matches(data, where) and (not order_by or data.get(order_by) is not None):
+                docs[doc_id] = _project(data, fields)
+            else:
+                docs.pop(doc_id, None)
+        if order_by:
+            key  = lambda kv: (kv[1].get(order_by), kv[0])
+            rows = sorted(docs.items(), key=key, reverse=descending)
+            if start_after:
+                after = tuple(start_after)
+                rows  = [kv for kv in rows if (key(kv) < after if descending else key(kv) > after)]
+        else:
+            rows = sorted(docs.items())
+        return rows[:limit] if limit else rows
+
+    # ── writes ───────────────────────────────────────────────────────────────
+
+    def _write(self, collection: str, doc_id: str, op: str, data: dict, replicate: bool) -> dict:
+        replicate = replicate and firestore_db is not None
+        doc = self.local.write(collection, doc_id, op, data, replicate)
+        self.writes += 1
+        if replicate:
+            self._wake.set()
+        return doc
+
+    def set(
+        self, collection: str, doc_id: str, data: dict,
+        merge: bool = False, replicate: bool = True,
+    ) -> dict:
+        """
+        Local commit now, Firestore shortly after.  replicate=False keeps a
+        local copy of a document some other writer sends to Firestore.  A
+        merge first brings the local copy up to date, so it lands on the
+        whole document rather than on an empty one.
+        """
+        if merge and firestore_db:
+            self.get(collection, doc_id)
+        return self._write(collection, doc_id, "merge" if merge else "set", data, replicate)
+
+    def update(self, collection: str, doc_id: str, fields: dict) -> bool:
+        """Merges fields into an existing document; False if there is none."""
+        if self.get(collection, doc_id) is None:
+            return False
+        self._write(collection, doc_id, "merge", fields, True)
+        return True
+
+    def append(self, collection: str, doc_id: str, field: str, values: list) -> bool:
+        """ArrayUnion onto an existing document's array field; False if there is none."""
+        if self.get(collection, doc_id) is None:
+            return False
+        self._write(collection, doc_id, "append", {field: values}, True)
+        return True
+
+    # ── replication ──────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True, name="store-replicator")
+            self._thread.start()
+
+    def _hold_outbox(self) -> bool:
+        """True once this process is the one worker sending the shared outbox."""
+        return self.local.claim("replicator")
+
+    def _run(self) -> None:
+        backoff = 0.0
+        while not self._stop.is_set():
+            self._wake.clear()
+            if not self._hold_outbox():
+                self._stop.wait(REPLICATOR_TAKEOVER_S)
+                continue
+            rows = self.local.pending(self.batch_size)
+            if not rows:
+                self._wake.wait(1.0)
+                continue
+            if self._replicate(rows):
+                backoff = 0.0
+            else:
+                backoff = min(max(backoff * 2, 1.0), 60.0)
+                self._stop.wait(backoff)
+
+    def _replicate(self, rows: list) -> bool:
+        try:
+            batch = firestore_db.batch()
+            by_collection: dict = {}
+            for _, collection, doc_id, op, data in rows:
+                ref = firestore_db.collection(collection).document(doc_id)
+                if op == "set":
+                    batch.set(ref, data)
+                elif op == "merge":
+                    batch.set(ref, data, merge=True)
+                else:
+                    batch.set(ref, {f: firestore.ArrayUnion(v) for f, v in data.items()}, merge=True)
+                by_collection.setdefault(collection, []).append((op, doc_id, data))
+            for collection, hook in self.hooks.items():
+                if collection in by_collection:
+                    hook(batch, by_collection[collection])
+            batch.commit()
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Replication batch failed ({len(rows)} write(s)) — will retry: {e}")
+            return False
+        self.local.ack([row[0] for row in rows])
+        self.commits    += 1
+        self.replicated += len(rows)
+        return True
+
+    def drain(self, timeout: float = 10.0) -> None:
+        """
+        Stops the replicator and sends what it can; the rest waits on disk for
+        the next start.  A worker that does not hold the outbox leaves it to
+        the one that does.
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        if not firestore_db or not self._hold_outbox():
+            return
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            rows = self.local.pending(self.batch_size)
+            if not rows or not self._replicate(rows):
+                break
+        left = self.local.stats()["outbox"]
+        if left:
+            logger.warning(f"{left} local write(s) not yet in Firestore — kept in the outbox.")
+
+    def stats(self) -> dict:
+        return {
+            **self.local.stats(),
+            "local_reads":  self.local_reads,
+            "remote_reads": self.remote_reads,
+            "fallbacks":    self.fallbacks,
+            "writes":       self.writes,
+            "commits":      self.commits,
+            "replicated":   self.replicated,
+            "failures":     self.failures,
+            "replicator":   self._thread is not None and self._thread.is_alive(),
+            "outbox_owner": self.local.holds("replicator"),
+        }
+
+store = TieredStore(LocalStore())
+
 # ═════════════════════════════════════════════════════════════════════════════
 # STRIPE  (monthly subscription fee)
 # ─────────────────────────────────────────────────────────────────────────────
@@ -308,8 +1217,10 @@ class WeatherReport(BaseModel):
     fire_risk_level:        str              # LOW · MODERATE · HIGH · EXTREME
     lightning_nearby:       bool
     dry_lightning:          bool             # lightning + no rain = top ignition risk
+    nearest_strike_km:      Optional[float] = None   # within LIGHTNING_RADIUS_KM, when the strike feed covers the point
     active_alerts:          list
     drone_recon_recommended: bool
+    degraded:               list = []        # optional sources skipped at deadline: "alerts", "lightning"
     base_station_name:      str = BASE_STATION_NAME
 
 class SubscriberStatus(BaseModel):
@@ -363,11 +1274,136 @@ class CheckoutRequest(BaseModel):
 #   4. This function verifies the signature against Firebase Auth's public keys.
 #      If valid → returns the decoded payload (uid, email, etc.)
 #      If invalid/expired → raises HTTP 401
+#      Verified tokens are cached (by hash) until their own exp, so the
+#      repeat calls the app makes within the hour are a dictionary lookup.
 #
 #   5. The app automatically refreshes tokens before expiry — you don't need
 #      to handle token renewal in FlutterFlow manually.
 # ═════════════════════════════════════════════════════════════════════════════
 
+class FirebaseKeyRing:
+    """
+    Local copy of Google's Firebase ID-token signing keys.
+
+    run() refreshes the keys at 80 % of the Cache-Control max-age Google
+    sends (about every 5 hours), so verification is a local RS256 check.
+    The same claim checks as firebase_admin's verify_id_token() are applied.
+    Tokens signed with a kid we have not fetched yet fall back to
+    fb_auth.verify_id_token().
+    """
+
+    def __init__(self):
+        self.certs: dict = {}
+        self.refreshes = self.refresh_failures = 0
+
+    @property
+    def project_id(self) -> str:
+        return getattr(firebase_app, "project_id", None) or GCP_PROJECT_ID
+
+    async def refresh(self) -> float:
+        """Downloads the current keys; returns seconds until the next refresh."""
+        async with httpx.AsyncClient(timeout=10) as client:
+            r = await client.get(FIREBASE_CERTS_URL)
+            r.raise_for_status()
+        self.certs      = r.json()
+        self.refreshes += 1
+        max_age = 3600
+        for part in r.headers.get("cache-control", "").split(","):
+            name, _, value = part.strip().partition("=")
+            if name == "max-age" and value.isdigit():
+                max_age = int(value)
+        return max(60.0, max_age * 0.8)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                delay = await self.refresh()
+            except (httpx.HTTPError, ValueError) as e:
+                self.refresh_failures += 1
+                logger.warning(f"Firebase signing-key refresh failed: {e}")
+                delay = 60.0
+            await asyncio.sleep(delay)
+
+    def verify(self, id_token: str) -> dict:
+        if not self.certs or os.getenv("FIREBASE_AUTH_EMULATOR_HOST"):
+            return fb_auth.verify_id_token(id_token)
+        header = google_jwt.decode_header(id_token)
+        if header.get("kid") not in self.certs:
+            return fb_auth.verify_id_token(id_token)
+        if header.get("alg") != "RS256":
+            raise ValueError(f"Unexpected token algorithm {header.get('alg')!r}.")
+
+        claims = google_jwt.decode(id_token, certs=self.certs, audience=self.project_id)
+        if claims.get("iss") != f"https://securetoken.google.com/{self.project_id}":
+            raise ValueError(f"Unexpected token issuer {claims.get('iss')!r}.")
+        sub = claims.get("sub")
+        if not isinstance(sub, str) or not sub or len(sub) > 128:
+            raise ValueError("Token has an invalid 'sub' claim.")
+        claims["uid"] = sub
+        return claims
+
+class VerifiedTokenCache:
+    """
+    Decoded claims of recently verified ID tokens, keyed by SHA-256 of the
+    token so raw JWTs are never held in memory.  An entry lives until the
+    token's own `exp`; the least recently used entries go first when full.
+    """
+
+    def __init__(self, max_entries: int = AUTH_TOKEN_CACHE_MAX):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = self.misses = self.failures = 0
+        self.verify_count = 0
+        self.verify_total_s = self.verify_max_s = 0.0
+
+    @staticmethod
+    def _key(id_token: str) -> str:
+        return hashlib.sha256(id_token.encode()).hexdigest()
+
+    def get(self, id_token: str) -> Optional[dict]:
+        key    = self._key(id_token)
+        claims = self._entries.get(key)
+        if claims is not None:
+            if claims.get("exp", 0) > time.time():
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return claims
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, id_token: str, claims: dict) -> None:
+        if claims.get("exp", 0) <= time.time():
+            return
+        self._entries[self._key(id_token)] = claims
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def record(self, elapsed_s: float, ok: bool) -> None:
+        self.verify_count   += 1
+        self.verify_total_s += elapsed_s
+        self.verify_max_s    = max(self.verify_max_s, elapsed_s)
+        if not ok:
+            self.failures += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries":           len(self._entries),
+            "hits":              self.hits,
+            "misses":            self.misses,
+            "hit_rate":          round(self.hits / lookups, 4) if lookups else None,
+            "verify_failures":   self.failures,
+            "verify_avg_ms":     round(1000 * self.verify_total_s / self.verify_count, 3)
+                                 if self.verify_count else None,
+            "verify_max_ms":     round(1000 * self.verify_max_s, 3),
+            "key_refreshes":     firebase_keys.refreshes,
+            "key_refresh_fails": firebase_keys.refresh_failures,
+        }
+
+firebase_keys = FirebaseKeyRing()
+token_cache   = VerifiedTokenCache()
+
 async def verify_firebase_token(authorization: Optional[str] = Header(None)) -> dict:
     """
     Inject as a dependency into any endpoint that requires a logged-in user.
@@ -388,27 +1424,126 @@ async def verify_firebase_token(authorization: Optional[str] = Header(None)) ->
         raise HTTPException(status_code=401, detail="Missing Authorization: Bearer <token>")
 
     id_token = authorization.split("Bearer ", 1)[1]
+    claims   = token_cache.get(id_token)
+    if claims is not None:
+        return claims
+
+    started = time.perf_counter()
     try:
-        return fb_auth.verify_id_token(id_token)
+        claims = firebase_keys.verify(id_token)
     except Exception as e:
+        token_cache.record(time.perf_counter() - started, ok=False)
         logger.warning(f"Token verification failed: {e}")
         raise HTTPException(status_code=401, detail="Invalid or expired token.")
+    token_cache.record(time.perf_counter() - started, ok=True)
+    token_cache.put(id_token, claims)
+    return claims
+
+class EntitlementCache:
+    """
+    In-process copy of subscribers/{uid} documents.
+
+    get() returns the cached document (None = no such subscriber) and only
+    reads the store on a miss, off the event loop.  Writers in this file call update() or
+    invalidate() right after their Firestore write.  The optional snapshot
+    listener streams changes made by other workers or the Firebase console.
+    Listener callbacks arrive on a Firestore thread, hence the lock.
+    """
+
+    def __init__(
+        self,
+        ttl_s:          float = ENTITLEMENT_TTL_S,
+        negative_ttl_s: float = ENTITLEMENT_NEGATIVE_TTL_S,
+    ):
+        self.ttl_s          = ttl_s
+        self.negative_ttl_s = negative_ttl_s
+        self._lock    = threading.Lock()
+        self._entries: dict = {}          # uid → (doc or None, expires_at)
+        self._watch   = None
+        self.hits = self.negative_hits = self.misses = self.invalidations = 0
+
+    def _put(self, uid: str, data: Optional[dict]) -> None:
+        ttl = self.ttl_s if data and data.get("active") else self.negative_ttl_s
+        with self._lock:
+            self._entries[uid] = (data, time.monotonic() + ttl)
+
+    async def get(self, uid: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(uid)
+        if entry is not None and time.monotonic() < entry[1]:
+            if entry[0] and entry[0].get("active"):
+                self.hits += 1
+            else:
+                self.negative_hits += 1
+            return entry[0]
+
+        self.misses += 1
+        # subscribers/{uid} — the document ID is the Firebase Auth UID, same
+        # string in both systems.  The local store answers if its copy is as
+        # fresh as this cache's own TTL, so a restart does not re-read everyone.
+        data = await asyncio.to_thread(store.get, "subscribers", uid, max_age_s=self.ttl_s)
+        self._put(uid, data)
+        return data
+
+    def update(self, uid: str, fields: dict) -> None:
+        """Mirrors a set(..., merge=True) onto the cached document, if any."""
+        with self._lock:
+            entry = self._entries.get(uid)
+        if entry is None or entry[0] is None:
+            self.invalidate(uid)
+        else:
+            self._put(uid, {**entry[0], **fields})
+
+    def invalidate(self, uid: str) -> None:
+        with self._lock:
+            self._entries.pop(uid, None)
+        self.invalidations += 1
+
+    def _on_snapshot(self, docs, changes, read_time) -> None:
+        for change in changes:
+            uid  = change.document.id
+            data = None if change.type.name == "REMOVED" else change.document.to_dict()
+            store.cache("subscribers", uid, data)
+            self._put(uid, data)
+            audience.sync(uid, data)
+
+    def start_listener(self) -> None:
+        self._watch = firestore_db.collection("subscribers").on_snapshot(self._on_snapshot)
+        logger.info("Entitlement cache listening to subscribers/ snapshots.")
+
+    def stop_listener(self) -> None:
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+
+    @property
+    def listening(self) -> bool:
+        return self._watch is not None
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = len(self._entries)
+        return {
+            "entries":       entries,
+            "hits":          self.hits,
+            "negative_hits": self.negative_hits,
+            "misses":        self.misses,
+            "invalidations": self.invalidations,
+            "listener":      self.listening,
+        }
+
+entitlements = EntitlementCache()
 
 async def require_active_subscription(uid: str) -> bool:
     """
-    Checks Firestore subscribers/{uid}.active == True.
+    Checks Firestore subscribers/{uid}.active == True (via EntitlementCache).
     Firestore path:  /subscribers/<firebase_uid>
     Document fields: { active: bool, stripe_status: str, period_end: str, ... }
     """
-    if not firestore_db:
-        return True   # allow through when Firestore isn't configured (dev mode)
-
-    # .document(uid).get() fetches one Firestore document by its ID.
-    # The document ID is the Firebase Auth UID — same string in both systems.
-    doc = firestore_db.collection("subscribers").document(uid).get()
-    if not doc.exists:
-        return False
-    return doc.to_dict().get("active", False)
+    data = await entitlements.get(uid)
+    if not firestore_db and "active" not in (data or {}):
+        return True   # dev mode: only subscribers given an active flag locally are checked
+    return bool(data and data.get("active", False))
 
 # ═════════════════════════════════════════════════════════════════════════════
 # WEATHER LOGIC
@@ -475,83 +1610,1014 @@ def calculate_fire_risk(wd: dict) -> tuple[int, str]:
              else "MODERATE" if score >= 25 else "LOW")
     return score, level
 
+LIGHTNING_TERMS = ('thunderstorm', 'lightning', 'electrical storm', 't-storm')
+
+def alerts_mention_lightning(alerts: list) -> bool:
+    for a in alerts:
+        txt = (a.get('title', '') + a.get('description', '')).lower()
+        if any(t in txt for t in LIGHTNING_TERMS):
+            return True
+    return False
+
 def detect_lightning(wd: dict, alerts: list, strike_count: int) -> tuple[bool, bool]:
     """Returns (lightning_nearby, dry_lightning). Dry = highest ignition risk."""
     desc   = wd.get('weather', {}).get('description', '').lower()
     precip = wd.get('precip') or 0
-    terms  = ['thunderstorm', 'lightning', 'electrical storm', 't-storm']
-
-    lightning = any(t in desc for t in terms) or strike_count > 0
-    if not lightning:
-        for a in alerts:
-            txt = (a.get('title', '') + a.get('description', '')).lower()
-            if any(t in txt for t in terms):
-                lightning = True
-                break
 
+    lightning = (
+        any(t in desc for t in LIGHTNING_TERMS)
+        or strike_count > 0
+        or alerts_mention_lightning(alerts)
+    )
     return lightning, (lightning and precip < 0.1)
 
+# ═════════════════════════════════════════════════════════════════════════════
+# BATCH SCORING  (vectorized twin of the three functions above)
+# ─────────────────────────────────────────────────────────────────────────────
+# score_batch() takes columnar arrays — one entry per grid cell, forecast hour
+# or history row — and returns the same score / level / lightning / condition
+# the scalar functions give for each entry, computed with NumPy thresholds.
+# Descriptions are factorized once (np.unique), so the substring scans run per
+# distinct description instead of per point.  Without NumPy it loops over the
+# scalar functions.
+# ═════════════════════════════════════════════════════════════════════════════
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+    logger.warning(
+        "numpy not installed — batch scoring falls back to scalar loops. "
+        "Run: pip install numpy --break-system-packages"
+    )
+
+def _column(values, default: float) -> "np.ndarray":
+    """Float column with the scalar code's `x or default` rule (None and 0 → default)."""
+    a = np.array([np.nan if v is None else v for v in values], dtype=float)
+    return np.where(np.isnan(a) | (a == 0), default, a)
+
+def _description_flags(descriptions) -> dict:
+    """Per-point boolean flags from lower-cased description substrings."""
+    uniq, inverse = np.unique(
+        np.array([(d or "").lower() for d in descriptions], dtype=object).astype(str),
+        return_inverse=True,
+    )
+    def flag(terms):
+        return np.array([any(t in u for t in terms) for u in uniq], dtype=bool)[inverse]
+    return {
+        "thunderstorm": flag(("thunderstorm",)),
+        "lightning":    flag(LIGHTNING_TERMS),
+        "severe":       flag(("thunderstorm", "tornado", "hurricane", "extreme")),
+        "electrical":   flag(("lightning", "electrical")),
+        "rain":         flag(("rain", "drizzle")),
+        "snow":         flag(("snow",)),
+        "cloud":        flag(("cloud",)),
+    }
+
+def score_batch(
+    rh:              list,
+    temp:            list,
+    wind:            list,
+    precip:          list,
+    clouds:          list,
+    descriptions:    list,
+    alert_lightning: Optional[list] = None,
+    strike_counts:   Optional[list] = None,
+) -> dict:
+    """
+    Columnar fire-risk / lightning / condition scoring.
+    Every input has one entry per point; None means "field missing".
+    Returns {"fire_score", "fire_level", "lightning_nearby", "dry_lightning",
+    "condition"} — NumPy arrays, or lists when NumPy is unavailable.
+    """
+    n = len(rh)
+    alert_lightning = alert_lightning if alert_lightning is not None else [False] * n
+    strike_counts   = strike_counts   if strike_counts   is not None else [0] * n
+
+    if np is None:
+        out = {k: [] for k in ("fire_score", "fire_level", "lightning_nearby",
+                               "dry_lightning", "condition")}
+        for i in range(n):
+            wd = {"rh": rh[i], "temp": temp[i], "wind_spd": wind[i], "precip": precip[i],
+                  "clouds": clouds[i], "weather": {"description": descriptions[i] or ""}}
+            score, level = calculate_fire_risk(wd)
+            alerts = [{"title": "thunderstorm"}] if alert_lightning[i] else []
+            ln, dry = detect_lightning(wd, alerts, strike_counts[i])
+            for k, v in zip(out, (score, level, ln, dry, derive_condition(wd))):
+                out[k].append(v)
+        return out
+
+    r  = _column(rh, 50)
+    t  = _column(temp, 20)
+    w  = _column(wind, 0)
+    p  = _column(precip, 0)
+    c  = _column(clouds, 0)
+    fl = _description_flags(descriptions)
+
+    score = (
+        np.select([r < 10, r < 15, r < 25, r < 35], [35, 28, 20, 10], 0)
+        + np.select([t > 38, t > 32, t > 27, t > 22], [25, 18, 10, 5], 0)
+        + np.select([w > 12, w > 8, w > 5, w > 3], [25, 18, 10, 5], 0)
+        + np.select([p < 0.01, p < 0.10], [10, 5], 0)
+    )
+    score = np.where(fl["thunderstorm"] & (p > 0.5), np.maximum(score - 10, 0), score)
+    score = np.minimum(score, 100).astype(int)
+    level = np.select(
+        [score >= 75, score >= 50, score >= 25], ["EXTREME", "HIGH", "MODERATE"], "LOW"
+    )
+
+    lightning = (
+        fl["lightning"]
+        | (np.asarray(strike_counts) > 0)
+        | np.asarray(alert_lightning, dtype=bool)
+    )
+    condition = np.select(
+        [
+            fl["severe"],
+            fl["electrical"],
+            fl["rain"] | (p > 0.1),
+            fl["snow"],
+            fl["cloud"] | (c > 75),
+            c > 25,
+            t > 25,
+            t < 0,
+        ],
+        [
+            "Severe Weather", "Lightning Activity", "Rainy / Precipitating", "Snowy",
+            "Overcast", "Partly Cloudy", "Clear and Warm", "Clear and Cold",
+        ],
+        "Clear",
+    )
+    return {
+        "fire_score":       score,
+        "fire_level":       level,
+        "lightning_nearby": lightning,
+        "dry_lightning":    lightning & (p < 0.1),
+        "condition":        condition,
+    }
+
+def score_weather_batch(
+    records:       list[dict],
+    alerts:        Optional[list[list]] = None,
+    strike_counts: Optional[list[int]]  = None,
+) -> dict:
+    """score_batch() over Weatherbit observation dicts (e.g. one per grid cell)."""
+    return score_batch(
+        rh=[wd.get('rh') for wd in records],
+        temp=[wd.get('temp') for wd in records],
+        wind=[wd.get('wind_spd') for wd in records],
+        precip=[wd.get('precip') for wd in records],
+        clouds=[wd.get('clouds') for wd in records],
+        descriptions=[wd.get('weather', {}).get('description', '') for wd in records],
+        alert_lightning=[alerts_mention_lightning(a) for a in alerts] if alerts else None,
+        strike_counts=strike_counts,
+    )
+
 # ═════════════════════════════════════════════════════════════════════════════
 # WEATHERBIT API HELPERS
 # ═════════════════════════════════════════════════════════════════════════════
 
-def fetch_current_weather(lat: float, lon: float) -> Optional[dict]:
-    if not WEATHERBIT_KEY:
-        return None
-    try:
-        r = requests.get(
-            f"{WEATHERBIT_BASE}/current",
-            params={"lat": lat, "lon": lon, "key": WEATHERBIT_KEY, "units": "M"},
-            timeout=15,
+class WeatherbitClient:
+    """
+    One shared httpx.AsyncClient for every Weatherbit call in this worker.
+
+    • Keep-alive pool — TLS to api.weatherbit.io is negotiated once, not per call
+    • Per-endpoint timeouts from WEATHERBIT_TIMEOUTS
+    • Semaphore caps in-flight upstream calls at WEATHERBIT_MAX_CONCURRENCY
+    • 429 / 5xx / network errors retried with full-jitter exponential backoff
+
+    The underlying client is created lazily on the running event loop and
+    closed by lifespan() on shutdown.  `transport` swaps the network for an
+    httpx transport (bench/fakes.py serves canned responses through it).
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        max_concurrency: int = WEATHERBIT_MAX_CONCURRENCY,
+        transport:       Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.transport       = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._sem:    Optional[asyncio.Semaphore] = None
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=WEATHERBIT_BASE,
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                    keepalive_expiry=60,
+                ),
+                timeout=httpx.Timeout(10.0, connect=5.0),
+            )
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    @staticmethod
+    def _backoff(attempt: int, resp: Optional[httpx.Response] = None) -> float:
+        if resp is not None and resp.headers.get("retry-after", "").isdigit():
+            return min(float(resp.headers["retry-after"]), WEATHERBIT_BACKOFF_CAP_S)
+        ceiling = min(WEATHERBIT_BACKOFF_CAP_S, WEATHERBIT_BACKOFF_BASE_S * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    async def get_json(self, endpoint: str, params: dict) -> dict:
+        """
+        GET {WEATHERBIT_BASE}/{endpoint} and return the decoded JSON body.
+        Raises httpx.HTTPError once retries are exhausted (callers log and
+        fall back exactly as they did with requests).
+        """
+        client  = self._ensure_client()
+        timeout = WEATHERBIT_TIMEOUTS.get(endpoint.split("/")[0], 10.0)
+        params  = {**params, "key": WEATHERBIT_KEY}
+
+        for attempt in range(WEATHERBIT_MAX_RETRIES + 1):
+            last = attempt == WEATHERBIT_MAX_RETRIES
+            try:
+                async with self._sem:
+                    r = await client.get(f"/{endpoint}", params=params, timeout=timeout)
+            except httpx.TransportError as e:
+                if last:
+                    raise
+                logger.warning(f"Weatherbit /{endpoint} retry {attempt + 1}: {e!r}")
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+
+            if r.status_code in self.RETRY_STATUSES and not last:
+                logger.warning(f"Weatherbit /{endpoint} retry {attempt + 1}: HTTP {r.status_code}")
+                await asyncio.sleep(self._backoff(attempt, r))
+                continue
+            r.raise_for_status()
+            return r.json()
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+weatherbit = WeatherbitClient()
+
+# ═════════════════════════════════════════════════════════════════════════════
+# SINGLE-FLIGHT  (one upstream call per key, however many callers ask)
+# ═════════════════════════════════════════════════════════════════════════════
+
+class SingleFlight:
+    """
+    Collapses concurrent calls that share a key into one upstream call.
+
+    Every caller is a coroutine on the app loop — the Weatherbit helpers,
+    the scheduler jobs and the BackgroundTasks that use them are all async —
+    so there is no thread-side entry point.  The leader's work runs as its
+    own task: a caller that gives up (e.g. an assess_location leg hitting its
+    deadline) never cancels the flight for everyone else.
+    """
+
+    def __init__(self):
+        self._lock    = threading.Lock()
+        self._flights: dict = {}
+        self._tasks:   set  = set()
+        self.leaders = self.followers = 0
+
+    def _join(self, key) -> tuple[concurrent.futures.Future, bool]:
+        with self._lock:
+            fut = self._flights.get(key)
+            if fut is not None:
+                self.followers += 1
+                return fut, False
+            fut = concurrent.futures.Future()
+            self._flights[key] = fut
+            self.leaders += 1
+            return fut, True
+
+    def in_flight(self, key) -> bool:
+        with self._lock:
+            return key in self._flights
+
+    async def _lead(self, key, fut: concurrent.futures.Future, factory: Callable[[], Awaitable]) -> None:
+        try:
+            result = await factory()
+        except BaseException as e:
+            with self._lock:
+                self._flights.pop(key, None)
+            fut.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+        else:
+            with self._lock:
+                self._flights.pop(key, None)
+            fut.set_result(result)
+
+    async def do(self, key, factory: Callable[[], Awaitable]):
+        """Await factory() — or the identical call already in flight."""
+        fut, leader = self._join(key)
+        if leader:
+            task = asyncio.create_task(self._lead(key, fut, factory))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return await asyncio.shield(asyncio.wrap_future(fut))
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = len(self._flights)
+        return {
+            "in_flight": in_flight,
+            "leaders":   self.leaders,
+            "followers": self.followers,
+        }
+
+flights = SingleFlight()
+
+# ═════════════════════════════════════════════════════════════════════════════
+# WEATHER CACHE  (geo-quantized TTL · LRU · stale-while-revalidate)
+# ─────────────────────────────────────────────────────────────────────────────
+# Weatherbit /current only changes every several minutes and most subscribers
+# sit within a few km of Westcliffe, so the fetch_* helpers below go through
+# this cache first.  Keys are (endpoint, grid cell, extra params); the
+# upstream call is made for the cell centre so every caller in the cell sees
+# the same observation.  Size is capped by the approximate JSON size of the
+# cached values; the least recently used cells are evicted first.
+# ═════════════════════════════════════════════════════════════════════════════
+
+class GeoCache:
+
+    def __init__(
+        self,
+        grid_deg:  float = WEATHER_CACHE_GRID_DEG,
+        ttls:      dict  = WEATHER_CACHE_TTL_S,
+        stale_s:   float = WEATHER_CACHE_STALE_S,
+        max_bytes: int   = WEATHER_CACHE_MAX_BYTES,
+    ):
+        self.grid_deg  = grid_deg
+        self.ttls      = ttls
+        self.stale_s   = stale_s
+        self.max_bytes = max_bytes
+        # key → (value, fresh_until, size_bytes); ordered oldest-use first.
+        # A TTL may be a callable returning seconds (see forecast_cache).
+        self._entries:    OrderedDict = OrderedDict()
+        self._bytes       = 0
+        self._tasks:      set = set()
+        self.hits = self.stale_hits = self.misses = self.evictions = 0
+
+    def cell(self, lat: float, lon: float) -> tuple[float, float]:
+        """Snaps a coordinate to the centre of its grid cell."""
+        g = self.grid_deg
+        if g <= 0:
+            return lat, lon
+        return (
+            round((int(lat // g) + 0.5) * g, 6),
+            round((int(lon // g) + 0.5) * g, 6),
         )
-        r.raise_for_status()
-        records = r.json().get('data', [])
+
+    def _store(self, key: tuple, value) -> None:
+        size = len(json.dumps(value, default=str))
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[2]
+        ttl = self.ttls.get(key[0], 300)
+        if callable(ttl):
+            ttl = ttl()
+        self._entries[key] = (value, time.monotonic() + ttl, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, _, old_size) = self._entries.popitem(last=False)
+            self._bytes    -= old_size
+            self.evictions += 1
+
+    def _flight(self, key: tuple, loader: Callable[[float, float], Awaitable],
+                clat: float, clon: float) -> Awaitable:
+        """Upstream load for one key, coalesced through `flights`."""
+        async def load():
+            value = await loader(clat, clon)
+            if value is not None:
+                self._store(key, value)
+            return value
+        return flights.do(key, load)
+
+    async def get_or_load(
+        self,
+        endpoint: str,
+        lat:      float,
+        lon:      float,
+        loader:   Callable[[float, float], Awaitable],
+        *extra,
+    ):
+        """
+        Returns the cached value for (endpoint, cell, extra) or awaits
+        loader(cell_lat, cell_lon).  A loader result of None means the upstream
+        call failed and is not cached.  Concurrent misses on the same key
+        share one loader call.
+        """
+        clat, clon = self.cell(lat, lon)
+        key   = (endpoint, clat, clon, *extra)
+        entry = self._entries.get(key)
+        now   = time.monotonic()
+
+        if entry is not None:
+            value, fresh_until, _ = entry
+            if now < fresh_until:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return value
+            if now < fresh_until + self.stale_s:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                if not flights.in_flight(key):
+                    task = asyncio.ensure_future(self._flight(key, loader, clat, clon))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                return value
+
+        self.misses += 1
+        return await self._flight(key, loader, clat, clon)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries":    len(self._entries),
+            "bytes":      self._bytes,
+            "hits":       self.hits,
+            "stale_hits": self.stale_hits,
+            "misses":     self.misses,
+            "evictions":  self.evictions,
+            "hit_rate":   round((self.hits + self.stale_hits) / lookups, 4) if lookups else None,
+        }
+
+weather_cache = GeoCache()
+
+# ─── Upstream loaders (None = call failed, do not cache) ─────────────────────
+
+async def _load_current(lat: float, lon: float) -> Optional[dict]:
+    try:
+        body    = await weatherbit.get_json("current", {"lat": lat, "lon": lon, "units": "M"})
+        records = body.get('data', [])
         return records[0] if records else None
-    except requests.exceptions.RequestException as e:
+    except (httpx.HTTPError, ValueError) as e:
         logger.error(f"Weatherbit /current: {e}")
         return None
 
-def fetch_active_alerts(lat: float, lon: float) -> list:
-    if not WEATHERBIT_KEY:
-        return []
+async def _load_alerts(lat: float, lon: float) -> Optional[list]:
     try:
-        r = requests.get(
-            f"{WEATHERBIT_BASE}/alerts",
-            params={"lat": lat, "lon": lon, "key": WEATHERBIT_KEY},
-            timeout=15,
-        )
-        r.raise_for_status()
-        return r.json().get('alerts', [])
-    except requests.exceptions.RequestException as e:
+        body = await weatherbit.get_json("alerts", {"lat": lat, "lon": lon})
+        return body.get('alerts', [])
+    except (httpx.HTTPError, ValueError) as e:
         logger.error(f"Weatherbit /alerts: {e}")
-        return []
+        return None
 
-def fetch_lightning_strikes(lat: float, lon: float, radius_km: float = 50) -> list:
-    """
-    ⚠️  Requires Weatherbit Pro+ paid plan (HTTP 403 on free tier).
-        Upgrade: https://www.weatherbit.io/pricing
-    """
-    if not WEATHERBIT_KEY:
-        return []
+async def _load_lightning(lat: float, lon: float, radius_km: float) -> Optional[list]:
     try:
-        r = requests.get(
-            f"{WEATHERBIT_BASE}/lightning",
-            params={"lat": lat, "lon": lon, "radius": radius_km, "key": WEATHERBIT_KEY},
-            timeout=15,
+        body = await weatherbit.get_json(
+            "lightning", {"lat": lat, "lon": lon, "radius": radius_km}
         )
-        r.raise_for_status()
-        return r.json().get('data', [])
-    except requests.exceptions.HTTPError as e:
-        if e.response is not None and e.response.status_code == 403:
+        strikes = body.get('data', [])
+        strike_index.add(strikes, lat, lon, radius_km)
+        return strikes
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 403:
             logger.warning(
                 "Weatherbit Lightning API requires Pro+ plan. "
                 "Upgrade: https://www.weatherbit.io/pricing"
             )
         else:
             logger.error(f"Weatherbit /lightning HTTP error: {e}")
-    except requests.exceptions.RequestException as e:
+    except (httpx.HTTPError, ValueError) as e:
         logger.error(f"Weatherbit /lightning: {e}")
-    return []
+    return None
+
+# ─── Cached public helpers ───────────────────────────────────────────────────
+
+async def fetch_current_weather(lat: float, lon: float) -> Optional[dict]:
+    if not WEATHERBIT_KEY:
+        return None
+    return await weather_cache.get_or_load("current", lat, lon, _load_current)
+
+async def fetch_active_alerts(lat: float, lon: float) -> list:
+    if not WEATHERBIT_KEY:
+        return []
+    return await weather_cache.get_or_load("alerts", lat, lon, _load_alerts) or []
+
+async def fetch_lightning_strikes(lat: float, lon: float, radius_km: float = 50) -> list:
+    """
+    ⚠️  Requires Weatherbit Pro+ paid plan (HTTP 403 on free tier).
+        Upgrade: https://www.weatherbit.io/pricing
+    """
+    if not WEATHERBIT_KEY:
+        return []
+    strikes = await weather_cache.get_or_load(
+        "lightning", lat, lon,
+        lambda clat, clon: _load_lightning(clat, clon, radius_km),
+        radius_km,
+    )
+    return strikes or []
+
+# ═════════════════════════════════════════════════════════════════════════════
+# LIGHTNING STRIKE INDEX
+# ─────────────────────────────────────────────────────────────────────────────
+# Every successful /lightning load is added to StrikeIndex, a grid of
+# STRIKE_INDEX_CELL_DEG buckets holding the last STRIKE_INDEX_WINDOW_S of
+# strikes.  Nearest-strike distance, count-within-R, since-T and bounding-box
+# queries only touch the buckets that overlap the query, so the drone guard
+# and the dry-lightning check get real distances without another upstream
+# call.  Coverage is tracked per query circle: outside a live circle the
+# index cannot say "no strikes", and callers fall back to Weatherbit.
+# ═════════════════════════════════════════════════════════════════════════════
+
+def _strike_ts(strike: dict) -> float:
+    """Strike time (epoch s); receipt time if Weatherbit omitted or mangled it."""
+    if strike.get("ts") is not None:
+        return float(strike["ts"])
+    raw = strike.get("timestamp_utc") or strike.get("datetime")
+    if raw:
+        try:
+            t = datetime.fromisoformat(str(raw).replace("Z", "+00:00"))
+            return (t if t.tzinfo else t.replace(tzinfo=timezone.utc)).timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+class StrikeIndex:
+
+    def __init__(
+        self,
+        cell_deg: float = STRIKE_INDEX_CELL_DEG,
+        window_s: float = STRIKE_INDEX_WINDOW_S,
+        live_s:   float = STRIKE_INDEX_LIVE_S,
+    ):
+        self.cell_deg = cell_deg
+        self.window_s = window_s
+        self.live_s   = live_s
+        # (row, col) → [(ts, lat, lon, strike)]; dispatch_recon reads from a worker thread
+        self._buckets:  dict = {}
+        self._seen:     dict = {}       # dedupe key → ts
+        self._coverage: list = []       # [(lat, lon, radius_km, covered_at)]
+        self._lock      = threading.Lock()
+        self._expired_at = 0.0
+        self._listeners: list[Callable[[list], None]] = []
+        self.added = self.duplicates = self.expired = 0
+
+    def subscribe(self, listener: Callable[[list], None]) -> None:
+        """listener(new_strikes) runs after every add() that indexed something."""
+        self._listeners.append(listener)
+
+    def _bucket(self, lat: float, lon: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    @staticmethod
+    def _key(ts: float, lat: float, lon: float) -> tuple:
+        return round(ts, 1), round(lat, 4), round(lon, 4)
+
+    def _expire(self, now: float) -> None:
+        if now - self._expired_at < 10:
+            return
+        self._expired_at = now
+        cutoff = now - self.window_s
+        for b, items in list(self._buckets.items()):
+            kept = [it for it in items if it[0] >= cutoff]
+            self.expired += len(items) - len(kept)
+            if kept:
+                self._buckets[b] = kept
+            else:
+                del self._buckets[b]
+        self._seen     = {k: ts for k, ts in self._seen.items() if ts >= cutoff}
+        self._coverage = [c for c in self._coverage if c[3] >= now - self.live_s]
+
+    def add(
+        self,
+        strikes:   list,
+        lat:       Optional[float] = None,
+        lon:       Optional[float] = None,
+        radius_km: Optional[float] = None,
+    ) -> list:
+        """
+        Indexes new strikes and returns them (duplicates dropped).  Passing
+        the query circle marks it covered: an empty list then means "no
+        strikes there", not "unknown".
+        """
+        now, fresh = time.time(), []
+        with self._lock:
+            self._expire(now)
+            for s in strikes:
+                if s.get("lat") is None or s.get("lon") is None:
+                    continue
+                ts, slat, slon = _strike_ts(s), float(s["lat"]), float(s["lon"])
+                if ts < now - self.window_s:
+                    continue
+                key = self._key(ts, slat, slon)
+                if key in self._seen:
+                    self.duplicates += 1
+                    continue
+                self._seen[key] = ts
+                self._buckets.setdefault(self._bucket(slat, slon), []).append((ts, slat, slon, s))
+                fresh.append(s)
+            self.added += len(fresh)
+            if radius_km is not None:
+                self._coverage = [c for c in self._coverage if c[3] >= now - self.live_s]
+                self._coverage.append((lat, lon, radius_km, now))
+        if fresh:
+            for listener in self._listeners:
+                listener(fresh)
+        return fresh
+
+    def covers(self, lat: float, lon: float, radius_km: float = 0.0) -> bool:
+        """True if a live query circle contains the whole circle (lat, lon, radius_km)."""
+        cutoff = time.time() - self.live_s
+        return any(
+            at >= cutoff and haversine_km(lat, lon, clat, clon) + radius_km <= crad
+            for clat, clon, crad, at in self._coverage
+        )
+
+    def _candidates(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float):
+        r0, c0 = self._bucket(min_lat, min_lon)
+        r1, c1 = self._bucket(max_lat, max_lon)
+        with self._lock:
+            self._expire(time.time())
+            for r in range(r0, r1 + 1):
+                for c in range(c0, c1 + 1):
+                    yield from self._buckets.get((r, c), ())
+
+    def _around(self, lat: float, lon: float, radius_km: float, since: Optional[float]):
+        """(km, strike) for indexed strikes within radius_km, newer than `since`."""
+        dlat = radius_km / 111.32
+        dlon = radius_km / (111.32 * max(math.cos(math.radians(lat)), 0.01))
+        since = since if since is not None else 0.0
+        for ts, slat, slon, s in list(self._candidates(lat - dlat, lon - dlon, lat + dlat, lon + dlon)):
+            if ts < since:
+                continue
+            km = haversine_km(lat, lon, slat, slon)
+            if km <= radius_km:
+                yield km, s
+
+    def within(self, lat: float, lon: float, radius_km: float, since: Optional[float] = None) -> list:
+        return [s for _, s in sorted(self._around(lat, lon, radius_km, since), key=lambda e: e[0])]
+
+    def count_within(self, lat: float, lon: float, radius_km: float, since: Optional[float] = None) -> int:
+        return sum(1 for _ in self._around(lat, lon, radius_km, since))
+
+    def nearest_km(
+        self, lat: float, lon: float,
+        max_km: float = LIGHTNING_RADIUS_KM, since: Optional[float] = None,
+    ) -> Optional[float]:
+        """Distance to the closest indexed strike within max_km, else None."""
+        # Widen from one bucket outwards; the first hit inside radius r is the
+        # nearest overall because _around() is exact within r.
+        r = min(max_km, self.cell_deg * 111.32)
+        while True:
+            best = min((km for km, _ in self._around(lat, lon, r, since)), default=None)
+            if best is not None or r >= max_km:
+                return best
+            r = min(r * 2, max_km)
+
+    def since(self, ts: float) -> list:
+        """All indexed strikes at or after `ts`, oldest first."""
+        with self._lock:
+            self._expire(time.time())
+            items = [it for b in self._buckets.values() for it in b if it[0] >= ts]
+        return [it[3] for it in sorted(items, key=lambda it: it[0])]
+
+    def bbox(
+        self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+        since: Optional[float] = None,
+    ) -> list:
+        """Strikes inside the box (map overlay), oldest first."""
+        since = since if since is not None else 0.0
+        items = [
+            it for it in self._candidates(min_lat, min_lon, max_lat, max_lon)
+            if it[0] >= since and min_lat <= it[1] <= max_lat and min_lon <= it[2] <= max_lon
+        ]
+        return [it[3] for it in sorted(items, key=lambda it: it[0])]
+
+    def stats(self) -> dict:
+        with self._lock:
+            indexed = sum(len(b) for b in self._buckets.values())
+            buckets = len(self._buckets)
+        return {
+            "strikes":    indexed,
+            "buckets":    buckets,
+            "added":      self.added,
+            "duplicates": self.duplicates,
+            "expired":    self.expired,
+            "live_areas": sum(1 for c in self._coverage if c[3] >= time.time() - self.live_s),
+        }
+
+strike_index = StrikeIndex()
+
+async def nearby_strikes(lat: float, lon: float, radius_km: float = LIGHTNING_RADIUS_KM) -> list:
+    """Strikes within radius_km — from the index when it covers the area, else upstream."""
+    if strike_index.covers(lat, lon, radius_km):
+        return strike_index.within(lat, lon, radius_km)
+    return await fetch_lightning_strikes(lat, lon, radius_km)
+
+# ═════════════════════════════════════════════════════════════════════════════
+# LIGHTNING INGESTER  (one upstream poll per interval, deltas to the map)
+# ─────────────────────────────────────────────────────────────────────────────
+# LightningFeed.poll() runs as a scheduler job on every worker, but only the
+# worker holding the local store's "lightning" claim asks Weatherbit — once
+# per interval for the whole watch area.  StrikeIndex drops strikes it has
+# already seen and hands the new ones to the feed, which numbers them (in a
+# worker thread) into a feed shared through the local store.  The other
+# workers read what was numbered since their last poll into their own
+# StrikeIndex, together with the area the poller covered, and take over the
+# polling if it exits.  Cursors are "<feed id>:<seq>" and valid on every
+# worker of the container; one from another instance or one that fell off
+# the feed gets cursor_reset=True and the whole feed.
+# ═════════════════════════════════════════════════════════════════════════════
+
+def _ingest_area() -> tuple[float, float, float]:
+    min_lat, min_lon, max_lat, max_lon = (float(v) for v in WATCH_GRID_BBOX.split(","))
+    lat, lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+    radius   = LIGHTNING_INGEST_RADIUS_KM or (
+        haversine_km(lat, lon, max_lat, max_lon) + LIGHTNING_RADIUS_KM
+    )
+    return lat, lon, radius
+
+class LightningFeed:
+    """
+    Numbered strike feed for /lightning-strikes?since= cursors.
+
+    The numbering lives in the local store's strike_feed table, so every
+    uvicorn worker sharing the SQLite file hands out the same sequence and
+    a cursor from one worker is valid on the other.  The cursor's first half
+    is the file's feed id: a cursor from another instance (or from before
+    the file was recreated) cannot be resumed and gets cursor_reset.
+    """
+
+    def __init__(self, ring_size: int = LIGHTNING_RING_SIZE):
+        self.ring_size = ring_size
+        self.numbered  = 0                  # strikes this worker added to the feed
+        self.followed  = 0                  # strikes this worker read from the feed
+        self.polls = self.failures = 0
+        self.last_poll_at: Optional[str] = None
+        self._after: Optional[int] = None   # last feed seq this worker indexed
+        self._following = False
+        self._pending: list = []            # indexed here, not yet in the feed
+
+    @property
+    def boot(self) -> str:
+        return store.local.feed_id()
+
+    def append(self, strikes: list) -> None:
+        """
+        StrikeIndex listener — queues new strikes for flush().  It runs on
+        the event loop, so the SQLite write waits for flush's thread.
+        """
+        if not self._following:             # read from the feed: already numbered
+            self._pending.extend(strikes)
+
+    async def flush(self) -> list:
+        """
+        Numbers the queued strikes no worker has fed yet, announces them on
+        /stream and returns them (another worker may have fed some first).
+        """
+        pending, self._pending = self._pending, []
+        if not pending:
+            return []
+        items = [
+            ("{:.1f}|{:.4f}|{:.4f}".format(_strike_ts(s), float(s["lat"]), float(s["lon"])), s)
+            for s in pending
+        ]
+        try:
+            added = await asyncio.to_thread(store.local.feed_append, items, self.ring_size)
+        except Exception:
+            self._pending[:0] = pending     # retried on the next poll
+            raise
+        self.numbered += len(added)
+        fresh = [s for _, s in added]
+        if fresh:
+            boot = await asyncio.to_thread(store.local.feed_id)
+            events.publish("strikes", {"cursor": f"{boot}:{added[-1][0]}", "strikes": fresh})
+        return fresh
+
+    def cursor(self) -> str:
+        return f"{self.boot}:{store.local.feed_head()[1]}"
+
+    def since(self, cursor: str) -> tuple[list, str, bool]:
+        """(strikes after cursor, next cursor, cursor_reset)."""
+        boot, _, seq = (cursor or "").partition(":")
+        try:
+            after = int(seq)
+        except ValueError:
+            after = -1
+        first, last, items = store.local.feed_since(max(after, 0))
+        reset = boot != self.boot or after < first - 1 or after > last
+        if reset:
+            first, last, items = store.local.feed_since(0)
+        return items, f"{self.boot}:{last}", reset
+
+    async def poll(self) -> int:
+        if not await asyncio.to_thread(store.local.claim, "lightning"):
+            return await self.follow()
+        lat, lon, radius = _ingest_area()
+        strikes = await _load_lightning(lat, lon, radius)
+        self.polls       += 1
+        self.last_poll_at = datetime.now(timezone.utc).isoformat()
+        fresh = await self.flush()          # also what requests fetched since the last poll
+        if strikes is None:
+            self.failures += 1
+            return 0
+        await asyncio.to_thread(
+            store.local.meta_set, "lightning_covered", json.dumps([lat, lon, radius, time.time()])
+        )
+        return len(fresh)
+
+    async def follow(self) -> int:
+        """Indexes what the polling worker numbered since the last call; returns how many."""
+        await self.flush()                  # strikes this worker's requests fetched
+        first_run = self._after is None
+        after = self._after or 0
+        _, last, items = await asyncio.to_thread(store.local.feed_since, after)
+        if last < after:                    # the file was recreated
+            _, last, items = await asyncio.to_thread(store.local.feed_since, 0)
+        covered = await asyncio.to_thread(store.local.meta_get, "lightning_covered")
+        lat, lon, radius, at = json.loads(covered) if covered else (None, None, None, 0.0)
+        self._after, self._following = last, True
+        try:
+            if time.time() - at < strike_index.live_s:
+                strike_index.add(items, lat, lon, radius)
+            else:
+                strike_index.add(items)     # poller silent: do not claim its area as covered
+        finally:
+            self._following = False
+        self.followed += len(items)
+        if items and not first_run:
+            boot = await asyncio.to_thread(store.local.feed_id)
+            events.publish("strikes", {"cursor": f"{boot}:{last}", "strikes": items})
+        return len(items)
+
+    def stats(self) -> dict:
+        buffered, last = store.local.feed_head()
+        return {
+            "cursor":       f"{self.boot}:{last}",
+            "buffered":     buffered,
+            "numbered":     self.numbered,
+            "followed":     self.followed,
+            "poller":       store.local.holds("lightning"),
+            "polls":        self.polls,
+            "failures":     self.failures,
+            "last_poll_at": self.last_poll_at,
+        }
+
+lightning_feed = LightningFeed()
+strike_index.subscribe(lightning_feed.append)
+
+# ═════════════════════════════════════════════════════════════════════════════
+# LIVE EVENT STREAM  (SSE push instead of polling)
+# ─────────────────────────────────────────────────────────────────────────────
+# EventHub fans out three topics to GET /stream connections:
+#   base_station — the new WeatherReport whenever the snapshot changes
+#   strikes      — strikes the ingester has not seen before, with the cursor
+#   missions     — mission queued / acknowledged / completed / aborted
+# publish() is safe from worker threads (dispatch_recon, Firestore callbacks):
+# it hops onto the event loop with call_soon_threadsafe.  Each frame is
+# encoded once and shared by every subscriber's bounded queue.
+#
+# Uvicorn runs several workers per container, and a /stream connection lands
+# on any of them while the base station monitor runs on the lease holder and
+# missions change on whichever worker took the request.  So base_station and
+# missions events also go into the local store's event_log, and relay() tails
+# it and fans out what the other workers logged.  strikes are not relayed:
+# the polling worker announces what it numbers (LightningFeed.flush) and
+# the others what they read from the feed (follow).  The log is per container —
+# separate instances each see their own missions, and base_station only
+# where the lease holder runs.
+# ═════════════════════════════════════════════════════════════════════════════
+
+class _StreamClient:
+
+    def __init__(self, topics: set, queue_max: int):
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_max)
+
+class EventHub:
+
+    TOPICS  = ("base_station", "strikes", "missions")
+    RELAYED = ("base_station", "missions")
+
+    def __init__(self, queue_max: int = STREAM_QUEUE_MAX):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None     # set by lifespan()
+        self.queue_max = max(queue_max, 2)
+        self._clients: set = set()
+        self.seq = 0
+        self.origin = f"{INSTANCE_ID}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._relay_seq: Optional[int] = None
+        # One thread writes the event_log, in publish order, off the event loop.
+        self._log_writer = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="event-log")
+        self.published = self.dropped = self.resyncs = 0
+        self.relayed = self.relay_errors = 0
+
+    @staticmethod
+    def _frame(seq: int, topic: str, data) -> bytes:
+        payload = data if isinstance(data, bytes) else json.dumps(data, default=str).encode()
+        return b"id: %d\nevent: %s\ndata: %s\n\n" % (seq, topic.encode(), payload)
+
+    def publish(self, topic: str, data) -> None:
+        """Queues `data` (JSON-able, or pre-encoded JSON bytes) for every subscriber of topic."""
+        if topic in self.RELAYED and self.loop is not None:
+            payload = data.decode() if isinstance(data, bytes) else json.dumps(data, default=str)
+            self._log_writer.submit(self._log, topic, payload)
+        loop = self.loop
+        if loop is None or loop.is_closed() or not self._clients:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._fanout(topic, data)
+        else:
+            loop.call_soon_threadsafe(self._fanout, topic, data)
+
+    def _log(self, topic: str, payload: str) -> None:
+        try:
+            store.local.event_append(self.origin, topic, payload, STREAM_RELAY_KEEP_S)
+        except Exception as e:
+            self.relay_errors += 1
+            logger.warning(f"Stream relay write failed ({topic}): {e}")
+
+    def _fanout(self, topic: str, data) -> None:
+        self.seq       += 1
+        self.published += 1
+        frame = self._frame(self.seq, topic, data)
+        for client in list(self._clients):
+            if topic not in client.topics:
+                continue
+            if client.queue.full():
+                # Slow consumer: drop its backlog and tell it to refetch state.
+                lost = client.queue.qsize()
+                while not client.queue.empty():
+                    client.queue.get_nowait()
+                self.dropped += lost
+                self.resyncs += 1
+                client.queue.put_nowait(self._frame(self.seq, "resync", {"dropped": lost}))
+            client.queue.put_nowait(frame)
+
+    async def relay(self, interval_s: float = STREAM_RELAY_POLL_S) -> None:
+        """Fans out the events other workers logged, while anyone is subscribed."""
+        while True:
+            await asyncio.sleep(interval_s)
+            if not self._clients:
+                self._relay_seq = None      # nobody to deliver to; start from the head next time
+                continue
+            try:
+                last, rows = await asyncio.to_thread(
+                    store.local.events_after, self._relay_seq or 0, self.origin
+                )
+            except Exception as e:
+                self.relay_errors += 1
+                logger.warning(f"Stream relay read failed: {e}")
+                continue
+            if self._relay_seq is None:
+                self._relay_seq = last      # first poll after subscribers appeared: no backlog
+                continue
+            self._relay_seq = last
+            for topic, data in rows:
+                self.relayed += 1
+                self._fanout(topic, data.encode())
+
+    def subscribe(self, topics: set) -> _StreamClient:
+        client = _StreamClient(topics, self.queue_max)
+        self._clients.add(client)
+        return client
+
+    def unsubscribe(self, client: _StreamClient) -> None:
+        self._clients.discard(client)
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    async def stream(self, client: _StreamClient, request: Request):
+        """SSE body: hello, then frames as they arrive, with heartbeats while idle."""
+        try:
+            snap = await current_base_station_snapshot(refresh=False)
+            yield self._frame(self.seq, "hello", {
+                "topics":            sorted(client.topics),
+                "lightning_cursor":  await asyncio.to_thread(lightning_feed.cursor),
+                "base_station_etag": snap.etag if snap else None,
+                "heartbeat_s":       STREAM_HEARTBEAT_S,
+            })
+            while True:
+                try:
+                    frame = await asyncio.wait_for(client.queue.get(), timeout=STREAM_HEARTBEAT_S)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    frame = b": ping\n\n"
+                yield frame
+        finally:
+            self.unsubscribe(client)
+
+    def stats(self) -> dict:
+        return {
+            "clients":      len(self._clients),
+            "published":    self.published,
+            "dropped":      self.dropped,
+            "resyncs":      self.resyncs,
+            "relayed":      self.relayed,
+            "relay_errors": self.relay_errors,
+        }
+
+events = EventHub()
 
 # ═════════════════════════════════════════════════════════════════════════════
 # DRONE CONTROLLER  —  DJI Mavic Pro 4
@@ -574,27 +2640,48 @@ class DroneController:
 
     ACTIVE_STATUSES = {"QUEUED", "ACKNOWLEDGED", "IN_FLIGHT"}
 
-    def _mission_doc(self, mid: str):
-        if firestore_db:
-            return firestore_db.collection("drone_missions").document(mid)
-        return None
-
     def _next_id(self) -> str:
         return f"RECON-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}"
 
     def _drone_available(self) -> bool:
         """Returns False if any mission is currently active (single-drone guard)."""
-        if not firestore_db:
-            return True
         # Firestore .where() filters documents by field value.
-        # "in" operator matches any value in the provided list.
-        active = (
-            firestore_db.collection("drone_missions")
-            .where("status", "in", list(self.ACTIVE_STATUSES))
-            .limit(1)
-            .stream()
+        # "in" operator matches any value in the provided list.  The store
+        # adds missions this instance queued that are still replicating.
+        active = store.query(
+            "drone_missions", where=(("status", "in", sorted(self.ACTIVE_STATUSES)),), limit=1,
         )
-        return not any(True for _ in active)
+        return not active
+
+    @staticmethod
+    def _flight_path(target_lat: float, target_lon: float) -> list[tuple[float, float]]:
+        """Base → target sampled every DRONE_LIGHTNING_ABORT_KM (straight out-and-back)."""
+        km = haversine_km(BASE_STATION_LAT, BASE_STATION_LON, target_lat, target_lon)
+        n  = max(1, math.ceil(km / DRONE_LIGHTNING_ABORT_KM))
+        return [
+            (BASE_STATION_LAT + (target_lat - BASE_STATION_LAT) * i / n,
+             BASE_STATION_LON + (target_lon - BASE_STATION_LON) * i / n)
+            for i in range(n + 1)
+        ]
+
+    def _lightning_guard(
+        self, target_lat: float, target_lon: float, lightning_nearby: bool,
+    ) -> tuple[bool, Optional[float]]:
+        """
+        (blocked, nearest strike km).  The lightning_nearby flag (observation,
+        alerts, strike count at the target) always grounds the drone.  With
+        a live strike feed over the whole flight path, a strike within
+        DRONE_LIGHTNING_ABORT_KM of any point on it in the last
+        DRONE_LIGHTNING_LOOKBACK_S grounds it too — the index only ever adds
+        blocking, it never clears what the coarse flag reports.
+        """
+        path = self._flight_path(target_lat, target_lon)
+        if not all(strike_index.covers(lat, lon, DRONE_LIGHTNING_ABORT_KM) for lat, lon in path):
+            return lightning_nearby, None
+        since   = time.time() - DRONE_LIGHTNING_LOOKBACK_S
+        dists   = [strike_index.nearest_km(lat, lon, DRONE_LIGHTNING_ABORT_KM, since) for lat, lon in path]
+        nearest = min((km for km in dists if km is not None), default=None)
+        return lightning_nearby or nearest is not None, nearest
 
     def dispatch_recon(
         self,
@@ -607,12 +2694,15 @@ class DroneController:
         operator_override:    bool  = False,
     ) -> dict:
 
-        if lightning_nearby:
-            logger.warning("Drone BLOCKED — active lightning within 50 km.")
+        blocked, nearest_km = self._lightning_guard(target_lat, target_lon, lightning_nearby)
+        if blocked:
+            where = f"{nearest_km:.1f} km from the flight path" if nearest_km is not None else "nearby"
+            logger.warning(f"Drone BLOCKED — active lightning {where}.")
             return {
-                "mission_id": None,
-                "status":     "BLOCKED_LIGHTNING",
-                "reason":     "Active lightning — drone grounded for safety.",
+                "mission_id":        None,
+                "status":            "BLOCKED_LIGHTNING",
+                "reason":            "Active lightning — drone grounded for safety.",
+                "nearest_strike_km": nearest_km,
             }
 
         if not operator_override and not self._drone_available():
@@ -671,43 +2761,69 @@ class DroneController:
                 "max_wind_abort_ms":     DRONE_MAX_WIND_ABORT,
                 "rth_battery_pct":       DRONE_RTH_BATTERY_PCT,
                 "geofence_radius_km":    DRONE_RECON_RADIUS_KM,
-                "abort_if_lightning_km": 5.0,
+                "abort_if_lightning_km": DRONE_LIGHTNING_ABORT_KM,
                 "lost_signal_behavior":  "return_to_home",
                 "base_elevation_m":      BASE_STATION_ELEV_M,
             },
         }
 
-        # .set() creates or overwrites the Firestore document at drone_missions/{mid}
-        ref = self._mission_doc(mid)
-        if ref:
-            ref.set(mission)
+        # .set() creates or overwrites drone_missions/{mid}; the daily mission
+        # counter rides in the same replication batch (_count_missions).
+        store.set("drone_missions", mid, mission)
+        history_pages.invalidate("drone_missions")
+        events.publish("missions", {"mission_id": mid, "status": "QUEUED", "mission": mission})
         logger.info(f"🚁 Mission queued: {mid}  risk={fire_risk_level}")
         return mission
 
+    def prestage(self, target: dict, hour: dict, model_run: str) -> Optional[dict]:
+        """
+        Records that the drone should be charged and crewed for a forecast
+        hour.  One document per hour, so repeated monitor cycles and other
+        cells forecasting the same hour update it instead of piling up.
+        """
+        expected = datetime.fromtimestamp(hour["ts"], timezone.utc)
+        pid  = f"PRESTAGE-{expected.strftime('%Y%m%d-%H')}"
+        plan = {
+            "prestage_id":     pid,
+            "status":          "PLANNED",
+            "expected_at":     expected.isoformat(),
+            "lead_hours":      round((hour["ts"] - time.time()) / 3600, 1),
+            "fire_risk_level": hour["fire_risk_level"],
+            "fire_risk_score": hour["fire_risk_score"],
+            "dry_lightning":   hour["dry_lightning"],
+            "target": {
+                "id":  target["id"],
+                "lat": target["lat"],
+                "lon": target["lon"],
+            },
+            "model_run":  model_run,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        store.set("drone_prestage", pid, plan, merge=True)
+        logger.info(
+            f"🔋 Drone pre-staged: {pid}  {hour['fire_risk_level']}"
+            f"{' +dry lightning' if hour['dry_lightning'] else ''}  target={target['id']}"
+        )
+        return plan
+
     def _update_status(self, mid: str, status: str, extra: dict = None) -> bool:
-        ref = self._mission_doc(mid)
-        if ref and ref.get().exists:
-            # .update() merges fields into an existing Firestore document
-            # without overwriting the entire document.
-            update = {
-                "status": status,
-                f"{status.lower()}_at": datetime.now(timezone.utc).isoformat(),
-            }
-            if extra:
-                update.update(extra)
-            ref.update(update)
-            return True
-        return False
+        # .update() merges fields into an existing document without
+        # overwriting the entire document; False if the mission is unknown.
+        update = {
+            "status": status,
+            f"{status.lower()}_at": datetime.now(timezone.utc).isoformat(),
+        }
+        if extra:
+            update.update(extra)
+        if not store.update("drone_missions", mid, update):
+            return False
+        history_pages.invalidate("drone_missions")
+        events.publish("missions", {"mission_id": mid, **update})
+        return True
 
     def get_pending(self) -> list:
-        if not firestore_db:
-            return []
-        docs = (
-            firestore_db.collection("drone_missions")
-            .where("status", "==", "QUEUED")
-            .stream()
-        )
-        return [d.to_dict() for d in docs]
+        docs = store.query("drone_missions", where=(("status", "==", "QUEUED"),))
+        return [data for _, data in docs]
 
     def acknowledge(self, mid: str) -> bool:
         return self._update_status(mid, "ACKNOWLEDGED")
@@ -718,19 +2834,26 @@ class DroneController:
     def abort(self, mid: str, reason: str = "operator abort") -> bool:
         return self._update_status(mid, "ABORTED", {"abort_reason": reason})
 
-    def get_log(self, limit: int = 50) -> list:
-        if not firestore_db:
-            return []
-        docs = (
-            firestore_db.collection("drone_missions")
-            .order_by("created_at", direction="DESCENDING")
-            .limit(limit)
-            .stream()
-        )
-        return [d.to_dict() for d in docs]
+    def get_log(
+        self, limit: int = 50, cursor: Optional[str] = None, fields: Optional[list] = None,
+    ) -> dict:
+        """One keyset page of the mission log: {"items", "next_cursor"}."""
+        return keyset_page("drone_missions", "created_at", limit, cursor, fields)
 
 drone = DroneController()
 
+def _count_missions(batch, rows: list) -> None:
+    """Replication hook: counts newly queued missions on their created_at day."""
+    per_day: dict = {}
+    for op, mid, data in rows:
+        if op == "set":
+            day = str(data.get("created_at") or "")[:10] or _utc_day()
+            per_day.setdefault(day, []).append((mid, {"drone_missions": 1}))
+    for day, counted in per_day.items():
+        _count_daily(batch, day, counted)
+
+store.hooks["drone_missions"] = _count_missions
+
 # ═════════════════════════════════════════════════════════════════════════════
 # PUSH NOTIFICATIONS  (Firebase Cloud Messaging → FlutterFlow app)
 # ─────────────────────────────────────────────────────────────────────────────
@@ -740,11 +2863,27 @@ drone = DroneController()
 #      This returns a device-specific token string (~150 chars).
 #   2. The app posts that token to /auth/register-fcm-token.
 #   3. This backend stores it in Firestore subscribers/{uid}.fcm_token.
-#   4. When an alert fires, broadcast_alert_to_subscribers() reads all
-#      active subscriber documents, pulls fcm_token from each, and sends.
+#   4. When an alert fires, broadcast_alert_to_subscribers() takes every
+#      active subscriber's fcm_token from the AudienceIndex (loaded from
+#      Firestore once, then kept current) and sends in multicast batches.
+#      Tokens FCM reports UNREGISTERED / INVALID_ARGUMENT are blanked.
 #   5. FCM delivers to the device regardless of whether the app is open.
 # ═════════════════════════════════════════════════════════════════════════════
 
+def _push_parts(title: str, body: str, data: dict = None) -> dict:
+    """Message fields shared by single-token and multicast sends."""
+    return {
+        "notification": fcm_messaging.Notification(title=title, body=body),
+        "data":         {str(k): str(v) for k, v in (data or {}).items()},
+        "android":      fcm_messaging.AndroidConfig(priority="high"),
+        "apns":         fcm_messaging.APNSConfig(
+            headers={"apns-priority": "10"},
+            payload=fcm_messaging.APNSPayload(
+                aps=fcm_messaging.Aps(sound="default")
+            ),
+        ),
+    }
+
 def send_push_to_token(
     device_token: str, title: str, body: str, data: dict = None
 ) -> bool:
@@ -752,18 +2891,7 @@ def send_push_to_token(
         logger.warning("Push skipped — Firebase not configured.")
         return False
     try:
-        msg = fcm_messaging.Message(
-            notification=fcm_messaging.Notification(title=title, body=body),
-            data={str(k): str(v) for k, v in (data or {}).items()},
-            token=device_token,
-            android=fcm_messaging.AndroidConfig(priority="high"),
-            apns=fcm_messaging.APNSConfig(
-                headers={"apns-priority": "10"},
-                payload=fcm_messaging.APNSPayload(
-                    aps=fcm_messaging.Aps(sound="default")
-                ),
-            ),
-        )
+        msg  = fcm_messaging.Message(token=device_token, **_push_parts(title, body, data))
         resp = fcm_messaging.send(msg)
         logger.info(f"FCM sent: {resp}")
         return True
@@ -771,45 +2899,222 @@ def send_push_to_token(
         logger.error(f"FCM error: {e}")
         return False
 
-def broadcast_alert_to_subscribers(
-    title: str, body: str, data: dict = None
-) -> int:
+class AudienceIndex:
     """
-    Pushes an alert to every active subscriber who has a stored FCM token.
-    Called automatically by monitor_base_station() when risk escalates.
+    uid → FCM token for every active subscriber with a deliverable device.
+
+    Loaded with one Firestore query on the first broadcast, then kept current
+    by sync() calls from register_fcm_token, stripe_webhook and the
+    entitlement snapshot listener.  Only the listener sees changes handled
+    by other workers, so without it the index is reloaded once it is older
+    than ttl_s.  Tokens FCM reports as dead are removed here and blanked in
+    Firestore by prune().
     """
-    if not firestore_db:
-        return 0
-    # Firestore compound query: active == True AND fcm_token is not empty
-    docs = (
-        firestore_db.collection("subscribers")
-        .where("active",     "==", True)
-        .where("fcm_token",  "!=", "")
-        .stream()
-    )
-    count = 0
-    for doc in docs:
-        token = doc.to_dict().get("fcm_token")
-        if token and send_push_to_token(token, title, body, data):
-            count += 1
-    logger.info(f"Broadcast sent to {count} subscriber(s).")
-    return count
+
+    def __init__(self, ttl_s: float = AUDIENCE_TTL_S):
+        self.ttl_s   = ttl_s
+        self._lock   = threading.Lock()
+        self._tokens: dict = {}
+        self.loaded  = False
+        self.loaded_at = 0.0
+        self.pruned  = self.loads = 0
+
+    def load(self) -> None:
+        # Firestore compound query: active == True AND fcm_token is not empty
+        docs = (
+            firestore_db.collection("subscribers")
+            .where("active",     "==", True)
+            .where("fcm_token",  "!=", "")
+            .stream()
+        )
+        tokens = {d.id: d.to_dict().get("fcm_token") for d in docs}
+        with self._lock:
+            self._tokens = {uid: t for uid, t in tokens.items() if t}
+            self.loaded  = True
+            self.loaded_at = time.monotonic()
+        self.loads += 1
+        logger.info(f"Broadcast audience loaded: {len(self._tokens)} device(s).")
+
+    def members(self) -> list[tuple[str, str]]:
+        stale = time.monotonic() - self.loaded_at > self.ttl_s and not entitlements.listening
+        if not self.loaded or stale:
+            self.load()
+        with self._lock:
+            return list(self._tokens.items())
+
+    def sync(self, uid: str, data: Optional[dict]) -> None:
+        """Re-derives one subscriber's membership from their document."""
+        token = (data or {}).get("fcm_token")
+        with self._lock:
+            if data and data.get("active") and token:
+                self._tokens[uid] = token
+            else:
+                self._tokens.pop(uid, None)
+
+    def prune(self, dead: list[tuple[str, str]]) -> int:
+        """Blanks tokens FCM rejected, through the store (replicated in batches)."""
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            # Skip devices that re-registered a new token since the send.
+            dead = [(uid, t) for uid, t in dead if self._tokens.get(uid) == t]
+            for uid, _ in dead:
+                self._tokens.pop(uid, None)
+        fields = {"fcm_token": "", "fcm_token_pruned_at": now}
+        for uid, _ in dead:
+            try:
+                store.update("subscribers", uid, fields)
+            except Exception as e:
+                logger.error(f"FCM token prune failed for {uid}: {e}")
+            entitlements.update(uid, fields)
+        self.pruned += len(dead)
+        if dead:
+            logger.info(f"Pruned {len(dead)} dead FCM token(s).")
+        return len(dead)
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._tokens)
+        return {"loaded": self.loaded, "devices": size, "loads": self.loads, "pruned": self.pruned}
+
+audience = AudienceIndex()
+
+# Shared across broadcasts so two overlapping alerts still respect the bound.
+_fcm_pool = concurrent.futures.ThreadPoolExecutor(
+    max_workers=FCM_BROADCAST_CONCURRENCY, thread_name_prefix="fcm"
+)
+last_broadcast: dict = {}
+
+def _is_dead_token_error(exc: Exception) -> bool:
+    """
+    UNREGISTERED (app uninstalled), or INVALID_ARGUMENT about the token
+    itself.  FCM also answers INVALID_ARGUMENT for a malformed message (bad
+    payload, oversized data) — that says nothing about the device.
+    """
+    if isinstance(exc, fcm_messaging.UnregisteredError):
+        return True
+    return getattr(exc, "code", None) == "INVALID_ARGUMENT" and "registration token" in str(exc).lower()
+
+def _send_multicast_batch(members: list, parts: dict) -> tuple[int, int, list]:
+    """
+    One FCM multicast request for [(uid, token), ...].
+    Returns (success_count, failure_count, dead_members).
+    """
+    try:
+        resp = fcm_messaging.send_each_for_multicast(
+            fcm_messaging.MulticastMessage(tokens=[t for _, t in members], **parts)
+        )
+    except Exception as e:
+        logger.error(f"FCM multicast error ({len(members)} tokens): {e}")
+        return 0, len(members), []
+    dead = [
+        member for member, r in zip(members, resp.responses)
+        if not r.success and _is_dead_token_error(r.exception)
+    ]
+    return resp.success_count, resp.failure_count, dead
+
+def broadcast_alert_to_subscribers(
+    title: str, body: str, data: dict = None
+) -> int:
+    """
+    Pushes an alert to every active subscriber who has a stored FCM token.
+    Called automatically by monitor_base_station() when risk escalates.
+
+    Recipients come from the in-memory AudienceIndex.  The message is built
+    once and sent as FCM multicasts of up to FCM_MULTICAST_BATCH tokens,
+    FCM_BROADCAST_CONCURRENCY batches at a time; dead tokens are pruned
+    afterwards.  Returns the number of devices FCM accepted.
+    """
+    global last_broadcast
+    if not firestore_db:
+        return 0
+    if not fcm_available:
+        logger.warning("Broadcast skipped — Firebase not configured.")
+        return 0
+    started = time.perf_counter()
+    members = audience.members()
+    parts   = _push_parts(title, body, data)
+    batches = [
+        members[i:i + FCM_MULTICAST_BATCH]
+        for i in range(0, len(members), FCM_MULTICAST_BATCH)
+    ]
+    results = list(_fcm_pool.map(lambda b: _send_multicast_batch(b, parts), batches))
+
+    for i, (ok, failed, _) in enumerate(results, 1):
+        logger.info(f"Broadcast batch {i}/{len(batches)}: {ok} sent · {failed} failed")
+    pruned = audience.prune([m for _, _, dead in results for m in dead])
+    count  = sum(ok for ok, _, _ in results)
+    last_broadcast = {
+        "title":     title,
+        "tokens":    len(members),
+        "sent":      count,
+        "failed":    sum(failed for _, failed, _ in results),
+        "pruned":    pruned,
+        "batches":   [{"sent": ok, "failed": failed} for ok, failed, _ in results],
+        "elapsed_s": round(time.perf_counter() - started, 3),
+        "at":        datetime.now(timezone.utc).isoformat(),
+    }
+    logger.info(f"Broadcast sent to {count} subscriber(s).")
+    return count
 
 # ═════════════════════════════════════════════════════════════════════════════
 # CORE ASSESSMENT  (single source of truth for all weather endpoints)
 # ═════════════════════════════════════════════════════════════════════════════
 
-def assess_location(lat: float, lon: float) -> dict:
-    wd = fetch_current_weather(lat, lon)
+async def _fetch_fanout(lat: float, lon: float) -> tuple[Optional[dict], list, list, list]:
+    """
+    Issues /current, /alerts and /lightning concurrently.
+    Returns (weather, alerts, strikes, degraded) — degraded names the optional
+    legs that missed ASSESS_OPTIONAL_DEADLINE_S and were dropped.
+    """
+    loop    = asyncio.get_running_loop()
+    started = loop.time()
+    current = asyncio.create_task(fetch_current_weather(lat, lon))
+    legs = {
+        "alerts":    asyncio.create_task(fetch_active_alerts(lat, lon)),
+        "lightning": asyncio.create_task(nearby_strikes(lat, lon)),
+    }
+    try:
+        wd = await current
+    except BaseException:
+        for t in legs.values():
+            t.cancel()
+        raise
     if not wd:
-        return {}
-    alerts          = fetch_active_alerts(lat, lon)
-    strikes         = fetch_lightning_strikes(lat, lon, 50)
-    fire_score, fire_level = calculate_fire_risk(wd)
-    lightning, dry  = detect_lightning(wd, alerts, len(strikes))
-    precip          = wd.get('precip') or 0
-    drone_rec       = (fire_level in ("HIGH", "EXTREME") and precip < 0.5) or dry
-
+        for t in legs.values():
+            t.cancel()
+        return None, [], [], []
+
+    pending = [t for t in legs.values() if not t.done()]
+    if pending:
+        remaining = ASSESS_OPTIONAL_DEADLINE_S - (loop.time() - started)
+        await asyncio.wait(pending, timeout=max(remaining, 0))
+
+    results, degraded = {}, []
+    for name, t in legs.items():
+        if t.done() and not t.cancelled():
+            results[name] = t.result()
+        else:
+            t.cancel()
+            degraded.append(name)
+            results[name] = []
+    if degraded:
+        logger.warning(f"assess_location degraded at {lat:.4f},{lon:.4f}: {degraded}")
+    return wd, results["alerts"], results["lightning"], degraded
+
+async def _fetch_legs(lat: float, lon: float) -> tuple[Optional[dict], list, list, list]:
+    if ASSESS_FANOUT:
+        return await _fetch_fanout(lat, lon)
+    wd      = await fetch_current_weather(lat, lon)
+    alerts  = await fetch_active_alerts(lat, lon) if wd else []
+    strikes = await nearby_strikes(lat, lon) if wd else []
+    return wd, alerts, strikes, []
+
+def _context(
+    wd: dict, alerts: list, strikes: list, degraded: list,
+    fire_score: int, fire_level: str, lightning: bool, dry: bool,
+) -> dict:
+    precip    = wd.get('precip') or 0
+    drone_rec = (fire_level in ("HIGH", "EXTREME") and precip < 0.5) or dry
     return {
         "weather":          wd,
         "alerts":           alerts,
@@ -820,8 +3125,17 @@ def assess_location(lat: float, lon: float) -> dict:
         "dry_lightning":    dry,
         "drone_recommended": drone_rec,
         "precip":           precip,
+        "degraded":         degraded,
     }
 
+async def assess_location(lat: float, lon: float) -> dict:
+    wd, alerts, strikes, degraded = await _fetch_legs(lat, lon)
+    if not wd:
+        return {}
+    fire_score, fire_level = calculate_fire_risk(wd)
+    lightning, dry = detect_lightning(wd, alerts, len(strikes))
+    return _context(wd, alerts, strikes, degraded, fire_score, fire_level, lightning, dry)
+
 def _build_report(lat: float, lon: float, ctx: dict) -> WeatherReport:
     wd = ctx["weather"]
     return WeatherReport(
@@ -842,22 +3156,508 @@ def _build_report(lat: float, lon: float, ctx: dict) -> WeatherReport:
         fire_risk_level=ctx["fire_level"],
         lightning_nearby=ctx["lightning_nearby"],
         dry_lightning=ctx["dry_lightning"],
+        nearest_strike_km=(
+            strike_index.nearest_km(lat, lon) if strike_index.covers(lat, lon) else None
+        ),
         active_alerts=ctx["alerts"],
         drone_recon_recommended=ctx["drone_recommended"],
+        degraded=ctx.get("degraded", []),
     )
 
-def _persist_weather_record(report: WeatherReport) -> None:
+class WriteBehindBuffer:
     """
-    Writes one WeatherReport to Firestore collection 'weather_records'.
-    .add() auto-generates a document ID (a random Firestore string like Xk3pQ2...).
-    This is fine for append-only logs where you don't need a predictable ID.
+    Buffers weather_records writes and commits them as Firestore batches
+    from a daemon flusher thread.
+
+    Each record gets its document ID when it is queued, so replaying the
+    spool after a partial failure overwrites documents instead of
+    duplicating them.  drain() is called from lifespan shutdown and the
+    SIGTERM handler so a container restart does not drop queued records.
     """
-    if not firestore_db:
-        return
+
+    def __init__(
+        self,
+        collection:  str,
+        on_commit:   Optional[Callable] = None,
+        batch_size:  int   = WRITE_BEHIND_BATCH,
+        flush_s:     float = WRITE_BEHIND_FLUSH_S,
+        max_pending: int   = WRITE_BEHIND_MAX_PENDING,
+        spool_path:  str   = WRITE_BEHIND_SPOOL,
+    ):
+        self.collection = collection
+        self.on_commit  = on_commit                 # on_commit(batch, items) adds extra writes
+        # Firestore batch limit is 500 writes; leave room for the counter
+        # shards a hook adds (one per shard per day, two days at midnight).
+        self.batch_size = min(batch_size, 500 - 2 * DAILY_COUNTER_SHARDS)
+        self.flush_s    = flush_s
+        self.spool_path = spool_path
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._stop       = threading.Event()
+        self._thread:    Optional[threading.Thread] = None
+        self._spool_lock = threading.Lock()
+        self.committed = self.spilled = self.replayed = self.commits = 0
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, daemon=True, name=f"write-behind-{self.collection}"
+            )
+            self._thread.start()
+
+    def put(self, data: dict, doc_id: Optional[str] = None) -> None:
+        item = (doc_id or uuid.uuid4().hex, data)
+        try:
+            self._queue.put(item, timeout=WRITE_BEHIND_PUT_TIMEOUT_S)
+        except queue.Full:
+            logger.warning(f"{self.collection} buffer full — spooling record to disk.")
+            self._spill([item])
+
+    def _take_batch(self, first_wait: float) -> list:
+        try:
+            batch = [self._queue.get(timeout=first_wait)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_s
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        self._replay_spool()
+        while not self._stop.is_set():
+            batch = self._take_batch(first_wait=1.0)
+            if batch and self._commit(batch):
+                self._replay_spool()
+
+    def _commit(self, items: list, spill: bool = True) -> bool:
+        try:
+            coll  = firestore_db.collection(self.collection)
+            batch = firestore_db.batch()
+            for doc_id, data in items:
+                batch.set(coll.document(doc_id), data)
+            if self.on_commit:
+                self.on_commit(batch, items)
+            batch.commit()
+        except Exception as e:
+            logger.error(f"Firestore batch write failed ({len(items)} records): {e}")
+            if spill:
+                self._spill(items)
+            return False
+        self.commits   += 1
+        self.committed += len(items)
+        return True
+
+    def _spill(self, items: list) -> None:
+        try:
+            with self._spool_lock:
+                os.makedirs(os.path.dirname(self.spool_path) or ".", exist_ok=True)
+                with open(self.spool_path, "a+b") as f:
+                    # A torn last line (killed mid-write) must not swallow the next record.
+                    if f.seek(0, os.SEEK_END):
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b"\n":
+                            f.write(b"\n")
+                with open(self.spool_path, "a", encoding="utf-8") as f:
+                    for doc_id, data in items:
+                        f.write(json.dumps({"id": doc_id, "data": data}, default=str) + "\n")
+            self.spilled += len(items)
+        except OSError as e:
+            logger.error(f"Spool write failed — {len(items)} record(s) lost: {e}")
+
+    def _replay_spool(self) -> None:
+        """
+        Commits spooled records.  The spool is renamed to .replaying first so
+        new spills go to a fresh file; a .replaying left by a crash is picked
+        up before anything newer.  The file is only removed once every record
+        in it is committed — on failure it is rewritten with what is left.
+        An flock keeps the other workers of this container off the same file.
+        """
+        replay_path = self.spool_path + ".replaying"
+        try:
+            os.makedirs(os.path.dirname(self.spool_path) or ".", exist_ok=True)
+            fd = os.open(self.spool_path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            logger.error(f"Spool replay skipped — cannot open lock file: {e}")
+            return
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return                                  # another worker is replaying
+        try:
+            with self._spool_lock:
+                if not os.path.exists(replay_path):
+                    if not os.path.exists(self.spool_path):
+                        return
+                    os.replace(self.spool_path, replay_path)
+            items, torn = [], 0
+            with open(replay_path, encoding="utf-8") as f:
+                for line in filter(str.strip, f):
+                    try:
+                        r = json.loads(line)
+                        items.append((r["id"], r["data"]))
+                    except (ValueError, KeyError, TypeError):
+                        torn += 1                   # e.g. cut short by a kill mid-_spill
+            if torn:
+                logger.warning(f"Skipped {torn} unreadable line(s) in {replay_path}.")
+            done = 0
+            while done < len(items):
+                chunk = items[done:done + self.batch_size]
+                if not self._commit(chunk, spill=False):
+                    break
+                done += len(chunk)
+            self.replayed += done
+            if done == len(items):
+                os.remove(replay_path)
+            else:
+                tmp = replay_path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    for doc_id, data in items[done:]:
+                        f.write(json.dumps({"id": doc_id, "data": data}, default=str) + "\n")
+                os.replace(tmp, replay_path)
+            if done:
+                logger.info(f"Replayed {done} spooled {self.collection} record(s).")
+        except OSError as e:
+            logger.error(f"Spool replay failed, will retry: {e}")
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def drain(self, timeout: float = 10.0) -> None:
+        """Stops the flusher and commits (or spools) everything still queued."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        items = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for i in range(0, len(items), self.batch_size):
+            chunk = items[i:i + self.batch_size]
+            if firestore_db:
+                self._commit(chunk)
+            else:
+                self._spill(chunk)
+        if items:
+            logger.info(f"Drained {len(items)} buffered {self.collection} record(s).")
+
+    def stats(self) -> dict:
+        return {
+            "pending":   self._queue.qsize(),
+            "commits":   self.commits,
+            "committed": self.committed,
+            "spilled":   self.spilled,
+            "replayed":  self.replayed,
+        }
+
+def _count_weather_records(batch, items: list) -> None:
+    """Adds the day's counter shard writes to a weather_records batch."""
+    per_day: dict = {}
+    for doc_id, data in items:
+        # Weatherbit datetimes look like "2025-06-01:14"; the first ten
+        # characters are the same UTC day the old summary filtered on.
+        day = str(data.get("timestamp") or "")[:10] or _utc_day()
+        per_day.setdefault(day, []).append(
+            (doc_id, {"weather_records": 1, f"risk_{data.get('fire_risk_level')}": 1})
+        )
+    for day, counted in per_day.items():
+        _count_daily(batch, day, counted)
+
+def _on_weather_commit(batch, items: list) -> None:
+    _count_weather_records(batch, items)
+    history_pages.invalidate("weather_records", head_only=True)
+
+weather_writer = WriteBehindBuffer("weather_records", on_commit=_on_weather_commit)
+
+def _persist_weather_record(report: WeatherReport, uid: Optional[str] = None) -> None:
+    """
+    Queues one WeatherReport for Firestore collection 'weather_records'.
+    WriteBehindBuffer commits queued records in batches, so N /check-risk
+    calls cost a handful of batch commits instead of N .add() round-trips.
+    Records carry the owner's uid, the cache cell and a precise recorded_at,
+    so /weather/history is one indexed range read per subscriber
+    (composite index uid ASC, recorded_at DESC — see main.tf).
+
+    The local store keeps a copy under the same document ID (history
+    without Firestore, and when a Firestore query fails); the buffer, not
+    the store's outbox, sends it to Firestore.
+    """
+    clat, clon = weather_cache.cell(report.latitude, report.longitude)
+    doc_id = uuid.uuid4().hex
+    record = {
+        **report.model_dump(),
+        "uid":         uid,
+        "cell":        f"{clat:.4f},{clon:.4f}",
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+    }
+    store.set("weather_records", doc_id, record, replicate=False)
+    if firestore_db:
+        weather_writer.put(record, doc_id)
+
+# ═════════════════════════════════════════════════════════════════════════════
+# KEYSET PAGINATION  (history tab, mission log)
+# ─────────────────────────────────────────────────────────────────────────────
+# Pages are ordered newest first by a timestamp field, ties broken by
+# document ID, and continue with start_after(last timestamp, last ID) — each
+# page costs limit + 1 document reads however deep the user scrolls (offset
+# paging would bill every skipped document).  fields= becomes a server-side
+# .select(), so the big active_alerts / waypoints blobs are only transferred
+# when asked for.  Cursors are opaque base64url JSON.
+# ═════════════════════════════════════════════════════════════════════════════
+
+HISTORY_FIELDS = frozenset(WeatherReport.model_fields) | {"uid", "cell", "recorded_at"}
+MISSION_FIELDS = frozenset({
+    "mission_id", "status", "created_at", "drone_model", "base_station",
+    "trigger", "waypoints", "camera", "safety", "images", "operator_notes",
+    "acknowledged_at", "completed_at", "aborted_at", "abort_reason",
+})
+
+class PageCache:
+
+    def __init__(self, ttl_s: float = PAGE_CACHE_TTL_S, max_pages: int = PAGE_CACHE_MAX_PAGES):
+        self.ttl_s     = ttl_s
+        self.max_pages = max_pages
+        # (collection, scope, cursor, limit, fields) → (page, expires_at)
+        self._pages: OrderedDict = OrderedDict()
+        self._lock  = threading.Lock()
+        self.hits = self.misses = self.invalidations = 0
+
+    def get(self, key: tuple) -> Optional[dict]:
+        with self._lock:
+            entry = self._pages.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                self.misses += 1
+                return None
+            self._pages.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: tuple, page: dict) -> None:
+        with self._lock:
+            self._pages[key] = (page, time.monotonic() + self.ttl_s)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+
+    def invalidate(self, collection: str, head_only: bool = False) -> None:
+        """Drops cached pages of a collection; head_only keeps cursor pages (append-only data)."""
+        with self._lock:
+            for key in [k for k in self._pages if k[0] == collection and (k[2] is None or not head_only)]:
+                del self._pages[key]
+                self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "pages":         len(self._pages),
+            "hits":          self.hits,
+            "misses":        self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate":      round(self.hits / lookups, 4) if lookups else None,
+        }
+
+history_pages = PageCache()
+
+def _encode_cursor(value, doc_id: str) -> str:
+    raw = json.dumps([value, doc_id], default=_json_default, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        value, doc_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    # Only scalars go into start_after — a crafted [{"a":1}, …] would otherwise
+    # reach the query and fail there as a 500.
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)) or not isinstance(doc_id, str):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    return value, doc_id
+
+def parse_fields(fields: Optional[str], allowed: frozenset, order_field: str) -> Optional[list]:
+    """fields=a,b,c → projection list (order field always included); None = whole documents."""
+    if not fields:
+        return None
+    wanted  = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = sorted(set(wanted) - allowed)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}")
+    if order_field not in wanted:
+        wanted.append(order_field)
+    return wanted
+
+def keyset_page(
+    collection:  str,
+    order_field: str,
+    limit:       int,
+    cursor:      Optional[str]  = None,
+    fields:      Optional[list] = None,
+    where:       tuple          = (),
+) -> dict:
+    """
+    One page of `collection`, newest first.  Returns {"items", "next_cursor"};
+    next_cursor is None on the last page.  Blocking — call via asyncio.to_thread.
+    """
+    key  = (collection, where, cursor, limit, tuple(fields) if fields else None)
+    page = history_pages.get(key)
+    if page is not None:
+        return page
+
+    docs = store.query(
+        collection, where, order_by=order_field, descending=True,
+        start_after=_decode_cursor(cursor) if cursor else None,
+        limit=limit + 1, fields=fields,
+    )
+    more  = len(docs) > limit
+    docs  = docs[:limit]
+    items = [data for _, data in docs]
+    page  = {
+        "items":       items,
+        "next_cursor": _encode_cursor(items[-1].get(order_field), docs[-1][0]) if more else None,
+    }
+    history_pages.put(key, page)
+    return page
+
+# ═════════════════════════════════════════════════════════════════════════════
+# BASE STATION SNAPSHOT  (home-screen tile served from memory)
+# ─────────────────────────────────────────────────────────────────────────────
+# monitor_base_station() already assesses the base station every 15 minutes.
+# Each run publishes an immutable snapshot holding the serialized report plus
+# its ETag / Last-Modified, and /base-station hands those bytes out as-is.
+# The FlutterFlow tile can send If-None-Match and get a bodiless 304 back.
+#
+# The monitor only runs on the scheduler lease holder, so the snapshot is also
+# written to the local store's meta table.  Other workers adopt it from there
+# (current_base_station_snapshot), so every worker hands out the same bytes
+# and ETag instead of each recomputing its own.
+# ═════════════════════════════════════════════════════════════════════════════
+
+@dataclass(frozen=True)
+class BaseStationSnapshot:
+    report:        WeatherReport
+    body:          bytes
+    etag:          str
+    last_modified: datetime
+    published_at:  float          # time.monotonic() of publication
+
+    def headers(self) -> dict:
+        return {
+            "ETag":          self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            "Cache-Control": "private, no-cache",
+        }
+
+    def not_modified(self, request: Request) -> bool:
+        """Conditional GET check — If-None-Match wins over If-Modified-Since."""
+        inm = request.headers.get("if-none-match")
+        if inm is not None:
+            tags = {t.strip().removeprefix("W/") for t in inm.split(",")}
+            return "*" in tags or self.etag in tags
+        ims = request.headers.get("if-modified-since")
+        if ims:
+            try:
+                return self.last_modified.replace(microsecond=0) <= parsedate_to_datetime(ims)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+base_station_snapshot: Optional[BaseStationSnapshot] = None
+_base_station_synced_at = float("-inf")     # monotonic time of the last store check
+
+def publish_base_station_snapshot(ctx: dict) -> BaseStationSnapshot:
+    """
+    Serializes the base-station report once, swaps it in atomically and
+    shares it through the local store.  Blocking (SQLite write) — call it
+    via asyncio.to_thread from the event loop.
+    """
+    global base_station_snapshot
+    report = _build_report(BASE_STATION_LAT, BASE_STATION_LON, ctx)
+    body   = report.model_dump_json().encode()
+    etag   = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+    prev    = base_station_snapshot
+    changed = prev is None or prev.etag != etag
+    last_modified = prev.last_modified if not changed else datetime.now(timezone.utc)
+    base_station_snapshot = BaseStationSnapshot(
+        report=report,
+        body=body,
+        etag=etag,
+        last_modified=last_modified,
+        published_at=time.monotonic(),
+    )
+    try:
+        store.local.meta_set("base_station_snapshot", json.dumps({
+            "body":          body.decode(),
+            "etag":          etag,
+            "last_modified": last_modified.isoformat(),
+            "published":     time.time(),
+        }))
+    except Exception as e:
+        logger.warning(f"Base station snapshot not shared: {e}")
+    if changed:
+        events.publish("base_station", body)
+    return base_station_snapshot
+
+def _adopt_shared_base_station_snapshot() -> Optional[BaseStationSnapshot]:
+    """Swaps in the snapshot another worker published, if it is newer than ours."""
+    global base_station_snapshot
+    raw = store.local.meta_get("base_station_snapshot")
+    if not raw:
+        return base_station_snapshot
     try:
-        firestore_db.collection("weather_records").add(report.model_dump())
+        shared = json.loads(raw)
+        published_at = time.monotonic() - max(time.time() - shared["published"], 0.0)
+        prev = base_station_snapshot
+        if prev is not None and prev.published_at >= published_at - 1.0:
+            return prev
+        body = shared["body"].encode()
+        base_station_snapshot = BaseStationSnapshot(
+            report=WeatherReport.model_validate_json(body),
+            body=body,
+            etag=shared["etag"],
+            last_modified=datetime.fromisoformat(shared["last_modified"]),
+            published_at=published_at,
+        )
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Shared base station snapshot unreadable: {e}")
+    return base_station_snapshot
+
+async def _sync_base_station_snapshot() -> Optional[BaseStationSnapshot]:
+    global _base_station_synced_at
+    try:
+        return await asyncio.to_thread(_adopt_shared_base_station_snapshot)
     except Exception as e:
-        logger.error(f"Firestore write failed: {e}")
+        logger.warning(f"Shared base station snapshot read failed: {e}")
+        return base_station_snapshot
+    finally:
+        _base_station_synced_at = time.monotonic()
+
+async def _refresh_base_station_snapshot() -> Optional[BaseStationSnapshot]:
+    ctx = await assess_location(BASE_STATION_LAT, BASE_STATION_LON)
+    return await asyncio.to_thread(publish_base_station_snapshot, ctx) if ctx else None
+
+async def current_base_station_snapshot(refresh: bool = True) -> Optional[BaseStationSnapshot]:
+    """
+    The snapshot this worker should serve: its own, or a newer one from the
+    store (checked every BASE_STATION_SNAPSHOT_SYNC_S).  With refresh, it is
+    recomputed when nobody has published for BASE_STATION_SNAPSHOT_MAX_AGE_S.
+    """
+    snap = base_station_snapshot
+    if time.monotonic() - _base_station_synced_at > BASE_STATION_SNAPSHOT_SYNC_S:
+        snap = await flights.do(("base-station-sync",), _sync_base_station_snapshot) or snap
+    if not refresh:
+        return snap
+    if snap is None or time.monotonic() - snap.published_at > BASE_STATION_SNAPSHOT_MAX_AGE_S:
+        snap = await flights.do(("base-station-snapshot",), _refresh_base_station_snapshot) or snap
+    return snap
 
 # ═════════════════════════════════════════════════════════════════════════════
 # BACKGROUND MONITOR  (15-min base station self-check)
@@ -865,9 +3665,10 @@ def _persist_weather_record(report: WeatherReport) -> None:
 
 async def monitor_base_station() -> None:
     logger.info(f"🔍 Auto-check: {BASE_STATION_NAME}")
-    ctx = assess_location(BASE_STATION_LAT, BASE_STATION_LON)
+    ctx = await assess_location(BASE_STATION_LAT, BASE_STATION_LON)
     if not ctx:
         return
+    await asyncio.to_thread(publish_base_station_snapshot, ctx)
 
     fl = ctx["fire_level"]
     ln = ctx["lightning_nearby"]
@@ -879,12 +3680,16 @@ async def monitor_base_station() -> None:
         f"Lightning={ln}  DryLightning={dl}  DroneRec={dr}"
     )
 
+    # Firestore and FCM calls are blocking — keep them off the event loop.
     if dr:
-        drone.dispatch_recon(BASE_STATION_LAT, BASE_STATION_LON, fl, ln)
+        await asyncio.to_thread(
+            drone.dispatch_recon, BASE_STATION_LAT, BASE_STATION_LON, fl, ln
+        )
 
     if fl in ("HIGH", "EXTREME") or dl:
         level_label = "⚡ DRY LIGHTNING" if dl else f"🔥 Fire Risk: {fl}"
-        broadcast_alert_to_subscribers(
+        await asyncio.to_thread(
+            broadcast_alert_to_subscribers,
             title=f"ThorsHammer Alert — {fl}",
             body=(
                 f"{level_label} detected near {BASE_STATION_NAME}. "
@@ -898,17 +3703,809 @@ async def monitor_base_station() -> None:
             },
         )
 
-def _run_scheduler() -> None:
-    """Daemon thread — runs schedule jobs without blocking the async event loop."""
-    while True:
-        schedule.run_pending()
-        time.sleep(30)
+# ═════════════════════════════════════════════════════════════════════════════
+# COUNTY RISK GRID  (multi-point watch, refreshed every monitor cycle)
+# ─────────────────────────────────────────────────────────────────────────────
+# The base-station monitor sees one point; subscribers and the drone's 10 km
+# envelope cover the whole county.  RiskGrid assesses every watch point
+# concurrently (through the same cache + single-flight path as the
+# endpoints) and keeps the latest per-cell context in memory.  GET /risk/grid
+# serves the map, and /check-risk answers from the nearest fresh cell instead
+# of a live upstream call.
+#
+# The refresh is leader-only, so the leader publishes the cells as one
+# document (risk_grid/latest, through the local store) and the other workers
+# and instances load it every RISK_GRID_SYNC_S.  A worker that boots with no
+# fresh published grid refreshes once itself instead of serving an empty map
+# until the first interval.
+# ═════════════════════════════════════════════════════════════════════════════
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * 6371.0 * math.asin(math.sqrt(a))
+
+def _point_in_polygon(lat: float, lon: float, polygon: list) -> bool:
+    """Ray casting on [[lat, lon], ...] — fine at county scale."""
+    inside = False
+    for (lat1, lon1), (lat2, lon2) in zip(polygon, polygon[1:] + polygon[:1]):
+        if (lat1 > lat) != (lat2 > lat):
+            cross = lon1 + (lat - lat1) * (lon2 - lon1) / (lat2 - lat1)
+            if lon < cross:
+                inside = not inside
+    return inside
+
+def build_watch_points(
+    bbox:    str   = WATCH_GRID_BBOX,
+    step_km: float = WATCH_GRID_STEP_KM,
+    polygon: list  = WATCH_POLYGON,
+    extra:   list  = WATCH_POINTS,
+) -> list[dict]:
+    min_lat, min_lon, max_lat, max_lon = (float(v) for v in bbox.split(","))
+    dlat = step_km / 111.32
+    dlon = step_km / (111.32 * math.cos(math.radians((min_lat + max_lat) / 2)))
+    points = []
+    rows = int((max_lat - min_lat) / dlat) + 1
+    cols = int((max_lon - min_lon) / dlon) + 1
+    for r in range(rows):
+        for c in range(cols):
+            lat = round(min_lat + (r + 0.5) * dlat, 5)
+            lon = round(min_lon + (c + 0.5) * dlon, 5)
+            if polygon and not _point_in_polygon(lat, lon, polygon):
+                continue
+            points.append({"id": f"r{r}c{c}", "lat": lat, "lon": lon})
+    for p in extra:
+        points.append({"id": p.get("name") or f"{p['lat']},{p['lon']}",
+                       "lat": float(p["lat"]), "lon": float(p["lon"])})
+    return points
+
+class RiskGrid:
+
+    def __init__(self, points: list[dict], step_km: float = WATCH_GRID_STEP_KM):
+        self.points  = points
+        self.step_km = step_km
+        self._cells: dict = {}          # id → {"point", "ctx", "updated_at" (monotonic), "ts", "at"}
+        self.refreshed_at = 0.0         # epoch of the refresh these cells came from
+        self.refreshes = self.loads = 0
+        self.last_refresh_s: Optional[float] = None
+
+    async def refresh(self) -> dict:
+        """
+        Fetches every watch point concurrently, then scores them all in one
+        score_weather_batch() call.  Failed points keep their last value.
+        """
+        started = time.perf_counter()
+        sem     = asyncio.Semaphore(WATCH_GRID_CONCURRENCY)
+
+        async def one(point: dict):
+            async with sem:
+                return point, await _fetch_legs(point["lat"], point["lon"])
+
+        fetched = [(pt, legs) for pt, legs in
+                   await asyncio.gather(*(one(p) for p in self.points)) if legs[0]]
+        scores  = score_weather_batch(
+            [legs[0] for _, legs in fetched],
+            [legs[1] for _, legs in fetched],
+            [len(legs[2]) for _, legs in fetched],
+        )
+        results = [
+            (point, _context(
+                *legs,
+                int(scores["fire_score"][i]), str(scores["fire_level"][i]),
+                bool(scores["lightning_nearby"][i]), bool(scores["dry_lightning"][i]),
+            ))
+            for i, (point, legs) in enumerate(fetched)
+        ]
+        now, ts, at = time.monotonic(), time.time(), datetime.now(timezone.utc).isoformat()
+        levels: dict = {}
+        updated = 0
+        for point, ctx in results:
+            if not ctx:
+                continue
+            updated += 1
+            self._cells[point["id"]] = {"point": point, "ctx": ctx, "updated_at": now, "ts": ts, "at": at}
+            levels[ctx["fire_level"]] = levels.get(ctx["fire_level"], 0) + 1
+
+        self.refreshed_at   = ts
+        self.refreshes     += 1
+        self.last_refresh_s = time.perf_counter() - started
+        try:
+            await asyncio.to_thread(self._publish)
+        except Exception as e:
+            logger.error(f"Risk grid publish failed: {e}")
+        logger.info(
+            f"🗺  Risk grid refreshed: {updated}/{len(self.points)} "
+            f"cells in {self.last_refresh_s:.1f}s  {levels}"
+        )
+        return levels
+
+    def _publish(self) -> None:
+        cells = [
+            # Raw strikes are not read from a cell and can be large in a storm.
+            {"point": c["point"], "ctx": {**c["ctx"], "strikes": []}, "ts": c["ts"], "at": c["at"]}
+            for c in list(self._cells.values())
+        ]
+        store.set("risk_grid", "latest", {"refreshed_at": self.refreshed_at, "cells": cells})
+
+    def load(self) -> bool:
+        """Adopts the published grid if it is newer than ours.  Blocking."""
+        doc = store.get("risk_grid", "latest", max_age_s=RISK_GRID_SYNC_S)
+        if not doc or doc.get("refreshed_at", 0) <= self.refreshed_at:
+            return False
+        now, wall = time.monotonic(), time.time()
+        self._cells = {
+            c["point"]["id"]: {**c, "updated_at": now - (wall - c["ts"])}
+            for c in doc.get("cells", [])
+        }
+        self.refreshed_at = doc["refreshed_at"]
+        self.loads += 1
+        return True
+
+    def lookup(self, lat: float, lon: float) -> Optional[dict]:
+        """Context of the nearest fresh cell within half a cell diagonal, else None."""
+        best, best_km = None, self.step_km * math.sqrt(2) / 2
+        cutoff = time.monotonic() - RISK_GRID_MAX_AGE_S
+        for cell in self._cells.values():
+            if cell["updated_at"] < cutoff:
+                continue
+            km = haversine_km(lat, lon, cell["point"]["lat"], cell["point"]["lon"])
+            if km <= best_km:
+                best, best_km = cell, km
+        return best["ctx"] if best else None
+
+    def snapshot(self) -> list[dict]:
+        cells = []
+        for cell in self._cells.values():
+            ctx = cell["ctx"]
+            cells.append({
+                "id":               cell["point"]["id"],
+                "lat":              cell["point"]["lat"],
+                "lon":              cell["point"]["lon"],
+                "fire_risk_score":  ctx["fire_score"],
+                "fire_risk_level":  ctx["fire_level"],
+                "lightning_nearby": ctx["lightning_nearby"],
+                "dry_lightning":    ctx["dry_lightning"],
+                "condition":        derive_condition(ctx["weather"]),
+                "degraded":         ctx.get("degraded", []),
+                "updated_at":       cell["at"],
+            })
+        return cells
+
+    def stats(self) -> dict:
+        return {
+            "points":         len(self.points),
+            "cells":          len(self._cells),
+            "refreshes":      self.refreshes,
+            "loads":          self.loads,
+            "age_s":          round(time.time() - self.refreshed_at) if self.refreshed_at else None,
+            "last_refresh_s": round(self.last_refresh_s, 3) if self.last_refresh_s else None,
+        }
+
+risk_grid = RiskGrid(build_watch_points())
+
+async def monitor_county_grid() -> None:
+    await risk_grid.refresh()
+
+async def sync_county_grid() -> None:
+    await asyncio.to_thread(risk_grid.load)
+
+async def warm_county_grid() -> None:
+    """Startup: load the published grid, or build one if none is fresh."""
+    try:
+        await asyncio.to_thread(risk_grid.load)
+    except Exception as e:
+        logger.warning(f"Published risk grid unavailable at startup: {e}")
+    if time.time() - risk_grid.refreshed_at > RISK_GRID_MAX_AGE_S:
+        try:
+            await risk_grid.refresh()
+        except Exception as e:
+            logger.error(f"Startup risk grid refresh failed: {e}")
+
+# ═════════════════════════════════════════════════════════════════════════════
+# FORECAST TIMELINE  (hourly fire-risk outlook per watch cell)
+# ─────────────────────────────────────────────────────────────────────────────
+# Everything above scores /current.  RiskTimeline pulls /forecast/hourly for
+# the base station and every grid cell, scores all hours of all cells in one
+# score_weather_batch() call, and keeps the result until the next model run.
+# The forecast cache TTL is "until the next run is published", so a refresh
+# between runs costs no upstream calls and re-scores nothing.
+# monitor_forecast() turns the outlook into early push alerts and drone
+# pre-staging; GET /risk/timeline serves it to the app.
+# ═════════════════════════════════════════════════════════════════════════════
+
+def _model_run(now: Optional[datetime] = None) -> datetime:
+    """Latest model run whose output should be available at `now`."""
+    now   = now or datetime.now(timezone.utc)
+    avail = now - timedelta(minutes=FORECAST_MODEL_LAG_MIN)
+    return avail.replace(
+        hour=avail.hour - avail.hour % FORECAST_MODEL_CYCLE_H,
+        minute=0, second=0, microsecond=0,
+    )
+
+def _seconds_until_next_model_run() -> float:
+    now  = datetime.now(timezone.utc)
+    nxt  = _model_run(now) + timedelta(hours=FORECAST_MODEL_CYCLE_H, minutes=FORECAST_MODEL_LAG_MIN)
+    return max((nxt - now).total_seconds(), 60.0)
+
+forecast_cache = GeoCache(
+    ttls={"forecast": _seconds_until_next_model_run},
+    stale_s=FORECAST_MODEL_CYCLE_H * 3600,
+)
+
+async def _load_forecast(lat: float, lon: float) -> Optional[list]:
+    try:
+        body = await weatherbit.get_json(
+            "forecast/hourly",
+            {"lat": lat, "lon": lon, "hours": FORECAST_HOURS, "units": "M"},
+        )
+        return body.get('data') or None
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 403:
+            logger.warning(
+                "Weatherbit hourly forecast requires a paid plan. "
+                "Upgrade: https://www.weatherbit.io/pricing"
+            )
+        else:
+            logger.error(f"Weatherbit /forecast/hourly HTTP error: {e}")
+    except (httpx.HTTPError, ValueError) as e:
+        logger.error(f"Weatherbit /forecast/hourly: {e}")
+    return None
+
+async def fetch_hourly_forecast(lat: float, lon: float) -> Optional[list]:
+    if not WEATHERBIT_KEY:
+        return None
+    return await forecast_cache.get_or_load("forecast", lat, lon, _load_forecast)
+
+def score_forecasts(forecasts: list[list]) -> list[list[dict]]:
+    """Scores every hour of every forecast in one batch; returns one timeline per forecast."""
+    flat   = [h for hours in forecasts for h in hours]
+    scores = score_weather_batch(flat)
+    timelines, i = [], 0
+    for hours in forecasts:
+        timeline = []
+        for h in hours:
+            timeline.append({
+                "ts":               h.get("ts"),
+                "time":             h.get("timestamp_utc"),
+                "fire_risk_score":  int(scores["fire_score"][i]),
+                "fire_risk_level":  str(scores["fire_level"][i]),
+                "lightning":        bool(scores["lightning_nearby"][i]),
+                "dry_lightning":    bool(scores["dry_lightning"][i]),
+                "condition":        str(scores["condition"][i]),
+                "temperature_c":    h.get("temp"),
+                "humidity_pct":     h.get("rh"),
+                "wind_speed_ms":    h.get("wind_spd"),
+                "precip_mm":        h.get("precip"),
+                "precip_chance":    h.get("pop"),
+            })
+            i += 1
+        timelines.append(timeline)
+    return timelines
+
+def _is_risky(hour: dict) -> bool:
+    return hour["fire_risk_level"] in ("HIGH", "EXTREME") or hour["dry_lightning"]
+
+class RiskTimeline:
+
+    def __init__(self, points: list[dict], step_km: float = WATCH_GRID_STEP_KM):
+        self.points  = points
+        self.step_km = step_km
+        # id → {"point", "hours", "raw" (cached forecast list), "model_run"}
+        self._timelines: dict = {}
+        self.refreshes = self.scored_hours = 0
+        self.last_refresh_s: Optional[float] = None
+
+    async def refresh(self) -> int:
+        """
+        Pulls the forecast for every point (cache hits between model runs)
+        and re-scores only the cells whose forecast changed.  Returns the
+        number of cells re-scored.
+        """
+        started = time.perf_counter()
+        sem     = asyncio.Semaphore(WATCH_GRID_CONCURRENCY)
+
+        async def one(point: dict):
+            async with sem:
+                return point, await fetch_hourly_forecast(point["lat"], point["lon"])
+
+        changed = [
+            (point, raw)
+            for point, raw in await asyncio.gather(*(one(p) for p in self.points))
+            if raw and self._timelines.get(point["id"], {}).get("raw") is not raw
+        ]
+        if changed:
+            run = _model_run().isoformat()
+            for (point, raw), hours in zip(changed, score_forecasts([r for _, r in changed])):
+                self._timelines[point["id"]] = {
+                    "point": point, "hours": hours, "raw": raw, "model_run": run,
+                }
+                self.scored_hours += len(hours)
+
+        self.refreshes     += 1
+        self.last_refresh_s = time.perf_counter() - started
+        logger.info(
+            f"🕒 Forecast timeline: {len(changed)}/{len(self.points)} cells re-scored "
+            f"in {self.last_refresh_s:.1f}s"
+        )
+        return len(changed)
+
+    @staticmethod
+    def _upcoming(hours: list[dict], limit: int) -> list[dict]:
+        now = time.time() - 3600        # keep the hour in progress
+        return [h for h in hours if (h["ts"] or 0) >= now][:limit]
+
+    def lookup(self, lat: float, lon: float) -> Optional[dict]:
+        best, best_km = None, self.step_km * math.sqrt(2) / 2
+        for entry in self._timelines.values():
+            km = haversine_km(lat, lon, entry["point"]["lat"], entry["point"]["lon"])
+            if km <= best_km:
+                best, best_km = entry, km
+        return best
+
+    async def for_location(self, lat: float, lon: float, hours: int) -> Optional[dict]:
+        """Nearest watch cell's timeline, or a one-off scored forecast outside the grid."""
+        entry = self.lookup(lat, lon)
+        if entry is None:
+            raw = await fetch_hourly_forecast(lat, lon)
+            if not raw:
+                return None
+            entry = {
+                "point":     {"id": None, "lat": lat, "lon": lon},
+                "hours":     score_forecasts([raw])[0],
+                "model_run": _model_run().isoformat(),
+            }
+        upcoming = self._upcoming(entry["hours"], hours)
+        first    = next((h for h in upcoming if _is_risky(h)), None)
+        return {
+            "cell":        entry["point"],
+            "model_run":   entry["model_run"],
+            "first_risky": first,
+            "hours":       upcoming,
+        }
+
+    def events(self, horizon_h: int) -> list[tuple[dict, dict, str]]:
+        """(point, first risky hour, model_run) per cell within the next horizon_h hours."""
+        now, out = time.time(), []
+        for entry in self._timelines.values():
+            for h in entry["hours"]:
+                ts = h["ts"] or 0
+                if ts < now:
+                    continue
+                if ts > now + horizon_h * 3600:
+                    break
+                if _is_risky(h):
+                    out.append((entry["point"], h, entry["model_run"]))
+                    break
+        return out
+
+    def window(self, point_id: str, start_ts: float) -> tuple[float, list]:
+        """(last hour, worst [dry_lightning, level index]) of the risky run starting at start_ts."""
+        end, worst = start_ts, [0, 0]
+        for h in self._timelines[point_id]["hours"]:
+            ts = h["ts"] or 0
+            if ts < start_ts:
+                continue
+            if ts > end + 3600 or not _is_risky(h):
+                break
+            end   = ts
+            worst = max(worst, [int(h["dry_lightning"]), FIRE_RISK_LEVELS.index(h["fire_risk_level"])])
+        return end, worst
+
+    def stats(self) -> dict:
+        return {
+            "points":         len(self.points),
+            "cells":          len(self._timelines),
+            "refreshes":      self.refreshes,
+            "scored_hours":   self.scored_hours,
+            "last_refresh_s": round(self.last_refresh_s, 3) if self.last_refresh_s else None,
+            "next_model_run_s": round(_seconds_until_next_model_run()),
+        }
+
+risk_timeline = RiskTimeline(
+    [{"id": "base-station", "lat": BASE_STATION_LAT, "lon": BASE_STATION_LON}]
+    + risk_grid.points
+)
+
+def _event_rank(hour: dict) -> tuple:
+    return (hour["dry_lightning"], FIRE_RISK_LEVELS.index(hour["fire_risk_level"]), -hour["ts"])
+
+async def monitor_forecast() -> None:
+    await risk_timeline.refresh()
+
+    # Pre-stage for risky hours inside the drone's envelope around the base;
+    # the worst cell wins when several forecast the same hour.
+    by_hour: dict = {}
+    for point, hour, run in risk_timeline.events(FORECAST_PRESTAGE_HORIZON_H):
+        km = haversine_km(BASE_STATION_LAT, BASE_STATION_LON, point["lat"], point["lon"])
+        if km > DRONE_RECON_RADIUS_KM:
+            continue
+        best = by_hour.get(hour["ts"])
+        if best is None or _event_rank(hour) > _event_rank(best[1]):
+            by_hour[hour["ts"]] = (point, hour, run)
+    for point, hour, run in by_hour.values():
+        await asyncio.to_thread(drone.prestage, point, hour, run)
+
+    # One push per cycle for the worst new forecast event in the county.  An
+    # event is a cell's run of consecutive risky hours; it is pushed when it
+    # first appears or gets worse, not again as the horizon slides along it.
+    # What was pushed lives in the store, so a new leader does not repeat it.
+    now   = time.time()
+    state = await asyncio.to_thread(store.get, "forecast_alerts", "county") or {}
+    known = state.get("points") or {}
+    seen  = {pid: e for pid, e in known.items() if e["end"] >= now - 3600}
+    fresh = []
+    for point, hour, _ in risk_timeline.events(FORECAST_ALERT_HORIZON_H):
+        end, worst = risk_timeline.window(point["id"], hour["ts"])
+        prev = seen.get(point["id"])
+        if prev is not None and hour["ts"] <= prev["end"] + 3600:      # same event
+            if worst > prev["worst"]:
+                fresh.append((point, hour))
+            seen[point["id"]] = {**prev, "end": max(end, prev["end"]), "worst": max(worst, prev["worst"])}
+        else:
+            fresh.append((point, hour))
+            seen[point["id"]] = {"start": hour["ts"], "end": end, "worst": worst}
+    if seen != known:
+        await asyncio.to_thread(store.set, "forecast_alerts", "county", {
+            "points":     seen,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        })
+    if not fresh:
+        return
+    point, hour = max(fresh, key=lambda e: _event_rank(e[1]))
+    lead_h  = max(1, round((hour["ts"] - now) / 3600))
+    fl, dl  = hour["fire_risk_level"], hour["dry_lightning"]
+    label   = "⚡ Dry lightning" if dl else f"🔥 {fl} fire risk"
+    await asyncio.to_thread(
+        broadcast_alert_to_subscribers,
+        title=f"ThorsHammer Forecast — {fl}",
+        body=(
+            f"{label} forecast in Custer County in about {lead_h} h "
+            f"({len(fresh)} area{'s' if len(fresh) != 1 else ''}). Plan ahead."
+        ),
+        data={
+            "forecast":      "true",
+            "fire_risk":     fl,
+            "dry_lightning": str(dl),
+            "expected_at":   str(hour["time"]),
+            "lat":           str(point["lat"]),
+            "lon":           str(point["lon"]),
+        },
+    )
+
+# ═════════════════════════════════════════════════════════════════════════════
+# SCHEDULER LEADER ELECTION
+# ═════════════════════════════════════════════════════════════════════════════
+
+class SchedulerLease:
+    """
+    Elects one scheduler per deployment so monitors, drone checks and
+    broadcasts run once — not once per uvicorn worker.
+
+    tick() renews or tries to take the lease and returns True while this
+    worker holds it; AsyncScheduler calls it every SCHEDULER_LEASE_TTL_S / 3.
+    Firestore leases expire after SCHEDULER_LEASE_TTL_S without renewal, so
+    a dead holder is replaced on the next tick of any other worker.  A file
+    lock is released by the kernel when its process dies.
+    """
+
+    def __init__(self, ttl_s: float = SCHEDULER_LEASE_TTL_S, lock_path: str = SCHEDULER_LOCK_PATH):
+        self.ttl_s     = ttl_s
+        self.lock_path = lock_path
+        self.holder_id = f"{INSTANCE_ID}:{os.getpid()}"
+        self.is_leader = False
+        self._lock_fd: Optional[int] = None
+
+    def _firestore_tick(self) -> bool:
+        ref = firestore_db.collection("scheduler_leases").document("scheduler")
+
+        @firestore.transactional
+        def claim(txn) -> bool:
+            snap = ref.get(transaction=txn)
+            data = snap.to_dict() if snap.exists else {}
+            now  = time.time()
+            if data.get("holder") not in (None, self.holder_id) and data.get("expires_at", 0) > now:
+                return False
+            txn.set(ref, {
+                "holder":     self.holder_id,
+                "expires_at": now + self.ttl_s,
+                "renewed_at": datetime.now(timezone.utc).isoformat(),
+            })
+            return True
+
+        return claim(firestore_db.transaction())
+
+    def _file_tick(self) -> bool:
+        if self._lock_fd is not None:
+            return True
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def tick(self) -> bool:
+        try:
+            leader = self._firestore_tick() if firestore_db else self._file_tick()
+        except Exception as e:
+            # Can't confirm the lease — stand down rather than risk a double run.
+            logger.error(f"Scheduler lease check failed: {e}")
+            leader = False
+        if leader != self.is_leader:
+            logger.info(
+                f"Scheduler lease {'acquired' if leader else 'lost'} by {self.holder_id}"
+            )
+        self.is_leader = leader
+        return leader
+
+    def release(self) -> None:
+        if not self.is_leader:
+            return
+        try:
+            if firestore_db:
+                ref = firestore_db.collection("scheduler_leases").document("scheduler")
+
+                @firestore.transactional
+                def give_up(txn) -> None:
+                    # Another worker may have taken over after our lease lapsed.
+                    snap = ref.get(transaction=txn)
+                    if snap.exists and snap.to_dict().get("holder") == self.holder_id:
+                        txn.set(ref, {"holder": None, "expires_at": 0})
+
+                give_up(firestore_db.transaction())
+            elif self._lock_fd is not None:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+                os.close(self._lock_fd)
+                self._lock_fd = None
+        except Exception as e:
+            logger.warning(f"Scheduler lease release failed: {e}")
+        self.is_leader = False
+
+scheduler_lease = SchedulerLease()
+
+# ═════════════════════════════════════════════════════════════════════════════
+# ASYNC JOB SCHEDULER
+# ─────────────────────────────────────────────────────────────────────────────
+# Jobs run on the app's event loop, so monitors share the Weatherbit pool,
+# caches and single-flight group with the endpoints.  Each job sleeps until
+# its own next fire time (no 30 s polling drift).  Optional jitter, overlap
+# prevention (a run still going means the next one is skipped), a missed-run
+# policy and per-job timing.  Sync jobs are run with asyncio.to_thread.
+# Leader-only jobs fire only while this worker holds SchedulerLease.
+#
+#   IntervalTrigger(900)            every 15 min, anchored to the first fire
+#   CronTrigger("59 23 * * *")      minute hour day-of-month month day-of-week (UTC)
+# ═════════════════════════════════════════════════════════════════════════════
+
+class IntervalTrigger:
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def next_after(self, t: datetime) -> datetime:
+        return t + timedelta(seconds=self.seconds)
+
+    def __repr__(self) -> str:
+        return f"every {self.seconds:g}s"
+
+class CronTrigger:
+    """Five-field cron in UTC: *, a-b, */n, a-b/n and comma lists."""
+
+    _BOUNDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+    def __init__(self, expr: str):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expr!r}")
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse(f, lo, hi) for f, (lo, hi) in zip(fields, self._BOUNDS)
+        )
+        self._any_day     = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse(field: str, lo: int, hi: int) -> set:
+        values = set()
+        for part in field.split(","):
+            rng, _, step = part.partition("/")
+            if rng == "*":
+                start, stop = lo, hi
+            elif "-" in rng:
+                start, stop = (int(x) for x in rng.split("-", 1))
+            else:
+                start = stop = int(rng)
+            values.update(range(start, stop + 1, int(step) if step else 1))
+        if not values or min(values) < lo or max(values) > hi:
+            raise ValueError(f"Cron field {field!r} outside {lo}-{hi}")
+        return values
+
+    def _day_matches(self, t: datetime) -> bool:
+        dom = t.day in self.days
+        dow = (t.weekday() + 1) % 7 in self.weekdays     # cron: 0 = Sunday
+        if self._any_day or self._any_weekday:
+            return dom and dow
+        return dom or dow
+
+    def next_after(self, t: datetime) -> datetime:
+        t     = t.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 4)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self._day_matches(t):
+                t = (t + timedelta(days=1)).replace(hour=0, minute=0)
+            elif t.hour not in self.hours:
+                t = (t + timedelta(hours=1)).replace(minute=0)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"Cron expression never fires: {self.expr!r}")
+
+    def __repr__(self) -> str:
+        return f"cron {self.expr!r}"
+
+class ScheduledJob:
+
+    def __init__(
+        self,
+        name:            str,
+        func:            Callable,
+        trigger,
+        jitter_s:        float = 0.0,
+        timeout_s:       Optional[float] = None,
+        misfire:         str   = "skip",     # "skip" or "run_once" when fired late
+        misfire_grace_s: float = 60.0,
+        leader_only:     bool  = True,
+    ):
+        if misfire not in ("skip", "run_once"):
+            raise ValueError(f"Unknown misfire policy {misfire!r}")
+        self.name            = name
+        self.func            = func
+        self.trigger         = trigger
+        self.jitter_s        = jitter_s
+        self.timeout_s       = timeout_s
+        self.misfire         = misfire
+        self.misfire_grace_s = misfire_grace_s
+        self.leader_only     = leader_only
+        self.running         = False
+        self.next_run:    Optional[datetime] = None
+        self.last_started: Optional[datetime] = None
+        self.runs = self.failures = self.skipped_overlap = self.skipped_misfire = 0
+        self.total_s = self.max_s = self.last_s = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "trigger":         repr(self.trigger),
+            "running":         self.running,
+            "next_run":        self.next_run.isoformat() if self.next_run else None,
+            "last_started":    self.last_started.isoformat() if self.last_started else None,
+            "runs":            self.runs,
+            "failures":        self.failures,
+            "skipped_overlap": self.skipped_overlap,
+            "skipped_misfire": self.skipped_misfire,
+            "last_s":          round(self.last_s, 3),
+            "avg_s":           round(self.total_s / self.runs, 3) if self.runs else None,
+            "max_s":           round(self.max_s, 3),
+        }
+
+class AsyncScheduler:
+
+    def __init__(self, lease: "SchedulerLease"):
+        self.lease = lease
+        self.jobs:  dict = {}
+        self._tasks: set = set()
+
+    def add(self, name: str, func: Callable, trigger, **options) -> ScheduledJob:
+        job = ScheduledJob(name, func, trigger, **options)
+        self.jobs[name] = job
+        return job
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def start(self) -> None:
+        self._spawn(self._lease_loop())
+        for job in self.jobs.values():
+            self._spawn(self._job_loop(job))
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _lease_loop(self) -> None:
+        while True:
+            await asyncio.to_thread(self.lease.tick)
+            await asyncio.sleep(self.lease.ttl_s / 3)
+
+    async def _job_loop(self, job: ScheduledJob) -> None:
+        scheduled = job.trigger.next_after(self._now())
+        while True:
+            job.next_run = scheduled
+            jitter = random.uniform(0, job.jitter_s) if job.jitter_s else 0.0
+            delay  = (scheduled - self._now()).total_seconds() + jitter
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            now  = self._now()
+            late = (now - scheduled).total_seconds() - jitter
+            if late > job.misfire_grace_s and job.misfire == "skip":
+                job.skipped_misfire += 1
+                logger.warning(f"Job {job.name} skipped — fired {late:.0f}s late.")
+            elif not job.leader_only or self.lease.is_leader:
+                if job.running:
+                    job.skipped_overlap += 1
+                    logger.warning(f"Job {job.name} skipped — previous run still going.")
+                else:
+                    self._spawn(self._run(job))
+
+            scheduled = job.trigger.next_after(scheduled)
+            if scheduled <= now:
+                # Fell more than a period behind: missed fires collapse into the
+                # one just handled and the schedule resumes from now.
+                scheduled = job.trigger.next_after(now)
+
+    async def _run(self, job: ScheduledJob) -> None:
+        job.running      = True
+        job.last_started = self._now()
+        started = time.perf_counter()
+        thread  = None
+        try:
+            if inspect.iscoroutinefunction(job.func):
+                await asyncio.wait_for(job.func(), timeout=job.timeout_s)
+            else:
+                # A thread cannot be cancelled: shield it from wait_for so a
+                # timeout leaves it running and still awaited below.
+                thread = asyncio.ensure_future(asyncio.to_thread(job.func))
+                await asyncio.wait_for(asyncio.shield(thread), timeout=job.timeout_s)
+        except asyncio.TimeoutError:
+            job.failures += 1
+            logger.error(f"Job {job.name} timed out after {job.timeout_s}s.")
+            if thread is not None:
+                # Stay marked running until the thread returns, so the overlap
+                # guard keeps a second copy from starting alongside it.
+                try:
+                    await thread
+                except Exception as e:
+                    logger.error(f"Job {job.name} failed after its timeout: {e}")
+        except Exception as e:
+            job.failures += 1
+            logger.error(f"Job {job.name} failed: {e}")
+        finally:
+            job.last_s   = time.perf_counter() - started
+            job.total_s += job.last_s
+            job.max_s    = max(job.max_s, job.last_s)
+            job.runs    += 1
+            job.running  = False
+
+    def stats(self) -> dict:
+        return {
+            "leader": self.lease.is_leader,
+            "jobs":   {name: job.stats() for name, job in self.jobs.items()},
+        }
+
+scheduler = AsyncScheduler(scheduler_lease)
 
 # ═════════════════════════════════════════════════════════════════════════════
 # GRACEFUL SHUTDOWN  (Docker stop / GCP maintenance)
 # ─────────────────────────────────────────────────────────────────────────────
 # Docker sends SIGTERM before killing the container.  We catch it and let
-# FastAPI finish in-flight requests cleanly before the process exits.
+# FastAPI finish in-flight requests cleanly before the process exits.  The
+# handler only flags the shutdown: the write-behind buffer and the store
+# outbox are drained by lifespan() teardown, off the signal handler (a
+# drain there could wait on a lock the interrupted main thread holds).
 # ═════════════════════════════════════════════════════════════════════════════
 
 _shutdown = threading.Event()
@@ -923,34 +4520,277 @@ signal.signal(signal.SIGTERM, _sigterm_handler)
 # DAILY SUMMARY  (Firestore snapshot at 23:59)
 # ═════════════════════════════════════════════════════════════════════════════
 
-def _save_daily_summary() -> None:
+FIRE_RISK_LEVELS = ("LOW", "MODERATE", "HIGH", "EXTREME")
+
+def _utc_day() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+def _count_daily(batch, day: str, counted: list) -> None:
+    """
+    Queues the counts of documents written on `day` — counted is
+    [(doc_id, {name: n})] — as at most one write per shard of
+    daily_counters/{day}.  A shard keeps name → {doc_id: n}, so committing
+    the same document again overwrites its entry rather than adding to it.
+    """
+    shards: dict = {}
+    for doc_id, counts in counted:
+        fields = shards.setdefault(zlib.crc32(doc_id.encode()) % DAILY_COUNTER_SHARDS, {})
+        for k, v in counts.items():
+            fields.setdefault(k, {})[doc_id] = v
+    day_ref = firestore_db.collection("daily_counters").document(day)
+    for n, fields in shards.items():
+        batch.set(day_ref.collection("shards").document(str(n)), fields, merge=True)
+
+def _read_daily_counters(day: str) -> Optional[dict]:
+    """Sums the day's counter shards.  None if no shard has been written."""
+    totals: dict = {}
+    shards = (
+        firestore_db.collection("daily_counters").document(day)
+        .collection("shards").stream()
+    )
+    for shard in shards:
+        for k, v in shard.to_dict().items():
+            # Shards written before per-document counts hold plain Increment totals.
+            totals[k] = totals.get(k, 0) + (sum(v.values()) if isinstance(v, dict) else v)
+    return totals or None
+
+def _aggregate_count(query) -> int:
+    """Server-side COUNT() — no documents are transferred."""
+    return int(query.count().get()[0][0].value)
+
+def _prune_local_store() -> None:
+    """
+    Every instance keeps its own file, so this job is not leader-only.
+    Without Firestore the file is the only copy, so nothing is pruned.
+    """
     if not firestore_db:
         return
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    cutoff = datetime.now(timezone.utc) - timedelta(days=LOCAL_STORE_RETENTION_DAYS)
+    pruned = store.local.prune("weather_records", "recorded_at", cutoff.isoformat())
+    if pruned:
+        logger.info(f"Pruned {pruned} local weather_records older than {LOCAL_STORE_RETENTION_DAYS} days.")
+
+_history_backfilled = False
+
+def _iso_timestamp(value) -> Optional[str]:
+    """ISO-8601 UTC for a Weatherbit "YYYY-MM-DD:HH" or an ISO string; None if neither."""
+    if not isinstance(value, str):
+        return None
     try:
-        rec_count  = sum(1 for _ in (
+        if len(value) == 13 and value[10] == ":":
+            dt = datetime.strptime(value, "%Y-%m-%d:%H")
+        else:
+            dt = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat()
+
+def backfill_weather_history() -> None:
+    """
+    Gives weather_records that predate per-subscriber history an ISO-8601
+    recorded_at (from their timestamp) and, if HISTORY_LEGACY_UID is set,
+    that owner — in timestamp order, HISTORY_BACKFILL_BATCH documents per
+    batch.  Progress is kept in migrations/weather_records_owner, so a
+    restart resumes where the last run stopped; once that document says
+    done for the current owner setting, this is a no-op.
+    """
+    global _history_backfilled
+    if not firestore_db or _history_backfilled:
+        return
+    marker = firestore_db.collection("migrations").document("weather_records_owner")
+    state  = marker.get().to_dict() or {}
+    if state.get("owner", "") != HISTORY_LEGACY_UID:
+        state = {}                      # owner changed: walk the collection again
+    after, fixed, ran = state.get("after"), state.get("fixed", 0), 0
+    while not state.get("done"):
+        query = (
             firestore_db.collection("weather_records")
-            .where("timestamp", ">=", today)
-            .stream()
-        ))
-        mis_count  = sum(1 for _ in (
-            firestore_db.collection("drone_missions")
-            .where("created_at", ">=", today)
-            .stream()
-        ))
+            .order_by("timestamp").order_by("__name__")
+            .select(["uid", "recorded_at", "timestamp"])
+            .limit(HISTORY_BACKFILL_BATCH)
+        )
+        if after:
+            query = query.start_after({"timestamp": after[0], "__name__": after[1]})
+        docs = list(query.stream())
+        if not docs:
+            state = {"done": True, "owner": HISTORY_LEGACY_UID, "fixed": fixed,
+                     "finished_at": datetime.now(timezone.utc).isoformat()}
+            marker.set(state)
+            break
+        batch, n = firestore_db.batch(), 0
+        for doc in docs:
+            data   = doc.to_dict()
+            fields = {}
+            if not data.get("uid") and HISTORY_LEGACY_UID:
+                fields["uid"] = HISTORY_LEGACY_UID
+            recorded = _iso_timestamp(data.get("recorded_at") or data.get("timestamp"))
+            if recorded and recorded != data.get("recorded_at"):
+                fields["recorded_at"] = recorded
+            if fields:
+                batch.update(doc.reference, fields)
+                n += 1
+        after  = [docs[-1].to_dict()["timestamp"], docs[-1].id]
+        fixed += n
+        ran   += n
+        batch.set(marker, {"done": False, "owner": HISTORY_LEGACY_UID, "after": after, "fixed": fixed})
+        batch.commit()
+    if ran:
+        history_pages.invalidate("weather_records")
+        logger.info(f"Backfilled uid/recorded_at on {ran} legacy weather_records ({fixed} in total).")
+    _history_backfilled = True
+
+def _count_local_day(day: str) -> tuple[int, int, dict]:
+    """Records, missions and risk histogram for `day` from the local store."""
+    since     = (("timestamp", ">=", day),)
+    records   = store.local.count("weather_records", since)
+    missions  = store.local.count("drone_missions", (("created_at", ">=", day),))
+    histogram = {
+        lvl: store.local.count("weather_records", since + (("fire_risk_level", "==", lvl),))
+        for lvl in FIRE_RISK_LEVELS
+    }
+    return records, missions, histogram
+
+def _save_daily_summary() -> None:
+    today = _utc_day()
+    try:
+        totals = _read_daily_counters(today) if firestore_db else None
+        if not firestore_db:
+            # Offline the local store holds every record and mission.
+            source = "local"
+            rec_count, mis_count, histogram = _count_local_day(today)
+        elif totals is not None:
+            source    = "counters"
+            rec_count = totals.get("weather_records", 0)
+            mis_count = totals.get("drone_missions", 0)
+            histogram = {lvl: totals.get(f"risk_{lvl}", 0) for lvl in FIRE_RISK_LEVELS}
+        else:
+            # No counters yet (first day after deploy) — let Firestore count.
+            source  = "aggregation"
+            records = firestore_db.collection("weather_records").where("timestamp", ">=", today)
+            rec_count = _aggregate_count(records)
+            mis_count = _aggregate_count(
+                firestore_db.collection("drone_missions").where("created_at", ">=", today)
+            )
+            histogram = {
+                lvl: _aggregate_count(records.where("fire_risk_level", "==", lvl))
+                for lvl in FIRE_RISK_LEVELS
+            }
+        summary = {
+            "date":                today,
+            "record_count":        rec_count,
+            "mission_count":       mis_count,
+            "fire_risk_histogram": histogram,
+            "counter_source":      source,
+            "generated_at":        datetime.now(timezone.utc).isoformat(),
+            "instance_id":         INSTANCE_ID,
+        }
         # Use document ID = date string so each day's summary is easy to look up:
         # firestore_db.collection("daily_backups").document("2025-06-01").get()
-        firestore_db.collection("daily_backups").document(today).set({
-            "date":          today,
-            "record_count":  rec_count,
-            "mission_count": mis_count,
-            "generated_at":  datetime.now(timezone.utc).isoformat(),
-            "instance_id":   INSTANCE_ID,
-        })
-        logger.info(f"✅ Daily summary written for {today}")
+        if firestore_db:
+            firestore_db.collection("daily_backups").document(today).set(summary)
+        else:
+            store.set("daily_backups", today, summary)
+        logger.info(f"✅ Daily summary written for {today} ({source})")
     except Exception as e:
         logger.error(f"Daily summary error: {e}")
 
+# ═════════════════════════════════════════════════════════════════════════════
+# RESPONSE ENCODING  (list endpoints on slow rural LTE)
+# ─────────────────────────────────────────────────────────────────────────────
+# Plain JSON stays the default.  Clients opt in per request:
+#   ?fmt=columnar  or  Accept: application/vnd.thorshammer.columnar+json
+#       the list becomes parallel arrays — {"length": n, "columns":
+#       {"lat": [...], "lon": [...], ...}} — so keys are sent once, not per row
+#   ?fmt=msgpack   or  Accept: application/msgpack   (needs msgpack)
+# and independently Accept-Encoding: br / gzip for compression.
+# ═════════════════════════════════════════════════════════════════════════════
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+    logger.warning("msgpack not installed — fmt=msgpack unavailable. Run: pip install msgpack --break-system-packages")
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+    logger.warning("brotli not installed — gzip only. Run: pip install brotli --break-system-packages")
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.thorshammer.columnar+json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+def _json_default(o):
+    """Firestore timestamps → ISO 8601, like FastAPI's encoder; anything else → str."""
+    return o.isoformat() if hasattr(o, "isoformat") else str(o)
+
+def columnar(rows: list[dict]) -> dict:
+    """List of dicts → parallel arrays; a key missing from a row is null in its column."""
+    keys: dict = {}
+    for row in rows:
+        for k in row:
+            keys.setdefault(k, None)
+    return {
+        "length":  len(rows),
+        "columns": {k: [row.get(k) for row in rows] for k in keys},
+    }
+
+def _negotiate_format(request: Request, fmt: Optional[str]) -> str:
+    if fmt:
+        fmt = fmt.lower()
+        if fmt not in ("json", "columnar", "msgpack"):
+            raise HTTPException(status_code=400, detail="fmt must be json, columnar or msgpack")
+        if fmt == "msgpack" and msgpack is None:
+            raise HTTPException(status_code=406, detail="msgpack encoding is not available.")
+        return fmt
+    accept = request.headers.get("accept", "").lower()
+    if msgpack is not None and any(t in accept for t in MSGPACK_MEDIA_TYPES):
+        return "msgpack"
+    if COLUMNAR_MEDIA_TYPE in accept:
+        return "columnar"
+    return "json"
+
+def _accepted_encodings(request: Request) -> set:
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip())
+    return accepted
+
+def encoded_response(request: Request, payload: dict, list_key: str, fmt: Optional[str] = None) -> Response:
+    """Serializes payload in the negotiated format and compresses it if worthwhile."""
+    chosen = _negotiate_format(request, fmt)
+    if chosen == "msgpack":
+        body, media_type = msgpack.packb(payload, default=_json_default), MSGPACK_MEDIA_TYPES[0]
+    else:
+        if chosen == "columnar":
+            payload = {**payload, list_key: columnar(payload.get(list_key) or []), "encoding": "columnar"}
+            media_type = COLUMNAR_MEDIA_TYPE
+        else:
+            media_type = "application/json"
+        body = json.dumps(payload, default=_json_default, separators=(",", ":")).encode()
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if len(body) >= COMPRESS_MIN_BYTES:
+        accepted = _accepted_encodings(request)
+        if brotli is not None and "br" in accepted:
+            body = brotli.compress(body, quality=BROTLI_QUALITY)
+            headers["Content-Encoding"] = "br"
+        elif "gzip" in accepted or "*" in accepted:
+            body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+            headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type=media_type, headers=headers)
+
 # ═════════════════════════════════════════════════════════════════════════════
 # FASTAPI APPLICATION
 # ═════════════════════════════════════════════════════════════════════════════
@@ -958,15 +4798,60 @@ def _save_daily_summary() -> None:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info(f"⚡ ThorsHammer v2.01 starting — instance {INSTANCE_ID}")
-    schedule.every(15).minutes.do(
-        lambda: asyncio.get_event_loop().run_in_executor(
-            None, asyncio.run, monitor_base_station()
-        )
+    events.loop = asyncio.get_running_loop()
+    event_relay = asyncio.create_task(events.relay())
+    key_refresher = asyncio.create_task(firebase_keys.run()) if firebase_app else None
+    if firestore_db and ENTITLEMENT_LISTENER:
+        entitlements.start_listener()
+    if firestore_db:
+        weather_writer.start()
+        store.start()
+    scheduler.add(
+        "monitor_base_station", monitor_base_station, IntervalTrigger(15 * 60),
+        jitter_s=5, timeout_s=600,
+    )
+    scheduler.add(
+        "monitor_county_grid", monitor_county_grid, IntervalTrigger(15 * 60),
+        jitter_s=5, timeout_s=600,
+    )
+    scheduler.add(
+        "sync_county_grid", sync_county_grid, IntervalTrigger(RISK_GRID_SYNC_S),
+        timeout_s=30, leader_only=False,
+    )
+    scheduler.add(
+        "lightning_ingest", lightning_feed.poll, IntervalTrigger(LIGHTNING_INGEST_INTERVAL_S),
+        timeout_s=30, leader_only=False,
+    )
+    scheduler.add(
+        "monitor_forecast", monitor_forecast, IntervalTrigger(15 * 60),
+        jitter_s=5, timeout_s=600,
+    )
+    scheduler.add(
+        "daily_summary", _save_daily_summary, CronTrigger("59 23 * * *"),
+        timeout_s=600, misfire="run_once",
     )
-    schedule.every().day.at("23:59").do(_save_daily_summary)
-    threading.Thread(target=_run_scheduler, daemon=True, name="scheduler").start()
-    logger.info("Scheduler online (monitor every 15 min · daily summary at 23:59)")
+    scheduler.add(
+        "backfill_weather_history", backfill_weather_history, IntervalTrigger(10 * 60),
+        timeout_s=600,
+    )
+    scheduler.add(
+        "prune_local_store", _prune_local_store, CronTrigger("30 3 * * *"),
+        timeout_s=300, leader_only=False,
+    )
+    scheduler.start()
+    grid_warmup = asyncio.create_task(warm_county_grid())
+    logger.info("Scheduler online (monitors every 15 min · daily summary at 23:59 UTC)")
     yield
+    await scheduler.stop()
+    grid_warmup.cancel()
+    event_relay.cancel()
+    if key_refresher:
+        key_refresher.cancel()
+    entitlements.stop_listener()
+    await asyncio.to_thread(scheduler_lease.release)
+    await asyncio.to_thread(weather_writer.drain)
+    await asyncio.to_thread(store.drain)
+    await weatherbit.aclose()
     logger.info("ThorsHammer v2.01 shutting down.")
 
 
@@ -1012,6 +4897,69 @@ async def health_check():
         },
     }
 
+@app.get("/metrics", tags=["System"])
+async def metrics():
+    """Cache and upstream counters for the ops dashboard (JSON, not Prometheus)."""
+    snap = base_station_snapshot
+    return {
+        "instance_id":   INSTANCE_ID,
+        "timestamp":     datetime.now(timezone.utc).isoformat(),
+        "weather_cache": weather_cache.stats(),
+        "singleflight":  flights.stats(),
+        "auth":          token_cache.stats(),
+        "entitlements":  entitlements.stats(),
+        "audience":      audience.stats(),
+        "weather_writer": weather_writer.stats(),
+        "local_store":   store.stats(),
+        "scheduler":     scheduler.stats(),
+        "risk_grid":     risk_grid.stats(),
+        "strike_index":  strike_index.stats(),
+        "lightning_feed": lightning_feed.stats(),
+        "stream":        events.stats(),
+        "history_pages": history_pages.stats(),
+        "forecast_cache": forecast_cache.stats(),
+        "risk_timeline": risk_timeline.stats(),
+        "last_broadcast": last_broadcast,
+        "base_station_snapshot": {
+            "etag":  snap.etag if snap else None,
+            "age_s": round(time.monotonic() - snap.published_at, 1) if snap else None,
+        },
+    }
+
+@app.get("/stream", tags=["System"])
+async def stream_events(
+    request:       Request,
+    topics:        str = "base_station,strikes,missions",
+    authorization: Optional[str] = Header(None),
+):
+    """
+    Server-Sent Events push channel — replaces polling /base-station,
+    /lightning-strikes and /drone/missions/pending.
+    Events: hello, base_station, strikes, missions, resync (refetch state).
+    base_station and strikes need an active subscription; missions needs
+    only a valid token, like the other drone endpoints.
+    """
+    token  = await verify_firebase_token(authorization)
+    wanted = {t.strip() for t in topics.split(",") if t.strip()}
+    if not wanted or not wanted <= set(EventHub.TOPICS):
+        raise HTTPException(
+            status_code=400, detail=f"topics must be a subset of {','.join(EventHub.TOPICS)}"
+        )
+    if wanted & {"base_station", "strikes"} and not await require_active_subscription(token.get("uid")):
+        raise HTTPException(status_code=402, detail="Subscription required.")
+    if len(events) >= STREAM_MAX_CLIENTS:
+        raise HTTPException(status_code=503, detail="Too many live connections — poll instead.")
+
+    client = events.subscribe(wanted)
+    return StreamingResponse(
+        events.stream(client, request),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control":     "no-cache",
+            "X-Accel-Buffering": "no",       # tell Nginx not to buffer the stream
+        },
+    )
+
 # ─── Auth & Subscription ──────────────────────────────────────────────────────
 
 @app.post("/auth/verify-subscription", response_model=SubscriberStatus, tags=["Auth"])
@@ -1032,11 +4980,10 @@ async def verify_subscription(authorization: Optional[str] = Header(None)):
     token = await verify_firebase_token(authorization)
     uid   = token.get("uid")
 
-    if not firestore_db:
+    data = await entitlements.get(uid)
+    if not firestore_db and "active" not in (data or {}):
         return SubscriberStatus(uid=uid, active=True, stripe_status="dev_bypass")
-
-    doc = firestore_db.collection("subscribers").document(uid).get()
-    if not doc.exists:
+    if data is None:
         return SubscriberStatus(
             uid=uid,
             email=token.get("email"),
@@ -1044,7 +4991,6 @@ async def verify_subscription(authorization: Optional[str] = Header(None)):
             stripe_status="no_subscription",
         )
 
-    data = doc.to_dict()
     return SubscriberStatus(
         uid=uid,
         email=data.get("email", token.get("email")),
@@ -1075,15 +5021,14 @@ async def register_fcm_token(
     if not fcm_token:
         raise HTTPException(status_code=400, detail="fcm_token is required.")
 
-    if firestore_db:
-        # merge=True means we only update fcm_token without touching other fields
-        firestore_db.collection("subscribers").document(uid).set(
-            {
-                "fcm_token":  fcm_token,
-                "updated_at": datetime.now(timezone.utc).isoformat(),
-            },
-            merge=True,
-        )
+    # merge=True means we only update fcm_token without touching other fields
+    fields = {
+        "fcm_token":  fcm_token,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+    await asyncio.to_thread(store.set, "subscribers", uid, fields, merge=True)
+    entitlements.update(uid, fields)
+    audience.sync(uid, await entitlements.get(uid))
     return {"status": "stored", "uid": uid}
 
 # ─── Billing ──────────────────────────────────────────────────────────────────
@@ -1155,36 +5100,35 @@ async def stripe_webhook(request: Request):
         logger.warning(f"No firebase_uid in Stripe webhook: {event['type']}")
         return {"status": "skipped"}
 
-    if firestore_db:
-        if event["type"] in ("customer.subscription.created", "invoice.paid"):
-            period_end = None
-            if obj.get("current_period_end"):
-                period_end = datetime.fromtimestamp(
-                    obj["current_period_end"], tz=timezone.utc
-                ).isoformat()
-
-            firestore_db.collection("subscribers").document(uid).set(
-                {
-                    "active":           True,
-                    "stripe_status":    obj.get("status", "active"),
-                    "period_end":       period_end,
-                    "stripe_customer":  obj.get("customer"),
-                    "updated_at":       datetime.now(timezone.utc).isoformat(),
-                },
-                merge=True,
-            )
-            logger.info(f"Subscriber {uid} activated via Stripe.")
-
-        elif event["type"] == "customer.subscription.deleted":
-            firestore_db.collection("subscribers").document(uid).set(
-                {
-                    "active":        False,
-                    "stripe_status": "canceled",
-                    "updated_at":    datetime.now(timezone.utc).isoformat(),
-                },
-                merge=True,
-            )
-            logger.info(f"Subscriber {uid} deactivated — subscription canceled.")
+    if event["type"] in ("customer.subscription.created", "invoice.paid"):
+        period_end = None
+        if obj.get("current_period_end"):
+            period_end = datetime.fromtimestamp(
+                obj["current_period_end"], tz=timezone.utc
+            ).isoformat()
+
+        fields = {
+            "active":           True,
+            "stripe_status":    obj.get("status", "active"),
+            "period_end":       period_end,
+            "stripe_customer":  obj.get("customer"),
+            "updated_at":       datetime.now(timezone.utc).isoformat(),
+        }
+        await asyncio.to_thread(store.set, "subscribers", uid, fields, merge=True)
+        entitlements.update(uid, fields)
+        audience.sync(uid, await entitlements.get(uid))
+        logger.info(f"Subscriber {uid} activated via Stripe.")
+
+    elif event["type"] == "customer.subscription.deleted":
+        fields = {
+            "active":        False,
+            "stripe_status": "canceled",
+            "updated_at":    datetime.now(timezone.utc).isoformat(),
+        }
+        await asyncio.to_thread(store.set, "subscribers", uid, fields, merge=True)
+        entitlements.update(uid, fields)
+        audience.sync(uid, None)
+        logger.info(f"Subscriber {uid} deactivated — subscription canceled.")
 
     return {"status": "processed", "event": event["type"]}
 
@@ -1209,12 +5153,14 @@ async def check_weather_risk(
             detail="Active subscription required. Subscribe for $7/mo at thorshammer.app",
         )
 
-    ctx = assess_location(coords.latitude, coords.longitude)
+    ctx = risk_grid.lookup(coords.latitude, coords.longitude) if RISK_FROM_GRID else None
+    if ctx is None:
+        ctx = await assess_location(coords.latitude, coords.longitude)
     if not ctx:
         raise HTTPException(status_code=503, detail="Weather service unavailable.")
 
     report = _build_report(coords.latitude, coords.longitude, ctx)
-    background.add_task(_persist_weather_record, report)
+    background.add_task(_persist_weather_record, report, uid)
 
     if ctx["drone_recommended"]:
         background.add_task(
@@ -1226,61 +5172,172 @@ async def check_weather_risk(
     return report
 
 @app.get("/base-station", response_model=WeatherReport, tags=["Weather"])
-async def get_base_station_status(authorization: Optional[str] = Header(None)):
+async def get_base_station_status(
+    request:       Request,
+    authorization: Optional[str] = Header(None),
+):
     """
     Current conditions at Taylor Rd / Venable Mountain base station.
     Used for the always-visible home screen weather tile in FlutterFlow.
+    Served from the monitor's snapshot, shared by every worker; supports
+    If-None-Match / If-Modified-Since (304).
     """
     token = await verify_firebase_token(authorization)
     if not await require_active_subscription(token.get("uid")):
         raise HTTPException(status_code=402, detail="Subscription required.")
 
-    ctx = assess_location(BASE_STATION_LAT, BASE_STATION_LON)
-    if not ctx:
+    snap = await current_base_station_snapshot()
+    if snap is None:
         raise HTTPException(status_code=503, detail="Weather service unavailable.")
-    return _build_report(BASE_STATION_LAT, BASE_STATION_LON, ctx)
+
+    if snap.not_modified(request):
+        return Response(status_code=304, headers=snap.headers())
+    return Response(content=snap.body, media_type="application/json", headers=snap.headers())
+
+@app.get("/risk/grid", tags=["Weather"])
+async def get_risk_grid(authorization: Optional[str] = Header(None)):
+    """County-wide risk map — latest per-cell assessment from the monitor cycle."""
+    token = await verify_firebase_token(authorization)
+    if not await require_active_subscription(token.get("uid")):
+        raise HTTPException(status_code=402, detail="Subscription required.")
+
+    cells = risk_grid.snapshot()
+    return {
+        "step_km":    risk_grid.step_km,
+        "cell_count": len(cells),
+        "cells":      cells,
+        "timestamp":  datetime.now(timezone.utc).isoformat(),
+    }
+
+@app.get("/risk/timeline", tags=["Weather"])
+async def get_risk_timeline(
+    lat:           float = BASE_STATION_LAT,
+    lon:           float = BASE_STATION_LON,
+    hours:         int   = 24,
+    authorization: Optional[str] = Header(None),
+):
+    """
+    Hourly fire-risk / dry-lightning outlook for the nearest watch cell.
+    Served from the monitor's scored forecasts; points outside the grid are
+    pulled once and shared through the forecast cache.
+    """
+    token = await verify_firebase_token(authorization)
+    if not await require_active_subscription(token.get("uid")):
+        raise HTTPException(status_code=402, detail="Subscription required.")
+
+    timeline = await risk_timeline.for_location(lat, lon, max(1, min(hours, FORECAST_HOURS)))
+    if timeline is None:
+        raise HTTPException(status_code=503, detail="Forecast service unavailable.")
+    return {
+        "location":  {"lat": lat, "lon": lon},
+        **timeline,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
 
 @app.get("/lightning-strikes", tags=["Weather"])
 async def get_lightning_strikes(
+    request:       Request,
     lat:           float = BASE_STATION_LAT,
     lon:           float = BASE_STATION_LON,
     radius_km:     float = 50,
+    bbox:          Optional[str] = None,
+    since:         Optional[str] = None,
+    fmt:           Optional[str] = None,
     authorization: Optional[str] = Header(None),
 ):
-    """Lightning strikes within radius_km. Requires Weatherbit Pro+ plan."""
+    """
+    Lightning strikes within radius_km, nearest first — or, with
+    bbox=min_lat,min_lon,max_lat,max_lon, only those inside the visible map.
+    Answered from the strike index when it covers the area.
+
+    Map screens should pass since=<next_cursor from the previous response>
+    to receive only strikes ingested after it (never an upstream call).
+    cursor_reset=True means the cursor was too old: redraw from scratch.
+    fmt=columnar / msgpack and gzip / br: see RESPONSE ENCODING.
+    Requires Weatherbit Pro+ plan.
+    """
     token = await verify_firebase_token(authorization)
     if not await require_active_subscription(token.get("uid")):
         raise HTTPException(status_code=402, detail="Subscription required.")
 
-    strikes = fetch_lightning_strikes(lat, lon, radius_km)
-    return {
-        "location":     {"lat": lat, "lon": lon},
-        "radius_km":    radius_km,
-        "strike_count": len(strikes),
-        "strikes":      strikes,
-        "timestamp":    datetime.now(timezone.utc).isoformat(),
-    }
+    box = None
+    if bbox:
+        try:
+            box = tuple(float(v) for v in bbox.split(","))
+            min_lat, min_lon, max_lat, max_lon = box
+        except ValueError:
+            raise HTTPException(status_code=400, detail="bbox must be min_lat,min_lon,max_lat,max_lon")
+
+    if since is not None:
+        strikes, next_cursor, reset = await asyncio.to_thread(lightning_feed.since, since)
+        if box:
+            strikes = [
+                s for s in strikes
+                if min_lat <= s["lat"] <= max_lat and min_lon <= s["lon"] <= max_lon
+            ]
+        else:
+            strikes = [
+                s for s in strikes
+                if haversine_km(lat, lon, s["lat"], s["lon"]) <= radius_km
+            ]
+        return encoded_response(request, {
+            "bbox":         bbox,
+            "cursor_reset": reset,
+            "next_cursor":  next_cursor,
+            "strike_count": len(strikes),
+            "strikes":      strikes,
+            "timestamp":    datetime.now(timezone.utc).isoformat(),
+        }, "strikes", fmt)
+
+    # Taken first so nothing ingested meanwhile is missed.
+    next_cursor = await asyncio.to_thread(lightning_feed.cursor)
+    if box:
+        lat, lon  = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+        radius_km = haversine_km(lat, lon, max_lat, max_lon)
+        await nearby_strikes(lat, lon, radius_km)
+        strikes = strike_index.bbox(min_lat, min_lon, max_lat, max_lon)
+    else:
+        strikes = await nearby_strikes(lat, lon, radius_km)
+    return encoded_response(request, {
+        "location":          {"lat": lat, "lon": lon},
+        "radius_km":         radius_km,
+        "bbox":              bbox,
+        "strike_count":      len(strikes),
+        "nearest_strike_km": strike_index.nearest_km(lat, lon, radius_km),
+        "next_cursor":       next_cursor,
+        "strikes":           strikes,
+        "timestamp":         datetime.now(timezone.utc).isoformat(),
+    }, "strikes", fmt)
 
 @app.get("/weather/history", tags=["Weather"])
 async def get_weather_history(
+    request:       Request,
     limit:         int = 50,
+    cursor:        Optional[str] = None,
+    fields:        Optional[str] = None,
+    fmt:           Optional[str] = None,
     authorization: Optional[str] = Header(None),
 ):
-    """Last N weather risk records from Firestore."""
+    """
+    The caller's own weather risk records, newest first, at most
+    HISTORY_PAGE_MAX per page.  Pass next_cursor back as cursor= for the
+    next page; fields=fire_risk_level,timestamp,... limits what is read.
+    fmt / compression: see RESPONSE ENCODING.
+    """
     token = await verify_firebase_token(authorization)
-    if not await require_active_subscription(token.get("uid")):
+    uid   = token.get("uid")
+    if not await require_active_subscription(uid):
         raise HTTPException(status_code=402, detail="Subscription required.")
 
-    if not firestore_db:
-        return {"total_records": 0, "records": []}
-
-    docs = (
-        firestore_db.collection("weather_records")
-        .order_by("timestamp", direction="DESCENDING")
-        .limit(limit)
-        .stream()
+    page = await asyncio.to_thread(
+        keyset_page, "weather_records", "recorded_at",
+        max(1, min(limit, HISTORY_PAGE_MAX)), cursor,
+        parse_fields(fields, HISTORY_FIELDS, "recorded_at"),
+        (("uid", "==", uid),),
+    )
+    return encoded_response(
+        request, {"records": page["items"], "next_cursor": page["next_cursor"]}, "records", fmt
     )
-    return {"records": [d.to_dict() for d in docs]}
 
 # ─── Drone ────────────────────────────────────────────────────────────────────
 
@@ -1294,7 +5351,8 @@ async def dispatch_drone(
     target_lat = cmd.target_lat or BASE_STATION_LAT
     target_lon = cmd.target_lon or BASE_STATION_LON
 
-    mission = drone.dispatch_recon(
+    mission = await asyncio.to_thread(
+        drone.dispatch_recon,
         target_lat, target_lon,
         fire_risk_level="MANUAL_DISPATCH",
         lightning_nearby=False,
@@ -1302,10 +5360,11 @@ async def dispatch_drone(
         capture_interval_sec=cmd.capture_interval_sec,
         operator_override=True,
     )
-    if cmd.notes and mission.get("mission_id") and firestore_db:
-        firestore_db.collection("drone_missions").document(
-            mission["mission_id"]
-        ).update({"operator_notes": cmd.notes})
+    if cmd.notes and mission.get("mission_id"):
+        await asyncio.to_thread(
+            store.update, "drone_missions", mission["mission_id"], {"operator_notes": cmd.notes}
+        )
+        history_pages.invalidate("drone_missions")
 
     return {"status": "queued", "mission": mission}
 
@@ -1313,7 +5372,7 @@ async def dispatch_drone(
 async def get_pending_missions(authorization: Optional[str] = Header(None)):
     """Polled by the FlutterFlow operator tablet (Timer widget, 30 s interval)."""
     await verify_firebase_token(authorization)
-    pending = drone.get_pending()
+    pending = await asyncio.to_thread(drone.get_pending)
     return {"pending_count": len(pending), "missions": pending}
 
 @app.post("/drone/missions/{mission_id}/acknowledge", tags=["Drone"])
@@ -1323,7 +5382,7 @@ async def acknowledge_mission(
 ):
     """Operator app calls this when it picks up and starts executing a mission."""
     await verify_firebase_token(authorization)
-    if not drone.acknowledge(mission_id):
+    if not await asyncio.to_thread(drone.acknowledge, mission_id):
         raise HTTPException(status_code=404, detail=f"Mission '{mission_id}' not found.")
     return {"status": "acknowledged", "mission_id": mission_id}
 
@@ -1333,7 +5392,7 @@ async def complete_mission(
     authorization: Optional[str] = Header(None),
 ):
     await verify_firebase_token(authorization)
-    if not drone.complete(mission_id):
+    if not await asyncio.to_thread(drone.complete, mission_id):
         raise HTTPException(status_code=404, detail=f"Mission '{mission_id}' not found.")
     return {"status": "completed", "mission_id": mission_id}
 
@@ -1345,18 +5404,34 @@ async def abort_mission(
 ):
     """Emergency stop — marks mission ABORTED and records the reason."""
     await verify_firebase_token(authorization)
-    if not drone.abort(mission_id, reason):
+    if not await asyncio.to_thread(drone.abort, mission_id, reason):
         raise HTTPException(status_code=404, detail=f"Mission '{mission_id}' not found.")
     return {"status": "aborted", "mission_id": mission_id, "reason": reason}
 
 @app.get("/drone/mission-log", tags=["Drone"])
 async def get_mission_log(
+    request:       Request,
     limit:         int = 50,
+    cursor:        Optional[str] = None,
+    fields:        Optional[str] = None,
+    fmt:           Optional[str] = None,
     authorization: Optional[str] = Header(None),
 ):
-    """Full mission history from Firestore — audit trail and ops dashboard."""
+    """
+    Full mission history from Firestore — audit trail and ops dashboard.
+    Keyset-paged on created_at (cursor= / next_cursor), at most
+    HISTORY_PAGE_MAX per page; fields=mission_id,status,... projects.
+    fmt / compression: see RESPONSE ENCODING.
+    """
     await verify_firebase_token(authorization)
-    return {"missions": drone.get_log(limit)}
+    page = await asyncio.to_thread(
+        drone.get_log,
+        max(1, min(limit, HISTORY_PAGE_MAX)), cursor,
+        parse_fields(fields, MISSION_FIELDS, "created_at"),
+    )
+    return encoded_response(
+        request, {"missions": page["items"], "next_cursor": page["next_cursor"]}, "missions", fmt
+    )
 
 @app.post("/drone/upload-image", tags=["Drone"])
 async def upload_drone_image(
@@ -1391,17 +5466,15 @@ async def upload_drone_image(
 
     smoke_detected = None  # populated once vision model is integrated
 
-    if firestore_db:
-        # ArrayUnion appends to a Firestore array field without reading it first
-        firestore_db.collection("drone_missions").document(mission_id).update({
-            "images": firestore.ArrayUnion([{   # type: ignore[attr-defined]
-                "filename":       file.filename,
-                "saved_to":       save_path,
-                "size_bytes":     len(contents),
-                "uploaded_at":    datetime.now(timezone.utc).isoformat(),
-                "smoke_detected": smoke_detected,
-            }])
-        })
+    # Replicated as an ArrayUnion, so concurrent uploads never drop an entry
+    if await asyncio.to_thread(store.append, "drone_missions", mission_id, "images", [{
+        "filename":       file.filename,
+        "saved_to":       save_path,
+        "size_bytes":     len(contents),
+        "uploaded_at":    datetime.now(timezone.utc).isoformat(),
+        "smoke_detected": smoke_detected,
+    }]):
+        history_pages.invalidate("drone_missions")
 
     return {
         "status":         "received",